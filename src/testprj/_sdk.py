@@ -0,0 +1,48 @@
+"""
+Small helpers over SDK objects shared by the model wrappers (cache, accounting, speculation, routing).
+
+Kept in one dependency-free module, so a wrapper that needs one of them does not import another
+wrapper (and everything that one pulls in) to get it.
+"""
+
+from typing import Any
+
+from agents import Agent, FunctionTool, Model, RunConfig, Tool, TResponseInputItem
+
+
+def resolve_model(agent: Agent[Any], run_config: RunConfig) -> Model:
+    """The `Model` the Runner would use for `agent` under `run_config`."""
+    # same precedence as the Runner: run_config.model, then agent.model, via the model provider
+    if isinstance(run_config.model, Model):
+        return run_config.model
+    if isinstance(run_config.model, str):
+        return run_config.model_provider.get_model(run_config.model)
+    if isinstance(agent.model, Model):
+        return agent.model
+    return run_config.model_provider.get_model(agent.model)
+
+
+def tool_schema(tool: Tool) -> dict[str, Any]:
+    """What the model is told about `tool`: name, description and parameters of a function tool."""
+    if isinstance(tool, FunctionTool):
+        return {
+            "name": tool.name,
+            "description": tool.description,
+            "parameters": tool.params_json_schema,
+            "strict": tool.strict_json_schema,
+        }
+    return {"type": type(tool).__name__, "name": getattr(tool, "name", None)}
+
+
+def last_user_text(input: str | list[TResponseInputItem]) -> str:
+    """The text of the latest user message of a run input (string or Responses-format item list)."""
+    if isinstance(input, str):
+        return input
+    for item in reversed(input):
+        if isinstance(item, dict) and item.get("role") == "user":
+            content = item.get("content")
+            if isinstance(content, str):
+                return content
+            if isinstance(content, list):
+                return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return ""
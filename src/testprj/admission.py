@@ -0,0 +1,120 @@
+"""
+Admission control for chat front ends.
+
+Without a bound, a burst of messages starts one model run per message at once: in-flight model
+calls pile up, every user waits longer, and a user who sends three messages in a row has three
+runs competing with everyone else. `AdmissionController` puts three limits in front of a run:
+
+- per session: at most `per_session` runs at a time for one conversation (later messages wait);
+- globally: at most `max_running` runs at a time across all sessions;
+- admission queue: at most `queue_depth` messages waiting for a slot. Beyond that a message is
+  rejected immediately with `Busy` (no waiting, no model call), and one that has waited longer
+  than `queue_timeout` seconds is rejected too.
+
+    admission = AdmissionController(max_running=16, queue_depth=64)
+
+    try:
+        async with admission.slot(session_id):
+            result = await Runner.run(agent, text)
+    except Busy as exc:
+        ...  # tell the user to retry (exc.reason is "queue_full" or "timeout")
+
+`AdmissionController.from_env()` reads ADMISSION_MAX_RUNNING, ADMISSION_QUEUE_DEPTH,
+ADMISSION_PER_SESSION and ADMISSION_QUEUE_TIMEOUT.
+"""
+
+import asyncio
+import os
+import time
+from collections.abc import AsyncIterator, Hashable
+from contextlib import asynccontextmanager
+
+
+class Busy(Exception):
+    """Raised by `AdmissionController.slot` when a message is not admitted."""
+
+    def __init__(self, reason: str):
+        super().__init__(f"server busy ({reason})")
+        self.reason = reason  # "queue_full" | "timeout"
+
+
+class AdmissionController:
+    def __init__(self, max_running: int = 16, queue_depth: int = 64, per_session: int = 1, queue_timeout: float = 30.0):
+        self.max_running = max_running
+        self.queue_depth = queue_depth
+        self.per_session = per_session
+        self.queue_timeout = queue_timeout
+        self._running = asyncio.Semaphore(max_running)
+        self._sessions: dict[Hashable, tuple[asyncio.Semaphore, int]] = {}  # semaphore, users
+        self.admitted = 0  # messages waiting or running
+        self.active = 0  # messages running
+        self.counts = {"completed": 0, "queue_full": 0, "timeout": 0}
+        self.max_wait = 0.0
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls(
+            max_running=int(os.getenv("ADMISSION_MAX_RUNNING", "16")),
+            queue_depth=int(os.getenv("ADMISSION_QUEUE_DEPTH", "64")),
+            per_session=int(os.getenv("ADMISSION_PER_SESSION", "1")),
+            queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "30")),
+        )
+
+    @property
+    def waiting(self) -> int:
+        return self.admitted - self.active
+
+    def _session(self, session_id: Hashable) -> asyncio.Semaphore:
+        semaphore, users = self._sessions.get(session_id, (None, 0))
+        semaphore = semaphore or asyncio.Semaphore(self.per_session)
+        self._sessions[session_id] = (semaphore, users + 1)
+        return semaphore
+
+    def _leave(self, session_id: Hashable) -> None:
+        semaphore, users = self._sessions[session_id]
+        if users == 1:
+            del self._sessions[session_id]  # idle sessions keep no state
+        else:
+            self._sessions[session_id] = (semaphore, users - 1)
+
+    @asynccontextmanager
+    async def slot(self, session_id: Hashable) -> AsyncIterator[None]:
+        """Hold a run slot for `session_id`; raises `Busy` right away when the queue is full."""
+        if self.waiting >= self.queue_depth:
+            self.counts["queue_full"] += 1
+            raise Busy("queue_full")
+        self.admitted += 1
+        session = self._session(session_id)
+        start = time.perf_counter()
+        acquired: list[asyncio.Semaphore] = []
+        try:
+            try:
+                async with asyncio.timeout(self.queue_timeout):
+                    # the session first: a user's queued follow-ups must not hold global slots
+                    for semaphore in (session, self._running):
+                        await semaphore.acquire()
+                        acquired.append(semaphore)
+            except TimeoutError:
+                self.counts["timeout"] += 1
+                raise Busy("timeout") from None
+            self.max_wait = max(self.max_wait, time.perf_counter() - start)
+            self.active += 1
+            try:
+                yield
+            finally:
+                self.active -= 1
+                self.counts["completed"] += 1
+        finally:
+            for semaphore in acquired:
+                semaphore.release()
+            self.admitted -= 1
+            self._leave(session_id)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "running": self.active,
+            "waiting": self.waiting,
+            "sessions": len(self._sessions),
+            **self.counts,
+            "max_wait_s": self.max_wait,
+        }
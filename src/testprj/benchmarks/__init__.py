@@ -0,0 +1,7 @@
+"""
+Offline benchmarks for the agent flows in this repo.
+
+`server.StandInServer` is a tiny in-process, OpenAI-compatible chat-completions server, so the
+benchmarks run without a Gemini key or a local Ollama. Run any benchmark with e.g.:
+    python -m testprj.benchmarks.provider_pool
+"""
@@ -0,0 +1,115 @@
+"""
+Benchmark: a burst of chat messages with and without admission control.
+
+The stand-in upstream serves at most `--capacity` completions at a time (the rest queue on its
+side, as with a rate-limited provider). A burst of `--burst` messages from `--sessions` sessions
+(so some users send several messages in a row) arrives within `--spread` seconds. Modes:
+
+    unbounded  - every message starts its run right away (the old Chainlit handler)
+    admission  - `AdmissionController(max_running, queue_depth, per_session=1)`, busy replies beyond that
+
+Reports peak in-flight model calls, served / rejected messages, latency of the served ones and
+how fast a rejection comes back.
+
+    python -m testprj.benchmarks.admission --burst 400 --capacity 16 --max-running 16 --queue-depth 32
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from agents import Agent, Runner, set_tracing_disabled
+
+from testprj import providers
+from testprj.admission import AdmissionController, Busy
+from testprj.benchmarks.server import StandInServer
+from testprj.benchmarks.stats import print_table, summarize
+
+set_tracing_disabled(True)
+
+
+class LimitedServer(StandInServer):
+    """A stand-in upstream that works on at most `capacity` requests at a time."""
+
+    def __init__(self, *args, capacity: int = 16, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._capacity = asyncio.Semaphore(capacity)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def handle(self, method, path, query, body):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            async with self._capacity:
+                return await super().handle(method, path, query, body)
+        finally:
+            self.in_flight -= 1
+
+
+async def _one(agent: Agent, admission: AdmissionController | None, session: int, delay: float) -> tuple[str, float]:
+    await asyncio.sleep(delay)
+    start = time.perf_counter()
+    try:
+        if admission is None:
+            await Runner.run(agent, f"message from session {session}")
+        else:
+            async with admission.slot(session):
+                await Runner.run(agent, f"message from session {session}")
+        return "served", time.perf_counter() - start
+    except Busy:
+        return "rejected", time.perf_counter() - start
+
+
+async def main(burst: int, sessions: int, spread: float, capacity: int, latency: float,
+               max_running: int, queue_depth: int) -> None:
+    rows = []
+    random.seed(0)
+    arrivals = [(random.randrange(sessions), random.uniform(0, spread)) for _ in range(burst)]
+    async with LimitedServer("ok", latency=latency, capacity=capacity) as server:
+        providers.register_provider("standin", server.base_url, api_key="bench")
+        agent = Agent(name="Assistant", instructions="You are a helpful assistant",
+                      model=providers.get_model("stand-in", provider="standin"))
+        await Runner.run(agent, "warm up")
+
+        for mode in ["unbounded", "admission"]:
+            admission = AdmissionController(max_running, queue_depth, per_session=1, queue_timeout=60) if mode == "admission" else None
+            server.peak_in_flight = 0
+            start = time.perf_counter()
+            outcomes = await asyncio.gather(*(_one(agent, admission, s, d) for s, d in arrivals))
+            wall = time.perf_counter() - start
+            served = [t for outcome, t in outcomes if outcome == "served"]
+            rejected = [t for outcome, t in outcomes if outcome == "rejected"]
+            latency_ms = summarize(served)
+            rows.append({
+                "mode": mode,
+                "peak_in_flight": server.peak_in_flight,
+                "served": len(served),
+                "rejected": len(rejected),
+                "served_p50_ms": latency_ms["p50_ms"],
+                "served_p95_ms": latency_ms["p95_ms"],
+                "served_p99_ms": latency_ms["p99_ms"],
+                "reject_p95_ms": summarize(rejected)["p95_ms"] if rejected else 0.0,
+                "wall_s": wall,
+            })
+        await providers.aclose()
+
+    print(f"{burst} messages from {sessions} sessions within {spread:.1f} s, upstream capacity {capacity} "
+          f"x {latency * 1000:.0f} ms, admission {max_running} running + {queue_depth} queued")
+    print_table(rows, ["mode", "peak_in_flight", "served", "rejected", "served_p50_ms", "served_p95_ms",
+                       "served_p99_ms", "reject_p95_ms", "wall_s"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--burst", type=int, default=400, help="messages in the burst")
+    parser.add_argument("--sessions", type=int, default=150)
+    parser.add_argument("--spread", type=float, default=1.0, help="the burst arrives within this many seconds")
+    parser.add_argument("--capacity", type=int, default=16, help="completions the upstream serves at a time")
+    parser.add_argument("--latency", type=float, default=0.2, help="upstream time per completion (s)")
+    parser.add_argument("--max-running", type=int, default=16)
+    parser.add_argument("--queue-depth", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(main(args.burst, args.sessions, args.spread, args.capacity, args.latency,
+                     args.max_running, args.queue_depth))
@@ -0,0 +1,93 @@
+"""
+Benchmark: tail latency of the parallelization pattern, gather-all vs `best_of_n`.
+
+Translator samples have a heavy-tailed latency against the stand-in server: usually
+`--latency-ms`, but with probability `--straggler-rate` they take `--straggler-ms` (a slow replica,
+a long generation). Modes:
+
+    gather all              - the old pick_best_translation: wait for all 3 samples, then pick
+    best_of_n 3, quorum 2   - pick among the first 2 of 3
+    best_of_n 5, deadline   - 5 samples, quorum 3, `--deadline`
+    best_of_n 3, scorer     - no picker call: a length heuristic scores samples as they arrive and
+                              the first acceptable one wins
+
+`completed_output_tokens_per_request` counts finished samples only; the tokens a cancelled
+straggler already generated are not reported back, so the best_of_n rows are lower bounds.
+
+    python -m testprj.benchmarks.best_of_n --requests 200 --straggler-rate 0.1
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from agents import Agent, ItemHelpers, Runner, set_tracing_disabled
+
+from testprj import providers
+from testprj.benchmarks.server import StandInServer, system_prompt, text
+from testprj.benchmarks.stats import print_table, summarize
+from testprj.best_of_n import best_of_n
+
+set_tracing_disabled(True)
+
+
+def responder(latency_s: float, straggler_s: float, straggler_rate: float):
+    def respond(request: dict):
+        if system_prompt(request).startswith("You pick"):
+            return text("Hola, ¿cómo estás?", latency=latency_s)
+        slow = random.random() < straggler_rate
+        return text(random.choice(["Hola, ¿cómo estás?", "Hola, ¿qué tal?", "Saludos"]),
+                    latency=straggler_s if slow else latency_s * random.uniform(0.8, 1.2))
+
+    return respond
+
+
+async def gather_all(translator: Agent, picker: Agent, msg: str):
+    results = await asyncio.gather(*[Runner.run(translator, msg) for _ in range(3)])
+    outputs = [ItemHelpers.text_message_outputs(r.new_items) for r in results]
+    await Runner.run(picker, f"Input: {msg}\n\nTranslations:\n" + "\n\n".join(outputs))
+    return sum(r.context_wrapper.usage.output_tokens for r in results)
+
+
+async def main(requests: int, latency_ms: float, straggler_ms: float, straggler_rate: float, deadline: float) -> None:
+    random.seed(0)
+    rows = []
+    async with StandInServer(responder(latency_ms / 1000, straggler_ms / 1000, straggler_rate)) as server:
+        providers.register_provider("standin", server.base_url, api_key="bench")
+        model = providers.get_model("stand-in", provider="standin")
+        translator = Agent(name="spanish_agent", instructions="You translate the user's message to Spanish", model=model)
+        picker = Agent(name="translation_picker", instructions="You pick the best Spanish translation.", model=model)
+
+        async def sampled(**options):
+            outcome = await best_of_n(translator, "Hello, how are you?", **options)
+            return outcome.stats()["completed_output_tokens"]
+
+        modes = {
+            "gather all": lambda: gather_all(translator, picker, "Hello, how are you?"),
+            "best_of_n 3, quorum 2": lambda: sampled(n=3, quorum=2, picker=picker),
+            "best_of_n 5, deadline": lambda: sampled(n=5, quorum=3, deadline=deadline, picker=picker),
+            "best_of_n 3, scorer": lambda: sampled(n=3, scorer=lambda out: -abs(len(out) - 18), accept_score=-4),
+        }
+        for mode, run in modes.items():
+            latencies, tokens = [], 0
+            for _ in range(requests):
+                start = time.perf_counter()
+                tokens += await run()
+                latencies.append(time.perf_counter() - start)
+            rows.append({"mode": mode, **summarize(latencies), "completed_output_tokens_per_request": tokens / requests})
+        await providers.aclose()
+    print(f"{requests} requests; samples {latency_ms:.0f} ms, {straggler_rate:.0%} stragglers at {straggler_ms:.0f} ms, "
+          f"deadline {deadline:g}s")
+    print_table(rows, ["mode", "p50_ms", "p95_ms", "p99_ms", "max_ms", "completed_output_tokens_per_request"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--straggler-ms", type=float, default=1500)
+    parser.add_argument("--straggler-rate", type=float, default=0.1)
+    parser.add_argument("--deadline", type=float, default=0.3, help="best_of_n deadline (s)")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.latency_ms, args.straggler_ms, args.straggler_rate, args.deadline))
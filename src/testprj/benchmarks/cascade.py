@@ -0,0 +1,131 @@
+"""
+Benchmark: local model only vs remote model only vs the local-first `CascadeModel`.
+
+Two stand-in models on one stand-in server: a fast local one (`--local-ms` per call, like Ollama
+on the same box) and a slow remote one (`--remote-ms`, like Gemini). Half of the requests ask for
+plain text, half for a structured `Feedback`. The remote model always answers well; on a
+`--hard` share of the requests the local one does not - it hedges ("I'm not sure..."), emits
+broken JSON, or returns a `needs_improvement` verdict without any feedback. Modes:
+
+    remote only         - every call on the remote model
+    local only          - every call on the local model
+    cascade             - CascadeModel({"local": ..., "remote": ...}) with a feedback guardrail
+    cascade, local down - the same, with the local model pointed at a port nobody listens on
+
+`bad_answers` counts runs that failed (unparsable output) or returned a bad answer; `tokens` is
+the mean of the runs' `context_wrapper.usage.total_tokens` (escalated answers included).
+
+    python -m testprj.benchmarks.cascade --requests 200 --hard 0.2
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Literal
+
+from agents import Agent, GuardrailFunctionOutput, Runner, output_guardrail, set_tracing_disabled
+from pydantic import BaseModel
+
+from testprj import providers
+from testprj.benchmarks.server import StandInServer, json_reply, last_message, system_prompt, text
+from testprj.benchmarks.stats import print_table, summarize
+from testprj.cascade import HEDGES, CascadeModel
+
+set_tracing_disabled(True)
+
+
+class Feedback(BaseModel):
+    feedback: str
+    score: Literal["pass", "needs_improvement", "fail"]
+
+
+def _bad(output) -> bool:
+    if isinstance(output, Feedback):
+        return output.score != "pass" and not output.feedback.strip()
+    return bool(HEDGES.search(str(output)))
+
+
+@output_guardrail
+def actionable_feedback(context, agent, output: Feedback | str) -> GuardrailFunctionOutput:
+    # the cascade serves both agents, so plain-text answers come through here too
+    return GuardrailFunctionOutput(output_info=None, tripwire_triggered=isinstance(output, Feedback) and _bad(output))
+
+
+def responder(local_s: float, remote_s: float):
+    def respond(request: dict):
+        structured = system_prompt(request).startswith("You evaluate")
+        hard = str(last_message(request).get("content", "")).endswith("#hard")
+        if request.get("model") == "remote":
+            if structured:
+                return json_reply({"feedback": "Give the villain a motive.", "score": "needs_improvement"}, latency=remote_s)
+            return text("Paris is the capital of France.", latency=remote_s)
+        if not hard:
+            if structured:
+                return json_reply({"feedback": "Tighten the ending.", "score": "needs_improvement"}, latency=local_s)
+            return text("Paris is the capital of France.", latency=local_s)
+        if not structured:
+            return text("I'm not sure, I don't have enough information to answer that.", latency=local_s)
+        if random.random() < 0.5:
+            return text('{"feedback": "Tighten the ending", "score": "needs_impr', latency=local_s)  # cut-off JSON
+        return json_reply({"feedback": "", "score": "needs_improvement"}, latency=local_s)
+
+    return respond
+
+
+async def main(requests: int, hard: float, local_ms: float, remote_ms: float) -> None:
+    random.seed(0)
+    rng = random.Random(1)
+    traffic = [(rng.random() < 0.5, rng.random() < hard) for _ in range(requests)]
+    rows = []
+    async with StandInServer(responder(local_ms / 1000, remote_ms / 1000)) as server:
+        providers.register_provider("standin", server.base_url, api_key="bench")
+        local = providers.get_model("local", provider="standin")
+        remote = providers.get_model("remote", provider="standin")
+        providers.register_provider("down", "http://127.0.0.1:9/v1", api_key="bench")
+        cascade = CascadeModel({"local": local, "remote": remote}, guardrails=[actionable_feedback])
+        down = CascadeModel({"local": providers.get_model("local", provider="down"), "remote": remote},
+                            guardrails=[actionable_feedback])
+        modes = {"remote only": remote, "local only": local, "cascade": cascade, "cascade, local down": down}
+        for mode, model in modes.items():
+            answerer = Agent(name="answerer", instructions="You answer the user's question.", model=model)
+            evaluator = Agent(name="evaluator", instructions="You evaluate a story outline.", model=model,
+                              output_type=Feedback)
+            server.reset_stats()
+            latencies, bad, tokens = [], 0, 0
+            for structured, is_hard in traffic:
+                question = "Outline: a dragon guards a library" if structured else "What is the capital of France?"
+                start = time.perf_counter()
+                try:
+                    result = await Runner.run(evaluator if structured else answerer, question + (" #hard" if is_hard else ""))
+                    bad += _bad(result.final_output)
+                    tokens += result.context_wrapper.usage.total_tokens
+                except Exception:
+                    bad += 1
+                latencies.append(time.perf_counter() - start)
+            if isinstance(model, CascadeModel):
+                stats = model.stats()
+                calls, hit_rate = stats["calls"], stats["hit_rate"]["local"]
+            else:
+                calls = {"remote" if model is remote else "local": requests}
+                hit_rate = 1.0 if model is local else 0.0
+            rows.append({"mode": mode, **summarize(latencies), "local_calls": calls.get("local", 0),
+                         "remote_calls": calls.get("remote", 0), "local_hit_rate": hit_rate, "bad_answers": bad,
+                         "tokens": tokens / requests})
+        escalations = cascade.stats()["escalations"]
+        skipped = down.stats()["skipped"]
+        await providers.aclose()
+    print(f"{requests} requests, {hard:.0%} hard; local model {local_ms:.0f} ms, remote {remote_ms:.0f} ms per call")
+    print_table(rows, ["mode", "p50_ms", "p95_ms", "local_calls", "remote_calls", "local_hit_rate", "bad_answers",
+                       "tokens"])
+    print(f"cascade escalations: {escalations}; local down, calls past the cooling-down local tier: {skipped}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--hard", type=float, default=0.2, help="share of requests the local model gets wrong")
+    parser.add_argument("--local-ms", type=float, default=40)
+    parser.add_argument("--remote-ms", type=float, default=250)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.hard, args.local_ms, args.remote_ms))
@@ -0,0 +1,127 @@
+"""
+Benchmark: triage with every handoff vs the embedding router, 5 to 200 specialists.
+
+A triage agent hands off to one of `N` specialist agents ("Answers questions about <subject> in
+<region>") against the stand-in server. The stand-in triage model picks the right handoff if it
+is among its tools; every model call takes `--latency-ms` plus `--prefill-ms` per 1k prompt
+tokens, and the server also answers `/embeddings` (hashed bag-of-words, `--embed-ms`). Modes:
+
+    all handoffs  - the triage agent with all N handoffs
+    top-3         - EmbeddingRouter that always narrows to the 3 closest handoffs
+    router        - EmbeddingRouter: a clear winner is routed to directly, otherwise top-3
+
+    python -m testprj.benchmarks.embedding_router --requests 100
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from agents import Agent, Runner, set_tracing_disabled
+
+from testprj import providers
+from testprj.benchmarks.server import StandInServer, last_message, system_prompt, text, tool_calls, tool_names
+from testprj.benchmarks.stats import print_table, summarize
+from testprj.embedding_router import EmbeddingRouter, HashingEmbedder, ProviderEmbedder
+
+set_tracing_disabled(True)
+
+SUBJECTS = ["astronomy", "chemistry", "poetry", "cooking", "football", "geology", "opera", "taxes", "sailing",
+            "chess", "gardening", "robotics", "medicine", "architecture", "finance", "photography", "music",
+            "law", "fishing", "painting", "biology", "physics", "history", "mathematics", "linguistics",
+            "economics", "weather", "cycling", "pottery", "aviation", "farming", "fashion", "theatre",
+            "archaeology", "philosophy", "psychology", "nutrition", "carpentry", "knitting", "surfing"]
+REGIONS = ["sindh", "punjab", "kenya", "peru", "norway"]
+
+
+class EmbeddingServer(StandInServer):
+    """Stand-in that also serves `POST /v1/embeddings` from a hashing embedder."""
+
+    def __init__(self, responder, embed_s: float, **kwargs):
+        super().__init__(responder, **kwargs)
+        self.embed_s = embed_s
+        self.embedder = HashingEmbedder(dim=512)
+
+    async def handle(self, method, path, query, body):
+        if method != "POST" or not path.rstrip("/").endswith("/embeddings"):
+            return await super().handle(method, path, query, body)
+        request = json.loads(body or b"{}")
+        texts = request["input"] if isinstance(request["input"], list) else [request["input"]]
+        await asyncio.sleep(self.embed_s)
+        vectors = await self.embedder.embed(texts)
+        return 200, {
+            "object": "list",
+            "model": request.get("model", "stand-in"),
+            "data": [{"object": "embedding", "index": i, "embedding": v.tolist()} for i, v in enumerate(vectors)],
+            "usage": {"prompt_tokens": len(texts), "total_tokens": len(texts)},
+        }
+
+
+def responder(latency_s: float, prefill_s_per_1k: float):
+    def respond(request: dict):
+        latency = latency_s + len(json.dumps(request)) / 4 / 1000 * prefill_s_per_1k
+        if system_prompt(request).startswith("You route"):
+            wanted = f"transfer_to_{str(last_message(request).get('content')).split('#')[-1]}"
+            tools = tool_names(request)
+            return tool_calls((wanted if wanted in tools else tools[0], {}), latency=latency)
+        return text("Here is what I know.", latency=latency)
+
+    return respond
+
+
+def _specialists(n: int, model) -> list[Agent]:
+    topics = [(subject, region) for region in REGIONS for subject in SUBJECTS][:n]
+    return [Agent(name=f"spec_{i}", instructions=f"You answer questions about {s} in {r}.", model=model,
+                  handoff_description=f"Answers questions about {s} in {r}") for i, (s, r) in enumerate(topics)]
+
+
+async def main(requests: int, sizes: list[int], latency_ms: float, prefill_ms: float, embed_ms: float) -> None:
+    rows = []
+    async with EmbeddingServer(responder(latency_ms / 1000, prefill_ms / 1000), embed_s=embed_ms / 1000) as server:
+        providers.register_provider("standin", server.base_url, api_key="bench")
+        model = providers.get_model("stand-in", provider="standin")
+        for n in sizes:
+            specialists = _specialists(n, model)
+            triage = Agent(name="triage", instructions="You route each question to the right specialist.",
+                           model=model, handoffs=specialists)
+            embedder = ProviderEmbedder("stand-in", provider="standin")
+            modes = {
+                "all handoffs": None,
+                "top-3": EmbeddingRouter(triage, embedder, k=3, route_above=1.1),
+                "router": EmbeddingRouter(triage, embedder, k=3),
+            }
+            rng = random.Random(n)
+            for mode, router in modes.items():
+                latencies, prompt_tokens, correct = [], 0, 0
+                for _ in range(requests):
+                    target = rng.randrange(n)
+                    subject, region = specialists[target].handoff_description.rsplit(" about ", 1)[1].split(" in ")
+                    question = f"Tell me something about {subject} in {region} #spec_{target}"
+                    start = time.perf_counter()
+                    agent = await router.select(question) if router else triage
+                    result = await Runner.run(agent, question)
+                    latencies.append(time.perf_counter() - start)
+                    prompt_tokens += result.context_wrapper.usage.input_tokens
+                    correct += result.last_agent.name == f"spec_{target}"
+                routed = router.stats()["routed_rate"] if router else 0.0
+                rows.append({"specialists": n, "mode": mode, **summarize(latencies),
+                             "prompt_tokens_per_request": prompt_tokens / requests, "routed_rate": routed,
+                             "accuracy": correct / requests})
+        await providers.aclose()
+    print(f"{requests} requests per row; model {latency_ms:.0f} ms + {prefill_ms:.0f} ms per 1k prompt tokens, "
+          f"embeddings {embed_ms:.0f} ms")
+    print_table(rows, ["specialists", "mode", "p50_ms", "p95_ms", "prompt_tokens_per_request", "routed_rate", "accuracy"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--sizes", default="5,50,200", help="comma-separated numbers of specialists")
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--prefill-ms", type=float, default=20, help="extra model time per 1k prompt tokens")
+    parser.add_argument("--embed-ms", type=float, default=15)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, [int(n) for n in args.sizes.split(",")], args.latency_ms, args.prefill_ms,
+                     args.embed_ms))
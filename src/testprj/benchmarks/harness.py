@@ -0,0 +1,135 @@
+"""
+End-to-end benchmark harness for every agent pattern in the repo.
+
+Starts the stand-in chat-completions server (and a fake weather server) on a background thread,
+points every provider at it, then runs each pattern at the requested concurrency levels and
+reports throughput, p50/p95/p99 latency, event-loop lag and RSS.
+
+    python -m testprj.benchmarks.harness                              # every pattern, default levels
+    python -m testprj.benchmarks.harness -p handoff,tool_calling -c 1,16,64 -n 200
+    python -m testprj.benchmarks.harness --json results.json          # save a baseline...
+    python -m testprj.benchmarks.harness --baseline results.json      # ...and fail on regressions
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+from testprj.benchmarks.patterns import PATTERNS, respond
+from testprj.benchmarks.server import FakeWeatherServer, StandInServer, serve_in_thread
+from testprj.benchmarks.stats import LoopLagMonitor, print_table, rss_mb, summarize
+
+COLUMNS = ["pattern", "concurrency", "runs", "errors", "throughput_rps", "p50_ms", "p95_ms", "p99_ms",
+           "lag_p99_ms", "lag_max_ms", "rss_mb"]
+
+
+async def bench_pattern(name: str, concurrency: int, runs: int) -> dict:
+    run_once = PATTERNS[name]
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def one() -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await run_once()
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    # the examples print a lot; keep that out of the terminal (but not out of the measurement)
+    with contextlib.redirect_stdout(io.StringIO()):
+        await run_once()  # warm-up: imports, first connections
+        async with LoopLagMonitor() as lag:
+            start = time.perf_counter()
+            await asyncio.gather(*(one() for _ in range(runs)))
+            wall = time.perf_counter() - start
+
+    return {
+        "pattern": name,
+        "concurrency": concurrency,
+        "runs": runs,
+        "errors": errors,
+        "throughput_rps": len(latencies) / wall if wall else 0.0,
+        **summarize(latencies),
+        **lag.summary(),
+        "rss_mb": rss_mb(),
+    }
+
+
+def find_regressions(rows: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    previous = {(r["pattern"], r["concurrency"]): r for r in baseline}
+    problems = []
+    for row in rows:
+        old = previous.get((row["pattern"], row["concurrency"]))
+        if old is None:
+            continue
+        label = f"{row['pattern']} @ c={row['concurrency']}"
+        if row["throughput_rps"] < old["throughput_rps"] * (1 - tolerance):
+            problems.append(f"{label}: throughput {old['throughput_rps']:.1f} -> {row['throughput_rps']:.1f} rps")
+        if row["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+            problems.append(f"{label}: p95 {old['p95_ms']:.1f} -> {row['p95_ms']:.1f} ms")
+        if row["errors"] > old["errors"]:
+            problems.append(f"{label}: errors {old['errors']} -> {row['errors']}")
+    return problems
+
+
+async def run(patterns: list[str], levels: list[int], runs: int) -> list[dict]:
+    rows = []
+    for name in patterns:
+        for concurrency in levels:
+            rows.append(await bench_pattern(name, concurrency, runs))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-p", "--patterns", default="all", help=f"comma separated, from: {', '.join(PATTERNS)}")
+    parser.add_argument("-c", "--concurrency", default="1,16", help="comma separated concurrency levels")
+    parser.add_argument("-n", "--runs", type=int, default=50, help="runs per pattern and level")
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated model latency / time to first token (s)")
+    parser.add_argument("--chunk-delay", type=float, default=0.002, help="delay between streamed chunks (s)")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare against a previous --json file; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    args = parser.parse_args()
+
+    patterns = list(PATTERNS) if args.patterns == "all" else args.patterns.split(",")
+    unknown = set(patterns) - set(PATTERNS)
+    if unknown:
+        parser.error(f"unknown pattern(s): {', '.join(sorted(unknown))}")
+    levels = [int(c) for c in args.concurrency.split(",")]
+
+    model_server = StandInServer(respond, latency=args.latency, chunk_delay=args.chunk_delay)
+    with serve_in_thread(model_server), serve_in_thread(FakeWeatherServer(latency=args.latency)) as weather:
+        # every module builds its model from the provider registry at import time
+        os.environ["GEMINI_BASE_URL"] = model_server.base_url
+        os.environ["OLLAMA_BASE_URL"] = model_server.base_url
+        os.environ["OPENWEATHER_BASE_URL"] = weather.weather_url
+        rows = asyncio.run(run(patterns, levels, args.runs))
+
+    print(f"stand-in model latency {args.latency * 1000:.0f} ms, {args.runs} runs per row")
+    print_table(rows, COLUMNS)
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(rows, fh, indent=2)
+    if args.baseline:
+        with open(args.baseline) as fh:
+            problems = find_regressions(rows, json.load(fh), args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Benchmark: prompt size of the LLM-as-a-judge loop with and without history compaction.
+
+Runs `--rounds` generate / judge rounds of examples/agent_patterns/llm_as_a_judge.py against the
+stand-in server, whose latency grows with the prompt (`--per-token-ms`, like a real provider's
+prefill). Modes:
+
+    full history  - plain models; every round resends everything
+    extractive    - `compacted(model)` with the default extractive summaries
+    model summary - `compacted(model)` with `ModelSummarizer` (one extra, small model call per compaction)
+
+Reports the prompt tokens sent in total and in the last round, per-call latency and the time
+spent compacting.
+
+    python -m testprj.benchmarks.history_compaction --rounds 20
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from agents import Agent, Runner, set_tracing_disabled
+from pydantic import BaseModel
+
+from testprj import providers
+from testprj.benchmarks.server import Reply, StandInServer, json_reply, system_prompt, text
+from testprj.benchmarks.stats import print_table, summarize
+from testprj.history_compaction import HistoryCompactor, ModelSummarizer, compacted
+from testprj.token_accounting import count_tokens
+
+set_tracing_disabled(True)
+
+OUTLINE = " ".join(["The dragon Ember leaves her cave to find the stolen egg and faces the knight."] * 12)
+
+
+class EvaluationFeedback(BaseModel):
+    feedback: str
+    score: str
+
+
+class PromptSizedServer(StandInServer):
+    """Records prompt tokens per request; latency = base + per-token cost of the prompt."""
+
+    def __init__(self, responder, base_latency: float, per_token: float):
+        super().__init__(responder)
+        self.base_latency = base_latency
+        self.per_token = per_token
+        self.prompt_tokens: list[int] = []
+
+    def reply_for(self, request: dict) -> Reply:
+        reply = super().reply_for(request)
+        tokens = count_tokens(json.dumps(request.get("messages", [])))
+        self.prompt_tokens.append(tokens)
+        reply.latency = self.base_latency + self.per_token * tokens
+        return reply
+
+
+def respond(request: dict):
+    prompt = system_prompt(request)
+    if prompt.startswith("You compress"):
+        return text("The user wants a dragon story; the judge keeps asking for more conflict and a clearer ending.")
+    if prompt.startswith("You evaluate"):
+        return json_reply({"feedback": "Add more conflict and a clearer ending.", "score": "needs_improvement"})
+    return text(OUTLINE)
+
+
+async def _judge_loop(generator: Agent, evaluator: Agent, rounds: int) -> list[float]:
+    latencies = []
+    input_items = [{"content": "Write a story about a dragon", "role": "user"}]
+    for _ in range(rounds):
+        start = time.perf_counter()
+        outline = await Runner.run(generator, input_items)
+        input_items = outline.to_input_list()
+        verdict = await Runner.run(evaluator, input_items)
+        latencies.append((time.perf_counter() - start) / 2)
+        input_items.append({"content": f"Feedback: {verdict.final_output.feedback}", "role": "user"})
+    return latencies
+
+
+async def main(rounds: int, base_latency: float, per_token_ms: float) -> None:
+    rows = []
+    server = PromptSizedServer(respond, base_latency, per_token_ms / 1000)
+    async with server:
+        providers.register_provider("standin", server.base_url, api_key="bench")
+        model = providers.get_model("stand-in", provider="standin")
+        for mode in ["full history", "extractive", "model summary"]:
+            compactors = []
+
+            def wrap(budget: int, keep_recent: int):
+                if mode == "full history":
+                    return model
+                summarizer = ModelSummarizer(model) if mode == "model summary" else None
+                compactor = HistoryCompactor(budget, keep_recent, **({"summarizer": summarizer} if summarizer else {}))
+                compactors.append(compactor)
+                return compacted(model, compactor)
+
+            generator = Agent(name="story_outline_generator", instructions="You generate a very short story outline.",
+                              model=wrap(1500, 4))
+            evaluator = Agent(name="evaluator", instructions="You evaluate a story outline.",
+                              output_type=EvaluationFeedback, model=wrap(1000, 2))
+            server.prompt_tokens = []
+            latencies = await _judge_loop(generator, evaluator, rounds)
+            calls = 2 * rounds
+            latency = summarize(latencies)
+            rows.append({
+                "mode": mode,
+                "prompt_tokens_total": sum(server.prompt_tokens),
+                "last_round_tokens": sum(server.prompt_tokens[-2:]),
+                "model_calls": len(server.prompt_tokens),
+                "call_p50_ms": latency["p50_ms"],
+                "call_p95_ms": latency["p95_ms"],
+                "compaction_ms_per_call": sum(c.compaction_s for c in compactors) / calls * 1000,
+            })
+        await providers.aclose()
+
+    print(f"{rounds} judge rounds, latency {base_latency * 1000:.0f} ms + {per_token_ms} ms per prompt token")
+    print_table(rows, ["mode", "prompt_tokens_total", "last_round_tokens", "model_calls", "call_p50_ms",
+                       "call_p95_ms", "compaction_ms_per_call"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--base-latency", type=float, default=0.05, help="fixed model latency (s)")
+    parser.add_argument("--per-token-ms", type=float, default=0.05, help="added latency per prompt token (ms)")
+    args = parser.parse_args()
+    asyncio.run(main(args.rounds, args.base_latency, args.per_token_ms))
@@ -0,0 +1,101 @@
+"""
+Benchmark: time-to-pass of the LLM-as-a-judge loop, serial rounds vs search mode.
+
+Runs examples/agent_patterns/llm_as_a_judge.py against the stand-in server. Each generated
+outline is "good" with probability `--good-rate` and the judge passes exactly the good ones, so
+the serial loop needs 1 / good-rate rounds on average while K candidates per round find a good
+one sooner. Modes:
+
+    serial                - generate_outline: one outline, one judge call per round
+    search k=3, parallel  - judge_search without a batch evaluator (K judge calls per round)
+    search k=3, batched   - judge_search with the batch evaluator (one judge call per round)
+
+    python -m testprj.benchmarks.judge_search --requests 100 --good-rate 0.25
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib
+import io
+import os
+import random
+import re
+import time
+
+from agents import set_tracing_disabled
+
+from testprj import providers
+from testprj.benchmarks.patterns import _structured
+from testprj.benchmarks.server import StandInServer, last_message, system_prompt, text
+from testprj.benchmarks.stats import print_table, summarize
+from testprj.judge_search import judge_search
+
+set_tracing_disabled(True)
+
+GOOD = "The keeper must choose between saving the ship and keeping the door closed."
+
+
+def responder(good_rate: float, generator_s: float, judge_s: float):
+    def verdict(outline: str) -> dict:
+        if GOOD in outline:
+            return {"feedback": "Good enough.", "score": "pass"}
+        return {"feedback": "Give the keeper a clearer goal.", "score": "needs_improvement"}
+
+    def respond(request: dict):
+        system = system_prompt(request)
+        if system.startswith("You generate a very short story outline"):
+            extra = GOOD if random.random() < good_rate else "The keeper wanders."
+            return text(f"A lighthouse keeper finds a door in the fog. {extra}", latency=generator_s)
+        if system.startswith("You evaluate several candidate story outlines"):
+            blocks = re.split(r"Candidate \d+:\n", str(last_message(request).get("content", "")))[1:]
+            reply = _structured(request, {"evaluations": [verdict(block) for block in blocks]})
+        else:
+            outline = next((str(m.get("content")) for m in reversed(request["messages"]) if m.get("role") == "assistant"), "")
+            reply = _structured(request, verdict(outline))
+        reply.latency = judge_s
+        return reply
+
+    return respond
+
+
+async def main(requests: int, good_rate: float, generator_ms: float, judge_ms: float) -> None:
+    random.seed(0)
+    rows = []
+    async with StandInServer(responder(good_rate, generator_ms / 1000, judge_ms / 1000)) as server:
+        os.environ["OLLAMA_BASE_URL"] = server.base_url
+        judge = importlib.import_module("testprj.examples.agent_patterns.llm_as_a_judge")
+        modes = {
+            "serial": None,
+            "search k=3, parallel": None,
+            "search k=3, batched": judge.batch_evaluator,
+        }
+        for mode, batch_evaluator in modes.items():
+            latencies, calls, passed = [], 0, 0
+            for _ in range(requests):
+                start = time.perf_counter()
+                if mode == "serial":
+                    with contextlib.redirect_stdout(io.StringIO()) as out:
+                        await judge.generate_outline("A ghost story at sea")
+                    rounds = out.getvalue().count("Story outline generated")
+                    calls, passed = calls + 2 * rounds, passed + 1
+                else:
+                    search = await judge_search(judge.story_outline_generator, judge.evaluator, "A ghost story at sea",
+                                                k=3, batch_evaluator=batch_evaluator, max_rounds=20)
+                    calls, passed = calls + search.model_calls, passed + search.passed
+                latencies.append(time.perf_counter() - start)
+            rows.append({"mode": mode, **summarize(latencies), "model_calls_per_request": calls / requests,
+                         "passed": passed})
+        await providers.aclose()
+    print(f"{requests} requests; {good_rate:.0%} of outlines pass; generator {generator_ms:.0f} ms, judge {judge_ms:.0f} ms")
+    print_table(rows, ["mode", "p50_ms", "p95_ms", "p99_ms", "max_ms", "model_calls_per_request", "passed"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--good-rate", type=float, default=0.25, help="probability that an outline passes")
+    parser.add_argument("--generator-ms", type=float, default=150)
+    parser.add_argument("--judge-ms", type=float, default=80)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.good_rate, args.generator_ms, args.judge_ms))
@@ -0,0 +1,77 @@
+"""
+Benchmark: per-call overhead of `asyncio.run` per call vs the shared background loop.
+
+A synchronous script makes `--calls` sequential agent calls against the stand-in server (running
+in its own thread, `--latency-ms` per answer). Modes:
+
+    asyncio.run per call  - asyncio.run(Runner.run(...)): a new event loop per call. Connections
+                            belong to the loop that opened them, so every call opens a new pool
+                            and connection
+    Runner.run_sync       - the SDK's sync wrapper (run_until_complete on the thread's loop)
+    LoopRunner            - testprj.loop_runner.run_agent: one persistent loop thread
+
+`overhead_ms` is the p50 latency minus the simulated model time; `connections` counts the TCP
+connections the server accepted (each one a TLS handshake against a real provider).
+
+    python -m testprj.benchmarks.loop_runner --calls 200
+"""
+
+import argparse
+import asyncio
+import time
+import warnings
+
+from agents import Agent, Runner, set_tracing_disabled
+
+from testprj import providers
+from testprj.benchmarks.server import StandInServer, serve_in_thread
+from testprj.benchmarks.stats import print_table, summarize
+from testprj.loop_runner import LoopRunner
+
+set_tracing_disabled(True)
+
+
+def main(calls: int, latency_ms: float) -> None:
+    rows = []
+    with serve_in_thread(StandInServer("pong", latency=latency_ms / 1000)) as server:
+        providers.register_provider("standin", server.base_url, api_key="bench")
+
+        def agent() -> Agent:
+            return Agent(name="Assistant", instructions="You are a helpful assistant",
+                         model=providers.get_model("stand-in", provider="standin"))
+
+        runner = LoopRunner()
+        sync_loop = asyncio.new_event_loop()
+        modes = {
+            "asyncio.run per call": lambda: asyncio.run(Runner.run(agent(), "ping")),
+            "Runner.run_sync": lambda: Runner.run_sync(agent(), "ping"),
+            "LoopRunner": lambda: runner.run_agent(agent(), "ping"),
+        }
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            for mode, call in modes.items():
+                asyncio.set_event_loop(sync_loop)  # asyncio.run() leaves the thread without one
+                call()  # warm-up (imports, first connection)
+                server.reset_stats()
+                latencies = []
+                for _ in range(calls):
+                    start = time.perf_counter()
+                    call()
+                    latencies.append(time.perf_counter() - start)
+                stats = summarize(latencies)
+                rows.append({"mode": mode, **stats, "overhead_ms": stats["p50_ms"] - latency_ms,
+                             "connections": server.connections_opened})
+                if mode == "Runner.run_sync":
+                    sync_loop.run_until_complete(providers.aclose())
+        runner.close()
+        sync_loop.close()
+    print(f"{calls} sequential calls per mode; model {latency_ms:.0f} ms")
+    print_table(rows, ["mode", "p50_ms", "p95_ms", "max_ms", "overhead_ms", "connections"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    args = parser.parse_args()
+    main(args.calls, args.latency_ms)
@@ -0,0 +1,97 @@
+"""
+Benchmark: a 4-language agents-as-tools request, translators called in order vs in one turn.
+
+Rebuilds the orchestrator of examples/agent_patterns/agents_as_tools.py against the stand-in
+server. Each translator sub-run takes `--translator-ms`; the Urdu one takes `--slow-ms`. Modes:
+
+    in order            - the old prompt: one translate call per orchestrator turn
+    one turn            - all four calls in one turn, unbounded
+    one turn, cap 2     - `ToolLimiter(max_concurrency=2)`
+    one turn, timeout   - `ToolLimiter(timeout=--timeout)`, which cuts the slow translator short
+
+    python -m testprj.benchmarks.parallel_tools --runs 20 --translator-ms 200 --slow-ms 600
+"""
+
+import argparse
+import asyncio
+import time
+
+from agents import Agent, ModelSettings, Runner, set_tracing_disabled
+
+from testprj import providers
+from testprj.benchmarks.server import StandInServer, system_prompt, text, tool_calls
+from testprj.benchmarks.stats import print_table, summarize
+from testprj.parallel_tools import ToolLimiter
+
+set_tracing_disabled(True)
+
+LANGUAGES = ["spanish", "french", "italian", "urdu"]
+
+
+def responder(translator_s: float, slow_s: float):
+    def respond(request: dict):
+        system = system_prompt(request)
+        if system.startswith("You translate"):
+            return text("Hola", latency=slow_s if "Urdu" in system else translator_s)
+        called = [name for m in request.get("messages", []) for name in
+                  (call["function"]["name"] for call in m.get("tool_calls") or [])]
+        pending = [f"translate_to_{language}" for language in LANGUAGES if f"translate_to_{language}" not in called]
+        if not pending:
+            return text("Hola / Bonjour / Ciao / Salaam", latency=0.02)
+        if "in order" in system:
+            return tool_calls((pending[0], {"input": "Hello"}), latency=0.02)
+        return tool_calls(*[(name, {"input": "Hello"}) for name in pending], latency=0.02)
+
+    return respond
+
+
+def orchestrator(model, in_order: bool, limiter: ToolLimiter | None) -> Agent:
+    translators = [
+        Agent(name=f"{language}_agent", instructions=f"You translate the user's message to {language.title()}",
+              model=model).as_tool(tool_name=f"translate_to_{language}", tool_description=f"Translate to {language}")
+        for language in LANGUAGES
+    ]
+    order = "you call the relevant tools in order." if in_order else "you call all the relevant tools at once."
+    return Agent(
+        name="orchestrator_agent",
+        instructions=f"You are a translation agent. If asked for multiple translations, {order}",
+        tools=limiter.wrap_all(translators) if limiter else translators,
+        model=model,
+        model_settings=ModelSettings(parallel_tool_calls=not in_order),
+    )
+
+
+async def main(runs: int, translator_ms: float, slow_ms: float, timeout: float) -> None:
+    rows = []
+    async with StandInServer(responder(translator_ms / 1000, slow_ms / 1000)) as server:
+        providers.register_provider("standin", server.base_url, api_key="bench")
+        model = providers.get_model("stand-in", provider="standin")
+        modes = {
+            "in order": (True, None),
+            "one turn": (False, None),
+            "one turn, cap 2": (False, ToolLimiter(max_concurrency=2, timeout=None)),
+            "one turn, timeout": (False, ToolLimiter(max_concurrency=4, timeout=timeout)),
+        }
+        for mode, (in_order, limiter) in modes.items():
+            agent = orchestrator(model, in_order, limiter)
+            latencies = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                await Runner.run(agent, "Translate 'Hello' to Spanish, French, Italian and Urdu")
+                latencies.append(time.perf_counter() - start)
+            stats = limiter.stats() if limiter else {}
+            rows.append({"mode": mode, **summarize(latencies), "peak_running": stats.get("peak_running"),
+                         "timeouts": stats.get("timeouts")})
+        await providers.aclose()
+    print(f"{runs} runs; translators {translator_ms:.0f} ms, urdu {slow_ms:.0f} ms, timeout {timeout:g}s")
+    print_table(rows, ["mode", "p50_ms", "p95_ms", "max_ms", "peak_running", "timeouts"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--translator-ms", type=float, default=200)
+    parser.add_argument("--slow-ms", type=float, default=600, help="latency of the Urdu translator")
+    parser.add_argument("--timeout", type=float, default=0.4, help="per-call timeout of the last mode (s)")
+    args = parser.parse_args()
+    asyncio.run(main(args.runs, args.translator_ms, args.slow_ms, args.timeout))
@@ -0,0 +1,184 @@
+"""
+The agent patterns of this repo, runnable against the stand-in server.
+
+`respond(request)` is the scripted "model": it recognises which agent is calling from its system
+prompt and answers the way a real model would for that flow (tool calls first, text after tool
+results, JSON for structured outputs, handoffs for the tutor router...). `PATTERNS` maps a
+pattern name to a coroutine factory that performs ONE run of that flow using the repo's own
+agents, so the benchmark measures the real code paths.
+
+The pattern modules are imported lazily (after the harness has pointed GEMINI_BASE_URL /
+OLLAMA_BASE_URL at the stand-in server), because they create their models at import time.
+"""
+
+import importlib
+import itertools
+from collections.abc import Awaitable, Callable
+
+from agents import Agent, Runner, SQLiteSession
+
+from testprj.benchmarks.server import (
+    Reply,
+    after_tool_call,
+    json_reply,
+    system_prompt,
+    text,
+    tool_calls,
+    tool_names,
+)
+
+
+def _structured(request: dict, payload: dict) -> Reply:
+    # Non-pydantic output types (e.g. the judge's dataclass) are wrapped as {"response": ...}.
+    schema = (request.get("response_format") or {}).get("json_schema", {}).get("schema", {})
+    if set(schema.get("properties", {})) == {"response"} and "response" not in payload:
+        payload = {"response": payload}
+    return json_reply(payload)
+
+
+def _feedback_rounds(request: dict) -> int:
+    return sum(
+        1
+        for message in request.get("messages", [])
+        if message.get("role") == "user" and str(message.get("content", "")).startswith("Feedback:")
+    )
+
+
+def respond(request: dict) -> Reply:
+    system = system_prompt(request)
+    tools = tool_names(request)
+
+    # practices/handOff.py: the main agent hands off, the tutor answers
+    if system.startswith("You are a main agent"):
+        target = "transfer_to_math_tutor" if "transfer_to_math_tutor" in tools else tools[0]
+        return tool_calls((target, {}))
+    if "tutor" in system:
+        return text("The integral of 1/x is ln|x| + C.")
+
+    # practices/toolCalling.py runAgentAsync: arithmetic + two cities in one parallel turn
+    if "get_current_weather" in tools:
+        if after_tool_call(request):
+            return text("1+1-200*200/50 = -798. Karachi and Lahore are clear and 31.5°C.")
+        return tool_calls(
+            ("multiply", {"a": 200, "b": 200}),
+            ("divide", {"a": 40000, "b": 50}),
+            ("add", {"a": 1, "b": 1}),
+            ("subtract", {"a": 2, "b": 800}),
+            ("get_current_weather", {"city": "karachi"}),
+            ("get_current_weather", {"city": "lahore"}),
+        )
+
+    # examples/agent_patterns/agents_as_tools.py: orchestrator fans out to translators
+    if system.startswith("You are a translation agent"):
+        if after_tool_call(request):
+            return text("Hola / Bonjour")
+        return tool_calls(
+            ("translate_to_spanish", {"input": "Hello"}),
+            ("translate_to_french", {"input": "Hello"}),
+        )
+    if system.startswith("You translate the user's message to"):
+        return text("Hola, ¿cómo estás?")
+    if system.startswith("You pick the best Spanish translation"):
+        return text("Hola, ¿cómo estás?")
+
+    # examples/agent_patterns/llm_as_a_judge.py: pass on the third outline
+    if system.startswith("You generate a very short story outline"):
+        return text("A lighthouse keeper finds a door in the fog that opens onto yesterday.")
+    if system.startswith("You evaluate a story outline"):
+        score = "pass" if _feedback_rounds(request) >= 2 else "needs_improvement"
+        return _structured(request, {"feedback": "Give the keeper a clearer goal.", "score": score})
+
+    # guardrail agents
+    if system.startswith("Check if the user input is containing any sensitive"):
+        return _structured(request, {"reasoning": "benign", "is_sensitive_input": False, "sensitive_words": []})
+    if system.startswith("Check if the user is asking you to do their math homework"):
+        return _structured(request, {"is_math_homework": False, "reasoning": "benign"})
+    if system.startswith("Check if the output includes any math"):
+        return _structured(request, {"reasoning": "no math", "is_math": False})
+
+    # examples/agent_patterns/output_guardrails.py: structured MessageOutput
+    if request.get("response_format"):
+        return _structured(request, {
+            "reasoning": "Simple factual question.",
+            "response": "Sacramento is the capital of California.",
+            "user_name": None,
+            "is_game_or_sports_related": False,
+        })
+
+    return text("The capital of a black hole is not defined, it is a region of spacetime.")
+
+
+def _module(name: str):
+    return importlib.import_module(f"testprj.{name}")
+
+
+async def run_simple_agent() -> None:
+    simple = _module("practices.simpleAgent")
+    agent = Agent(name="Assistant", instructions="You are a helpful assistant", model=simple.model)
+    await Runner.run(agent, "What is the capital of blackHole?")
+
+
+async def run_streaming() -> None:
+    streaming = _module("practices.streaming")
+    agent = Agent(name="Assistant", instructions="You are a helpful assistant", model=streaming.model)
+    result = Runner.run_streamed(agent, "Who is the president of the United States?")
+    async for _ in result.stream_events():
+        pass
+
+
+async def run_tool_calling() -> None:
+    await _module("practices.toolCalling").runAgentAsync()
+
+
+async def run_handoff() -> None:
+    hand_off = _module("practices.handOff")
+    await Runner.run(hand_off.agent_f_1, "what is the integral of 1/x and who is the founder of india?")
+
+
+async def run_agents_as_tools() -> None:
+    agents_as_tools = _module("examples.agent_patterns.agents_as_tools")
+    await Runner.run(agents_as_tools.orchestrator_agent, "Translate 'Hello' to Spanish and French")
+
+
+async def run_parallelization() -> None:
+    await _module("examples.agent_patterns.parallelization_agent").pick_best_translation("Hello, how are you?")
+
+
+async def run_llm_as_a_judge() -> None:
+    await _module("examples.agent_patterns.llm_as_a_judge").generate_outline("A ghost story at sea")
+
+
+async def run_input_guardrails() -> None:
+    input_guardrails = _module("examples.agent_patterns.input_guardrails")
+    await Runner.run(input_guardrails.agent, [{"role": "user", "content": "How do I reset my password?"}])
+
+
+async def run_output_guardrails() -> None:
+    output_guardrails = _module("examples.agent_patterns.output_guardrails")
+    await Runner.run(output_guardrails.agent, "What's the capital of California?")
+
+
+_session_ids = itertools.count()
+
+
+async def run_agent_session() -> None:
+    agent_session = _module("examples.agent_session")
+    session = SQLiteSession(f"bench_{next(_session_ids)}")  # in-memory database per conversation
+    for turn in ("Hi, I'm Sam.", "What's my name?", "Thanks!"):
+        await Runner.run(agent_session.agent, turn, session=session)
+    await session.get_items(limit=2)
+    session.close()
+
+
+PATTERNS: dict[str, Callable[[], Awaitable[None]]] = {
+    "simple_agent": run_simple_agent,
+    "streaming": run_streaming,
+    "tool_calling": run_tool_calling,
+    "handoff": run_handoff,
+    "agents_as_tools": run_agents_as_tools,
+    "parallelization": run_parallelization,
+    "llm_as_a_judge": run_llm_as_a_judge,
+    "input_guardrails": run_input_guardrails,
+    "output_guardrails": run_output_guardrails,
+    "agent_session": run_agent_session,
+}
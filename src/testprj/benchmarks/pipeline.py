@@ -0,0 +1,130 @@
+"""
+Benchmark: the deterministic story flow as a checkpointed pipeline.
+
+Runs `story_pipeline` of examples/agent_patterns/deterministic.py against the stand-in server
+(outline `--outline-ms`, check `--check-ms`, story `--story-ms`). Rows:
+
+    full run                - a new run_id: every stage calls the model
+    resume after failure    - the story model answered HTTP 500 the first time; the re-run (same
+                              run_id) only runs the story stage
+    repeat (all cached)     - the same run_id again: every stage is served from its checkpoint
+    two checks, chained     - quality and genre checked by two agents one after the other
+    two checks, concurrent  - the same two checks as independent stages of one DAG
+
+    python -m testprj.benchmarks.pipeline --runs 20
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib
+import io
+import json
+import os
+import tempfile
+import time
+import uuid
+
+from agents import Agent, set_tracing_disabled
+
+from testprj import providers
+from testprj.benchmarks.server import StandInServer, json_reply, system_prompt, text
+from testprj.benchmarks.stats import print_table, summarize
+from testprj.pipeline import Pipeline, Stage, StageStore
+
+set_tracing_disabled(True)
+
+
+class FlakyStoryServer(StandInServer):
+    """Stand-in whose story stage answers HTTP 500 while `story_down` is set."""
+
+    story_down = False
+
+    async def handle(self, method, path, query, body):
+        if self.story_down and system_prompt(json.loads(body or b"{}")).startswith("Write a short story"):
+            return 500, {"error": {"message": "story model unavailable"}}
+        return await super().handle(method, path, query, body)
+
+
+def responder(outline_s: float, check_s: float, story_s: float):
+    def respond(request: dict):
+        system = system_prompt(request)
+        if system.startswith("Generate a very short story outline"):
+            return text("A lighthouse keeper hears knocking from inside the sealed lamp room.", latency=outline_s)
+        if system.startswith(("Read the given story outline", "Judge only")):
+            return json_reply({"good_quality": True, "is_horror": True}, latency=check_s)
+        return text("The knocking stopped at midnight. " * 20, latency=story_s)
+
+    return respond
+
+
+async def _timed(run, runs: int) -> dict:
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await run()
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+
+async def main(runs: int, outline_ms: float, check_ms: float, story_ms: float) -> None:
+    rows = []
+    async with FlakyStoryServer(responder(outline_ms / 1000, check_ms / 1000, story_ms / 1000)) as server:
+        os.environ["GEMINI_BASE_URL"] = server.base_url
+        os.environ["PIPELINE_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "pipeline.db")
+        with contextlib.redirect_stdout(io.StringIO()):
+            deterministic = importlib.import_module("testprj.examples.agent_patterns.deterministic")
+            pipeline = deterministic.story_pipeline
+            # (the stand-in always returns the same outline, so after the first run the checker's
+            # verdict comes from its response cache - full runs cost outline + story)
+            prompts = iter(range(10**9))
+
+            async def full():
+                await pipeline.run(f"A horror story #{next(prompts)}", run_id=uuid.uuid4().hex)
+
+            async def resume():
+                run_id, prompt = uuid.uuid4().hex, f"A horror story #{next(prompts)}"
+                server.story_down = True  # (the client's retries also get a 500)
+                failed = await pipeline.run(prompt, run_id=run_id)
+                server.story_down = False
+                assert failed.failed_stage == "story"
+                start = time.perf_counter()
+                await pipeline.run(prompt, run_id=run_id)
+                return time.perf_counter() - start
+
+            rows.append({"mode": "full run", **await _timed(full, runs)})
+            resumed = [await resume() for _ in range(runs)]
+            rows.append({"mode": "resume after failure", **summarize(resumed)})
+            await pipeline.run("A horror story", run_id="repeat")
+            rows.append({"mode": "repeat (all cached)",
+                         **await _timed(lambda: pipeline.run("A horror story", run_id="repeat"), runs)})
+
+            model = providers.get_model("gemini-1.5-flash")
+            checker = lambda name, what: Agent(name=name, instructions=f"Judge only {what} of the outline.",
+                                               output_type=deterministic.OutlineCheckerOutput, model=model)
+            chained = Pipeline([
+                Stage("outline", deterministic.story_outline_agent),
+                Stage("quality", checker("quality", "the quality"), after=["outline"]),
+                Stage("genre", checker("genre", "the genre"), after=["outline", "quality"],
+                      prompt=lambda out: out["outline"]),
+            ], store=StageStore())
+            concurrent = Pipeline([
+                Stage("outline", deterministic.story_outline_agent),
+                Stage("quality", checker("quality", "the quality"), after=["outline"]),
+                Stage("genre", checker("genre", "the genre"), after=["outline"]),
+            ], store=StageStore())
+            for mode, dag in (("two checks, chained", chained), ("two checks, concurrent", concurrent)):
+                rows.append({"mode": mode, **await _timed(lambda: dag.run("A horror story", run_id=uuid.uuid4().hex), runs)})
+        await providers.aclose()
+    print(f"{runs} runs per row; outline {outline_ms:.0f} ms, check {check_ms:.0f} ms, story {story_ms:.0f} ms")
+    print_table(rows, ["mode", "p50_ms", "p95_ms", "max_ms"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--outline-ms", type=float, default=150)
+    parser.add_argument("--check-ms", type=float, default=100)
+    parser.add_argument("--story-ms", type=float, default=400)
+    args = parser.parse_args()
+    asyncio.run(main(args.runs, args.outline_ms, args.check_ms, args.story_ms))
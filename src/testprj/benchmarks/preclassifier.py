@@ -0,0 +1,118 @@
+"""
+Benchmark: LLM-only input guardrail vs the tiered guardrail (keywords + classifier + LLM).
+
+Streams `--messages` synthetic support messages (`--harmful` share are abusive / leak sensitive
+data) through a sensitive-input guardrail. The stand-in "LLM" judges with an oracle and takes
+`--latency` per call. The tiered guardrail starts untrained, logs every escalated verdict and
+refits its classifier every `--retrain-every` verdicts, so later traffic is mostly decided
+locally. Reports guardrail model calls, local-decision rate, agreement with the oracle and
+per-check latency.
+
+    python -m testprj.benchmarks.preclassifier --messages 2000 --harmful 0.1
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from agents import Agent, GuardrailFunctionOutput, RunContextWrapper, Runner, set_tracing_disabled
+from pydantic import BaseModel
+
+from testprj import providers
+from testprj.benchmarks.server import StandInServer, json_reply, last_message
+from testprj.benchmarks.stats import print_table, summarize
+from testprj.preclassifier import PreClassifier
+
+set_tracing_disabled(True)
+
+BENIGN = [
+    "how do I reset my {thing}", "where is my {thing}", "can I change the {thing} on my account",
+    "my {thing} arrived damaged", "what is the status of my {thing}", "is there a discount on the {thing}",
+    "I want to return the {thing}", "please update my {thing}", "when will the {thing} be delivered",
+]
+HARMFUL = [
+    "you useless {insult}, fix my {thing} or I will find you", "my card number is 4111 1111 1111 {n}",
+    "here is my ssn {n}-22-{n} for the {thing}", "shut up you {insult}", "I will hurt you if the {thing} is late",
+    "my bank login is admin pass {n} for the {thing}",
+]
+THINGS = ["order", "password", "invoice", "subscription", "address", "parcel", "refund", "account", "laptop"]
+INSULTS = ["moron", "clown", "piece of junk", "waste of space"]
+ORACLE = ("useless", "card number", "ssn", "shut up", "hurt you", "bank login")
+
+
+class SensitiveInput(BaseModel):
+    reasoning: str
+    is_sensitive_input: bool
+
+
+def _traffic(count: int, harmful: float, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        template = rng.choice(HARMFUL if rng.random() < harmful else BENIGN)
+        messages.append(template.format(thing=rng.choice(THINGS), insult=rng.choice(INSULTS), n=rng.randint(10, 99)))
+    return messages
+
+
+def _oracle(text: str) -> bool:
+    return any(term in text.lower() for term in ORACLE)
+
+
+def _respond(request: dict):
+    content = last_message(request).get("content") or ""
+    return json_reply({"reasoning": "oracle", "is_sensitive_input": _oracle(str(content))})
+
+
+async def main(messages: int, harmful: float, latency: float, retrain_every: int, seed: int) -> None:
+    traffic = _traffic(messages, harmful, seed)
+    rows = []
+    async with StandInServer(_respond, latency=latency) as server:
+        providers.register_provider("standin", server.base_url, api_key="bench")
+        guardrail_agent = Agent(
+            name="Guardrail check", instructions="Check if the user input is containing any sensitive or abusive information.",
+            output_type=SensitiveInput, model=providers.get_model("stand-in", provider="standin"),
+        )
+
+        async def llm_check(ctx, agent, input) -> GuardrailFunctionOutput:
+            result = await Runner.run(guardrail_agent, input, context=ctx.context)
+            return GuardrailFunctionOutput(output_info=result.final_output,
+                                           tripwire_triggered=result.final_output.is_sensitive_input)
+
+        precheck = PreClassifier(
+            block_terms=["kill you", "credit card number", "social security number", "my password is"],
+            allow_terms=["hi", "hello", "thanks", "thank you"],
+            retrain_every=retrain_every,
+        )
+        for mode, check in [("llm only", llm_check), ("tiered", precheck.guard(llm_check))]:
+            server.reset_stats()
+            latencies, agree = [], 0
+            ctx = RunContextWrapper(context=None)
+            start = time.perf_counter()
+            for text in traffic:
+                t0 = time.perf_counter()
+                result = await check(ctx, None, text)
+                latencies.append(time.perf_counter() - t0)
+                agree += result.tripwire_triggered == _oracle(text)
+                await asyncio.sleep(0)  # let a pending background refit get scheduled
+            wall = time.perf_counter() - start
+            local = precheck.stats()["local_rate"] if mode == "tiered" else 0.0
+            rows.append({"mode": mode, "model_calls": server.requests_served, "local_rate": local,
+                         "agreement": agree / len(traffic), "wall_s": wall, **summarize(latencies)})
+        await providers.aclose()
+
+    print(f"{messages} messages, {harmful:.0%} harmful, guardrail model latency {latency * 1000:.0f} ms")
+    print_table(rows, ["mode", "model_calls", "local_rate", "agreement", "wall_s", "p50_ms", "p95_ms", "p99_ms"])
+    print("tiered stages:", json.dumps(precheck.stats()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--harmful", type=float, default=0.1, help="share of harmful messages")
+    parser.add_argument("--latency", type=float, default=0.01, help="simulated guardrail model latency (s)")
+    parser.add_argument("--retrain-every", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    asyncio.run(main(args.messages, args.harmful, args.latency, args.retrain_every, args.seed))
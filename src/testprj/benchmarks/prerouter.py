@@ -0,0 +1,107 @@
+"""
+Benchmark: first-message routing in agent_routing.py, triage model call vs the pre-router.
+
+Sends `--requests` first messages (Spanish, French, English, and a `--ambiguous` share of short or
+mixed ones like "ok" or "1+1?") to examples/agent_patterns/agent_routing.py against the stand-in
+server (`--latency-ms` per model call). The stand-in triage agent hands off to the right language
+agent by oracle. Modes:
+
+    triage always  - every message starts on triage_agent (handoff call + answer call)
+    pre-router     - language_router.select(msg): confident messages start on the language agent
+
+`misrouted` counts runs that ended on a different language agent than the oracle's (ambiguous
+messages have no oracle answer and never count). Messages asking for a language in another one
+("Please reply in French: ...") must reach that language's agent.
+
+    python -m testprj.benchmarks.prerouter --requests 300 --ambiguous 0.2
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib
+import io
+import os
+import random
+import time
+
+from agents import Runner, set_tracing_disabled
+
+from testprj import providers
+from testprj.benchmarks.server import StandInServer, last_message, system_prompt, text, tool_calls
+from testprj.benchmarks.stats import print_table, summarize
+from testprj.prerouter import PreRouter
+
+set_tracing_disabled(True)
+
+MESSAGES = {
+    "spanish": ["Hola, ¿cómo estás?", "Necesito ayuda con mi pedido, por favor", "¿Dónde está la estación de tren?",
+                "Quiero cambiar la dirección de mi cuenta", "Buenos días, ¿qué hora es?",
+                "Answer in Spanish please: where is the train station?"],
+    "french": ["Bonjour, je voudrais de l'aide avec mon compte", "Où est la gare, s'il vous plaît ?",
+               "Je ne comprends pas ma facture", "Pouvez-vous m'aider avec ma commande ?", "Merci, ça marche très bien",
+               "Please reply in French: what is the weather like today?"],
+    "english": ["What is the weather like in Paris today?", "Can you help me with my order please?",
+                "How do I reset the password on my account?", "Tell me about the history of Rome",
+                "What is 12 times 7?"],
+}
+AMBIGUOUS = ["ok", "hi", "1+1?", "Hola", "merci", "Can you help me with mi cuenta", "?"]
+
+
+def _traffic(count: int, ambiguous: float, seed: int) -> list[tuple[str, str | None]]:
+    rng = random.Random(seed)
+    traffic = []
+    for _ in range(count):
+        if rng.random() < ambiguous:
+            traffic.append((rng.choice(AMBIGUOUS), None))
+        else:
+            language = rng.choice(list(MESSAGES))
+            traffic.append((rng.choice(MESSAGES[language]), language))
+    return traffic
+
+
+def responder(oracle: dict[str, str | None], latency_s: float):
+    def respond(request: dict):
+        system = system_prompt(request)
+        if system.startswith("You are the main triage agent"):
+            language = oracle.get(str(last_message(request).get("content", ""))) or "english"
+            return tool_calls((f"transfer_to_{language}_agent", {}), latency=latency_s)
+        return text("¡Claro! / Bien sûr ! / Sure!", latency=latency_s)
+
+    return respond
+
+
+async def main(requests: int, ambiguous: float, latency_ms: float) -> None:
+    traffic = _traffic(requests, ambiguous, seed=0)
+    oracle = dict(traffic)
+    rows = []
+    async with StandInServer(responder(oracle, latency_ms / 1000)) as server:
+        os.environ["OLLAMA_BASE_URL"] = server.base_url
+        with contextlib.redirect_stdout(io.StringIO()):
+            routing = importlib.import_module("testprj.examples.agent_patterns.agent_routing")
+        for mode in ("triage always", "pre-router"):
+            router = PreRouter(routing.language_routes, fallback=routing.triage_agent, defer=routing.language_requests)
+            server.reset_stats()
+            latencies, misrouted = [], 0
+            for msg, language in traffic:
+                start = time.perf_counter()
+                agent = router.select(msg) if mode == "pre-router" else routing.triage_agent
+                result = await Runner.run(agent, [{"content": msg, "role": "user"}])
+                latencies.append(time.perf_counter() - start)
+                misrouted += language is not None and result.last_agent.name != f"{language}_agent"
+            saved = router.stats() if mode == "pre-router" else {"triage_calls_saved": 0, "saved_rate": 0.0}
+            rows.append({"mode": mode, **summarize(latencies), "model_calls": server.requests_served,
+                         "triage_calls_saved": saved["triage_calls_saved"], "saved_rate": saved["saved_rate"],
+                         "misrouted": misrouted})
+        await providers.aclose()
+    print(f"{requests} first messages, {ambiguous:.0%} ambiguous; model {latency_ms:.0f} ms per call")
+    print_table(rows, ["mode", "p50_ms", "p95_ms", "model_calls", "triage_calls_saved", "saved_rate", "misrouted"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--ambiguous", type=float, default=0.2, help="share of short / mixed messages")
+    parser.add_argument("--latency-ms", type=float, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.ambiguous, args.latency_ms))
@@ -0,0 +1,82 @@
+"""
+Benchmark: one AsyncOpenAI client per module vs the shared provider registry.
+
+Simulates `--modules` flows loaded into one worker (the repo has ~25 scripts that each used to
+build their own client). Traffic arrives in bursts, each burst hitting one random module with
+`--burst` concurrent agent runs. With per-module clients every module warms up its own pool, so
+the server sees many more TCP connections; with the registry every burst reuses the same warm,
+keep-alive sockets.
+
+    python -m testprj.benchmarks.provider_pool --modules 20 --waves 40 --burst 16
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from agents import Agent, AsyncOpenAI, OpenAIChatCompletionsModel, Runner, set_tracing_disabled
+
+from testprj import providers
+from testprj.benchmarks.server import StandInServer
+from testprj.benchmarks.stats import print_table, summarize
+
+set_tracing_disabled(True)
+
+
+async def _run_waves(agents: list[Agent], waves: int, burst: int, seed: int) -> list[float]:
+    rng = random.Random(seed)
+    latencies: list[float] = []
+
+    async def one(agent: Agent) -> None:
+        start = time.perf_counter()
+        await Runner.run(agent, "ping")
+        latencies.append(time.perf_counter() - start)
+
+    for _ in range(waves):
+        agent = rng.choice(agents)
+        await asyncio.gather(*(one(agent) for _ in range(burst)))
+    return latencies
+
+
+async def main(modules: int, waves: int, burst: int, latency: float, seed: int) -> None:
+    rows = []
+    async with StandInServer(latency=latency) as server:
+        # 1. the old pattern: every module builds its own client (and connection pool)
+        clients = [AsyncOpenAI(api_key="bench", base_url=server.base_url) for _ in range(modules)]
+        agents = [
+            Agent(name=f"module_{i}", instructions="bench", model=OpenAIChatCompletionsModel("stand-in", client))
+            for i, client in enumerate(clients)
+        ]
+        server.reset_stats()
+        latencies = await _run_waves(agents, waves, burst, seed)
+        rows.append({"mode": "per-module clients", "connections": server.connections_opened,
+                     "peak_open": server.peak_open_connections, **summarize(latencies)})
+        for client in clients:
+            await client.close()
+
+        # 2. the registry: every module asks for its model from the one shared pool
+        providers.register_provider("standin", server.base_url, api_key="bench")
+        agents = [
+            Agent(name=f"module_{i}", instructions="bench", model=providers.get_model("stand-in", provider="standin"))
+            for i in range(modules)
+        ]
+        server.reset_stats()
+        latencies = await _run_waves(agents, waves, burst, seed)
+        rows.append({"mode": "shared registry", "connections": server.connections_opened,
+                     "peak_open": server.peak_open_connections, **summarize(latencies)})
+        await providers.aclose()
+
+    print(f"{modules} modules, {waves} bursts x {burst} concurrent runs, server latency {latency * 1000:.0f} ms")
+    print_table(rows, ["mode", "connections", "peak_open", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", type=int, default=20)
+    parser.add_argument("--waves", type=int, default=40)
+    parser.add_argument("--burst", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.005, help="simulated model latency (s)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    asyncio.run(main(args.modules, args.waves, args.burst, args.latency, args.seed))
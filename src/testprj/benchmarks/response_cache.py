@@ -0,0 +1,109 @@
+"""
+Benchmark: repeated guardrail checks with and without the response cache.
+
+A guardrail-style agent (structured output) is asked `--checks` questions drawn from `--distinct`
+different inputs, the way a chat guardrail keeps seeing the same short messages. Compares the
+plain model, the in-memory cache and a "restarted worker" that only has the SQLite tier warm.
+
+    python -m testprj.benchmarks.response_cache --checks 500 --distinct 25
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from agents import Agent, ModelSettings, ModelTracing, Runner, set_tracing_disabled
+from pydantic import BaseModel
+
+from testprj import providers
+from testprj.benchmarks.server import StandInServer, json_reply
+from testprj.benchmarks.stats import print_table, summarize
+from testprj.response_cache import ResponseCache, cached
+
+set_tracing_disabled(True)
+
+
+class Verdict(BaseModel):
+    reasoning: str
+    is_sensitive_input: bool
+
+
+async def _run_checks(agent: Agent, inputs: list[str], concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one(text: str) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await Runner.run(agent, text)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(text) for text in inputs))
+    return latencies
+
+
+async def _model_hit_latency(cache: ResponseCache, model, samples: int = 2000) -> dict[str, float]:
+    """Cost of a cache hit at the model layer alone (no Runner overhead)."""
+    wrapped = cached(model, cache)
+    args = ("check", "message 0", ModelSettings(), [], None, [], ModelTracing.DISABLED)
+    await wrapped.get_response(*args, previous_response_id=None, prompt=None)
+    latencies = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        await wrapped.get_response(*args, previous_response_id=None, prompt=None)
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+
+async def main(checks: int, distinct: int, concurrency: int, latency: float, seed: int) -> None:
+    rng = random.Random(seed)
+    inputs = [f"message {min(int(rng.paretovariate(1.2)) - 1, distinct - 1)}" for _ in range(checks)]
+    path = os.path.join(tempfile.mkdtemp(), "response_cache.sqlite3")
+    rows = []
+
+    responder = lambda request: json_reply({"reasoning": "benign", "is_sensitive_input": False})  # noqa: E731
+    async with StandInServer(responder, latency=latency) as server:
+        providers.register_provider("standin", server.base_url, api_key="bench")
+        model = providers.get_model("stand-in", provider="standin")
+
+        def agent(model) -> Agent:
+            return Agent(name="Guardrail check", instructions="check", output_type=Verdict, model=model)
+
+        memory_and_disk = ResponseCache(path=path)
+        for mode, model_for_mode, cache in [
+            ("uncached", model, None),
+            ("memory + sqlite", cached(model, memory_and_disk), memory_and_disk),
+            ("restarted (sqlite warm)", None, None),
+        ]:
+            if model_for_mode is None:
+                cache = ResponseCache(path=path)  # fresh process: empty memory, same file
+                model_for_mode = cached(model, cache)
+            server.reset_stats()
+            start = time.perf_counter()
+            latencies = await _run_checks(agent(model_for_mode), inputs, concurrency)
+            wall = time.perf_counter() - start
+            stats = cache.stats() if cache else {"hit_rate": 0.0}
+            rows.append({"mode": mode, "model_calls": server.requests_served, "hit_rate": stats["hit_rate"],
+                         "wall_s": wall, **summarize(latencies)})
+
+        hit = await _model_hit_latency(ResponseCache(), model)
+        await providers.aclose()
+
+    print(f"{checks} checks over {distinct} distinct inputs, concurrency {concurrency}, "
+          f"model latency {latency * 1000:.0f} ms")
+    print_table(rows, ["mode", "model_calls", "hit_rate", "wall_s", "p50_ms", "p95_ms", "p99_ms"])
+    print(f"memory hit at the model layer: p50 {hit['p50_ms'] * 1000:.1f} us, p99 {hit['p99_ms'] * 1000:.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checks", type=int, default=500)
+    parser.add_argument("--distinct", type=int, default=25)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.2, help="simulated model latency (s)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    asyncio.run(main(args.checks, args.distinct, args.concurrency, args.latency, args.seed))
@@ -0,0 +1,341 @@
+"""
+Local HTTP stand-ins for benchmarks.
+
+`LocalHttpServer` is a minimal HTTP/1.1 (keep-alive) server on asyncio streams that counts the
+TCP connections it accepts. `StandInServer` answers `POST /v1/chat/completions` like an
+OpenAI-compatible endpoint - plain JSON or SSE streaming, text or tool calls - driven by a
+scripted `responder(request) -> Reply`. Use `serve_in_thread` when the code under test may block
+the event loop (a server on the same loop could then never answer), or to keep the server's own
+work out of event-loop lag measurements.
+"""
+
+import asyncio
+import contextlib
+import json
+import threading
+import time
+import uuid
+from collections.abc import AsyncIterator, Callable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+
+class LocalHttpServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.connections_opened = 0
+        self.open_connections = 0
+        self.peak_open_connections = 0
+        self.requests_served = 0
+        self.streams_completed = 0  # SSE responses written to the end (not abandoned by the client)
+        self._server: asyncio.base_events.Server | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def handle(
+        self, method: str, path: str, query: dict[str, str], body: bytes
+    ) -> tuple[int, dict | AsyncIterator[dict]]:
+        """Return (status, json payload), or (status, async iterator of events) for SSE. Override in subclasses."""
+        return 404, {"error": {"message": f"no route for {method} {path}"}}
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):  # wait_closed() (3.12+) would wait on idle keep-alive clients
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    def reset_stats(self) -> None:
+        self.connections_opened = 0
+        self.peak_open_connections = self.open_connections
+        self.requests_served = 0
+        self.streams_completed = 0
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        self.connections_opened += 1
+        self.open_connections += 1
+        self.peak_open_connections = max(self.peak_open_connections, self.open_connections)
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        key, value = line.split(":", 1)
+                        headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", "0")))
+                method, target, _ = request_line.split(" ", 2)
+                url = urlsplit(target)
+                query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                keep_alive = headers.get("connection", "keep-alive").lower() != "close"
+
+                status, payload = await self.handle(method, url.path, query, body)
+                if isinstance(payload, dict):
+                    self._write_json(writer, status, payload)
+                    await writer.drain()
+                else:
+                    await self._write_sse(writer, status, payload)
+                    self.streams_completed += 1
+                self.requests_served += 1
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.open_connections -= 1
+            self._writers.discard(writer)
+            writer.close()
+
+    @staticmethod
+    def _write_json(writer: asyncio.StreamWriter, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            "Connection: keep-alive\r\n\r\n".encode() + data
+        )
+
+    @staticmethod
+    async def _write_sse(writer: asyncio.StreamWriter, status: int, events: AsyncIterator[dict]) -> None:
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}\r\n"
+            "Content-Type: text/event-stream\r\n"
+            "Transfer-Encoding: chunked\r\n"
+            "Connection: keep-alive\r\n\r\n".encode()
+        )
+
+        def chunk(data: bytes) -> bytes:
+            return f"{len(data):x}\r\n".encode() + data + b"\r\n"
+
+        async for event in events:
+            writer.write(chunk(b"data: " + json.dumps(event).encode() + b"\n\n"))
+            await writer.drain()
+        writer.write(chunk(b"data: [DONE]\n\n") + b"0\r\n\r\n")
+        await writer.drain()
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+@dataclass
+class Reply:
+    """One scripted model answer: text, tool calls, or both."""
+
+    content: str | None = None
+    tool_calls: list[tuple[str, dict]] = field(default_factory=list)
+    latency: float | None = None  # overrides the server latency for this answer
+
+
+def text(content: str, latency: float | None = None) -> Reply:
+    return Reply(content=content, latency=latency)
+
+
+def json_reply(payload: Any, latency: float | None = None) -> Reply:
+    """Structured output (agents with an `output_type`) is just JSON in the message content."""
+    return Reply(content=json.dumps(payload), latency=latency)
+
+
+def tool_calls(*calls: tuple[str, dict], latency: float | None = None) -> Reply:
+    return Reply(tool_calls=list(calls), latency=latency)
+
+
+Responder = Callable[[dict], Reply | str]
+
+
+class StandInServer(LocalHttpServer):
+    def __init__(
+        self,
+        responder: str | Responder = "ok",
+        latency: float = 0.0,
+        chunk_delay: float = 0.0,
+        words_per_chunk: int = 1,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        super().__init__(host, port)
+        self.responder = responder
+        self.latency = latency  # simulated model time (to first token when streaming), in seconds
+        self.chunk_delay = chunk_delay  # simulated time between streamed chunks
+        self.words_per_chunk = words_per_chunk
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.url}/v1"
+
+    def reply_for(self, request: dict) -> Reply:
+        reply = self.responder(request) if callable(self.responder) else self.responder
+        return text(reply) if isinstance(reply, str) else reply
+
+    async def handle(self, method, path, query, body):
+        if method != "POST" or not path.rstrip("/").endswith("/chat/completions"):
+            return await super().handle(method, path, query, body)
+        request = json.loads(body or b"{}")
+        reply = self.reply_for(request)
+        model = request.get("model", "stand-in")
+        latency = self.latency if reply.latency is None else reply.latency
+        if request.get("stream"):
+            return 200, self._stream(model, reply, latency, _prompt_tokens(request))
+        if latency:
+            await asyncio.sleep(latency)
+        return 200, completion_payload(model, reply, _prompt_tokens(request))
+
+    async def _stream(self, model: str, reply: Reply, latency: float, prompt_tokens: int = 10) -> AsyncIterator[dict]:
+        if latency:
+            await asyncio.sleep(latency)
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+        def event(delta: dict, finish_reason: str | None = None, usage: dict | None = None) -> dict:
+            payload = {
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            if usage:
+                payload["usage"] = usage
+            return payload
+
+        first = True
+        if reply.content:
+            words = reply.content.split(" ")
+            for i in range(0, len(words), self.words_per_chunk):
+                piece = " ".join(words[i : i + self.words_per_chunk])
+                if i + self.words_per_chunk < len(words):
+                    piece += " "
+                yield event({"role": "assistant", "content": piece} if first else {"content": piece})
+                first = False
+                if self.chunk_delay:
+                    await asyncio.sleep(self.chunk_delay)
+        for index, call in enumerate(_tool_call_payloads(reply)):
+            head = {"index": index, "id": call["id"], "type": "function",
+                    "function": {"name": call["function"]["name"], "arguments": ""}}
+            yield event({"role": "assistant", "tool_calls": [head]} if first else {"tool_calls": [head]})
+            first = False
+            yield event({"tool_calls": [{"index": index, "function": {"arguments": call["function"]["arguments"]}}]})
+        yield event({}, "tool_calls" if reply.tool_calls else "stop", usage=_usage(reply, prompt_tokens))
+
+
+class FakeWeatherServer(LocalHttpServer):
+    """Answers OpenWeatherMap-style `GET .../weather?q=<city>` lookups."""
+
+    def __init__(self, latency: float = 0.01, host: str = "127.0.0.1", port: int = 0):
+        super().__init__(host, port)
+        self.latency = latency
+
+    @property
+    def weather_url(self) -> str:
+        return f"{self.url}/data/2.5/weather"
+
+    async def handle(self, method, path, query, body):
+        if not path.endswith("/weather"):
+            return await super().handle(method, path, query, body)
+        await asyncio.sleep(self.latency)
+        return 200, {"name": query.get("q"), "weather": [{"description": "clear sky"}], "main": {"temp": 31.5}}
+
+
+@contextlib.contextmanager
+def serve_in_thread(server: LocalHttpServer) -> Iterator[LocalHttpServer]:
+    """Run `server` on its own event loop in a daemon thread for the duration of the block."""
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def run() -> None:
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.start())
+        started.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, name=f"{type(server).__name__}-loop", daemon=True)
+    thread.start()
+    started.wait()
+    try:
+        yield server
+    finally:
+        asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+def completion_payload(model: str, reply: Reply | str, prompt_tokens: int = 10) -> dict:
+    if isinstance(reply, str):
+        reply = text(reply)
+    message: dict[str, Any] = {"role": "assistant", "content": reply.content}
+    if reply.tool_calls:
+        message["tool_calls"] = _tool_call_payloads(reply)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {"index": 0, "message": message, "finish_reason": "tool_calls" if reply.tool_calls else "stop"}
+        ],
+        "usage": _usage(reply, prompt_tokens),
+    }
+
+
+def _tool_call_payloads(reply: Reply) -> list[dict]:
+    return [
+        {"id": f"call_{uuid.uuid4().hex[:12]}", "type": "function",
+         "function": {"name": name, "arguments": json.dumps(arguments)}}
+        for name, arguments in reply.tool_calls
+    ]
+
+
+def _usage(reply: Reply, prompt_tokens: int = 10) -> dict:
+    completion = len((reply.content or "").split()) + 8 * len(reply.tool_calls)
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion, "total_tokens": prompt_tokens + completion}
+
+
+def _prompt_tokens(request: dict) -> int:
+    """A rough prompt size (about 4 characters per token) so usage scales with the request."""
+    return len(json.dumps([request.get("messages"), request.get("tools"), request.get("response_format")])) // 4
+
+
+# Helpers for writing responders: what the model is being asked, and by whom.
+
+
+def system_prompt(request: dict) -> str:
+    messages = request.get("messages") or []
+    if messages and messages[0].get("role") == "system":
+        return messages[0].get("content") or ""
+    return ""
+
+
+def last_message(request: dict) -> dict:
+    messages = request.get("messages") or [{}]
+    return messages[-1]
+
+
+def after_tool_call(request: dict) -> bool:
+    """True when the model is being called back with tool results."""
+    return last_message(request).get("role") == "tool"
+
+
+def tool_names(request: dict) -> list[str]:
+    return [tool["function"]["name"] for tool in request.get("tools") or []]
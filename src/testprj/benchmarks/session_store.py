@@ -0,0 +1,122 @@
+"""
+Benchmark: SDK `SQLiteSession` vs `SessionStore` (WAL, batched writer, (session_id, seq) key).
+
+Both databases are seeded with `--sessions` conversations of `--items` items each, then measured
+under load:
+
+    append     - `--concurrency` sessions each append one turn (user + assistant item) at a time
+    tail read  - `get_items(limit=2)` on random sessions, `--concurrency` at a time
+    full read  - `get_items()` on random sessions
+
+    python -m testprj.benchmarks.session_store --sessions 10000 --items 1000
+
+(10k x 1k is ten million rows per database: the seeding takes a few minutes and a few GB of disk.)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from agents import SQLiteSession
+
+from testprj.benchmarks.stats import print_table, summarize
+from testprj.session_store import SessionStore
+
+
+def _item(session: int, index: int) -> dict:
+    role = "user" if index % 2 == 0 else "assistant"
+    return {"role": role, "content": f"message {index} of conversation {session}: " + "lorem ipsum " * 6}
+
+
+def _seed_sdk(path: str, sessions: int, items: int) -> None:
+    """Bulk-load the SDK schema directly (going through SQLiteSession would take hours at 10k x 1k)."""
+    SQLiteSession("seed", path).close()  # creates the tables and index
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    for s in range(sessions):
+        conn.execute("INSERT INTO agent_sessions (session_id) VALUES (?)", (f"s{s}",))
+        conn.executemany("INSERT INTO agent_messages (session_id, message_data) VALUES (?, ?)",
+                         ((f"s{s}", json.dumps(_item(s, i))) for i in range(items)))
+        if s % 100 == 99:
+            conn.commit()
+    conn.commit()
+    conn.close()
+
+
+async def _seed_store(store: SessionStore, sessions: int, items: int) -> None:
+    chunk = 100
+    for start in range(0, sessions, chunk):
+        await asyncio.gather(*(
+            store.add_items(f"s{s}", [_item(s, i) for i in range(items)])
+            for s in range(start, min(start + chunk, sessions))
+        ))
+
+
+async def _measure(calls, concurrency: int) -> tuple[dict, float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(call):
+        async with semaphore:
+            start = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(call) for call in calls))
+    return summarize(latencies), len(latencies) / (time.perf_counter() - start)
+
+
+async def main(sessions: int, items: int, ops: int, concurrency: int) -> None:
+    directory = tempfile.mkdtemp(prefix="session_bench_")
+    sdk_path, store_path = os.path.join(directory, "sdk.db"), os.path.join(directory, "store.db")
+    print(f"seeding {sessions} sessions x {items} items in {directory} ...")
+    start = time.perf_counter()
+    _seed_sdk(sdk_path, sessions, items)
+    print(f"  SQLiteSession: {time.perf_counter() - start:.1f} s")
+    store = SessionStore(store_path)
+    start = time.perf_counter()
+    await _seed_store(store, sessions, items)
+    print(f"  SessionStore:  {time.perf_counter() - start:.1f} s")
+
+    seeded_batches, seeded_ops = store.batches, store.operations
+    random.seed(0)
+    targets = [f"s{random.randrange(sessions)}" for _ in range(ops)]
+    sdk_sessions = {sid: SQLiteSession(sid, sdk_path) for sid in set(targets)}
+    turn = [_item(0, 0), _item(0, 1)]
+    rows = []
+    for name, session_for in [("SQLiteSession", sdk_sessions.__getitem__), ("SessionStore", store.session)]:
+        for operation, make in [
+            ("append", lambda s: lambda: s.add_items(turn)),
+            ("tail read", lambda s: lambda: s.get_items(limit=2)),
+            ("full read", lambda s: lambda: s.get_items()),
+        ]:
+            count = ops if operation != "full read" else max(ops // 10, 1)
+            latency, throughput = await _measure([make(session_for(sid)) for sid in targets[:count]], concurrency)
+            rows.append({"backend": name, "operation": operation, "ops": count, "ops_per_s": throughput,
+                         "p50_ms": latency["p50_ms"], "p95_ms": latency["p95_ms"], "p99_ms": latency["p99_ms"]})
+    per_batch = (store.operations - seeded_ops) / max(store.batches - seeded_batches, 1)
+    await store.aclose()
+    for session in sdk_sessions.values():
+        session.close()
+    shutil.rmtree(directory)
+
+    print(f"{sessions} sessions x {items} items, concurrency {concurrency}; "
+          f"store writer: {per_batch:.1f} operations per transaction")
+    print_table(rows, ["backend", "operation", "ops", "ops_per_s", "p50_ms", "p95_ms", "p99_ms"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=200, help="items per session")
+    parser.add_argument("--ops", type=int, default=2000, help="operations per measurement")
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.sessions, args.items, args.ops, args.concurrency))
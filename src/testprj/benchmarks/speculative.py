@@ -0,0 +1,141 @@
+"""
+Benchmark: time to first token with input guardrails, sequential vs speculative.
+
+A customer-support agent streams its answer behind an LLM input guardrail (both served by the
+stand-in server: the guardrail takes `--guardrail-latency`, the agent `--model-latency` to its
+first token). Modes:
+
+    sequential   - await the guardrails, then start the agent (safe, TTFT = guardrail + model)
+    sdk streamed - `Runner.run_streamed` with the guardrail on the agent (tokens are released
+                   before the guardrail has passed; a trip does not stop the model until the
+                   consumer notices)
+    speculative  - `run_speculative_streamed` (TTFT = max(guardrail, model), nothing released
+                   before the guardrail passed, a trip cancels the model stream)
+
+Half of the rows use benign input, half input that trips the guardrail; for those we report the
+time to rejection and how many agent streams the server still completed.
+
+    python -m testprj.benchmarks.speculative --runs 50 --guardrail-latency 0.3 --model-latency 0.4
+"""
+
+import argparse
+import asyncio
+import time
+
+from agents import (
+    Agent,
+    GuardrailFunctionOutput,
+    InputGuardrailTripwireTriggered,
+    RawResponsesStreamEvent,
+    Runner,
+    input_guardrail,
+    set_tracing_disabled,
+)
+from pydantic import BaseModel
+
+from testprj import providers
+from testprj.benchmarks.server import StandInServer, json_reply, last_message, system_prompt, text
+from testprj.benchmarks.stats import print_table, summarize
+from testprj.speculative import run_input_guardrails, run_speculative_streamed
+
+set_tracing_disabled(True)
+
+ANSWER = " ".join(["Here is a detailed answer to your support question."] * 8)
+
+
+class Verdict(BaseModel):
+    reasoning: str
+    is_sensitive_input: bool
+
+
+def _responder(guardrail_latency: float):
+    def respond(request: dict):
+        if system_prompt(request).startswith("Check"):
+            tripped = "abuse" in str(last_message(request).get("content"))
+            return json_reply({"reasoning": "bench", "is_sensitive_input": tripped}, latency=guardrail_latency)
+        return text(ANSWER)
+
+    return respond
+
+
+def _agents(model) -> tuple[Agent, Agent]:
+    guardrail_agent = Agent(name="Guardrail check", instructions="Check the input.", output_type=Verdict, model=model)
+
+    @input_guardrail
+    async def sensitive_input_guardrail(ctx, agent, input) -> GuardrailFunctionOutput:
+        result = await Runner.run(guardrail_agent, input, context=ctx.context)
+        return GuardrailFunctionOutput(output_info=result.final_output,
+                                       tripwire_triggered=result.final_output.is_sensitive_input)
+
+    agent = Agent(name="Customer support agent", instructions="You are a customer support agent.",
+                  model=model, input_guardrails=[sensitive_input_guardrail])
+    return agent, agent.clone(input_guardrails=[])
+
+
+async def _consume(streamed, start: float) -> float | None:
+    """Drain a streamed run; returns the time to the first text delta."""
+    first = None
+    async for event in streamed.stream_events():
+        if first is None and isinstance(event, RawResponsesStreamEvent) and event.data.type == "response.output_text.delta":
+            first = time.perf_counter() - start
+    return first
+
+
+async def _one(mode: str, agent: Agent, bare: Agent, message: str) -> tuple[float | None, float, bool]:
+    start = time.perf_counter()
+    try:
+        if mode == "sequential":
+            await run_input_guardrails(agent, agent.input_guardrails, message, None)
+            first = await _consume(Runner.run_streamed(bare, message), start)
+        elif mode == "sdk streamed":
+            first = await _consume(Runner.run_streamed(agent, message), start)
+        else:
+            first = await _consume(run_speculative_streamed(agent, message), start)
+        return first, time.perf_counter() - start, False
+    except InputGuardrailTripwireTriggered:
+        return None, time.perf_counter() - start, True
+
+
+async def main(runs: int, guardrail_latency: float, model_latency: float, chunk_delay: float) -> None:
+    rows = []
+    server = StandInServer(_responder(guardrail_latency), latency=model_latency, chunk_delay=chunk_delay)
+    async with server:
+        providers.register_provider("standin", server.base_url, api_key="bench")
+        agent, bare = _agents(providers.get_model("stand-in", provider="standin"))
+        await _one("speculative", agent, bare, "warm up")
+
+        for case, message in [("benign", "How do I reset my password?"), ("trips", "this is abuse")]:
+            for mode in ["sequential", "sdk streamed", "speculative"]:
+                ttft, totals, tripped = [], [], 0
+                server.reset_stats()
+                for _ in range(runs):
+                    first, total, trip = await _one(mode, agent, bare, message)
+                    if first is not None:
+                        ttft.append(first)
+                    totals.append(total)
+                    tripped += trip
+                await asyncio.sleep(model_latency + chunk_delay * 100)  # let abandoned streams finish server-side
+                first_token = summarize(ttft) if ttft else {"p50_ms": float("nan"), "p95_ms": float("nan")}
+                done = summarize(totals)
+                rows.append({
+                    "input": case, "mode": mode, "tripped": tripped,
+                    "ttft_p50_ms": first_token["p50_ms"], "ttft_p95_ms": first_token["p95_ms"],
+                    "done_p50_ms": done["p50_ms"], "done_p95_ms": done["p95_ms"],
+                    "agent_streams_completed": server.streams_completed,
+                })
+        await providers.aclose()
+
+    print(f"{runs} runs per row, guardrail {guardrail_latency * 1000:.0f} ms, "
+          f"model first token {model_latency * 1000:.0f} ms")
+    print_table(rows, ["input", "mode", "tripped", "ttft_p50_ms", "ttft_p95_ms", "done_p50_ms", "done_p95_ms",
+                       "agent_streams_completed"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--guardrail-latency", type=float, default=0.3, help="guardrail model call (s)")
+    parser.add_argument("--model-latency", type=float, default=0.4, help="agent time to first token (s)")
+    parser.add_argument("--chunk-delay", type=float, default=0.01, help="delay between streamed chunks (s)")
+    args = parser.parse_args()
+    asyncio.run(main(args.runs, args.guardrail_latency, args.model_latency, args.chunk_delay))
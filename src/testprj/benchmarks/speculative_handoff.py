@@ -0,0 +1,85 @@
+"""
+Benchmark: handoff latency of agent_routing.py's triage, plain vs speculative warm start.
+
+Streams `--requests` first messages (the pre-router benchmark's traffic) through `triage_agent`
+of examples/agent_patterns/agent_routing.py against the stand-in server: triage hands off to the
+oracle's language agent, which streams its answer; every model call takes `--latency-ms` to the
+first token. Modes:
+
+    plain       - triage_agent: the target's call starts after triage finished
+    speculative - HandoffSpeculator: a lenient pre-router prediction starts the target's call
+                  before triage is sent
+
+`model_calls` includes speculative calls that were thrown away (`wasted`).
+
+    python -m testprj.benchmarks.speculative_handoff --requests 200
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib
+import io
+import os
+import time
+
+from agents import Runner, set_tracing_disabled
+
+from testprj import providers
+from testprj.benchmarks.prerouter import _traffic
+from testprj.benchmarks.server import StandInServer, last_message, system_prompt, text, tool_calls
+from testprj.benchmarks.stats import print_table, summarize
+from testprj.speculative_handoff import HandoffSpeculator
+
+set_tracing_disabled(True)
+
+
+def responder(oracle: dict[str, str | None], latency_s: float):
+    def respond(request: dict):
+        if system_prompt(request).startswith("You are the main triage agent"):
+            language = oracle.get(str(last_message(request).get("content", ""))) or "english"
+            return tool_calls((f"transfer_to_{language}_agent", {}), latency=latency_s)
+        return text("¡Claro que sí! Con mucho gusto le ayudo con eso ahora mismo.", latency=latency_s)
+
+    return respond
+
+
+async def main(requests: int, ambiguous: float, latency_ms: float) -> None:
+    traffic = _traffic(requests, ambiguous, seed=1)
+    rows = []
+    server = StandInServer(responder(dict(traffic), latency_ms / 1000), chunk_delay=0.005)
+    async with server:
+        os.environ["OLLAMA_BASE_URL"] = server.base_url
+        with contextlib.redirect_stdout(io.StringIO()):
+            routing = importlib.import_module("testprj.examples.agent_patterns.agent_routing")
+        likely = routing.likely_language
+        modes = {
+            "plain": None,
+            "speculative": HandoffSpeculator(predict=lambda text: getattr(likely.decide(text), "agent", None)),
+        }
+        for mode, speculator in modes.items():
+            triage = speculator.prepare(routing.triage_agent) if speculator else routing.triage_agent
+            server.reset_stats()
+            latencies, misrouted = [], 0
+            for msg, language in traffic:
+                start = time.perf_counter()
+                result = Runner.run_streamed(triage, [{"content": msg, "role": "user"}])
+                async for _ in result.stream_events():
+                    pass
+                latencies.append(time.perf_counter() - start)
+                misrouted += language is not None and result.last_agent.name != f"{language}_agent"
+            counts = speculator.stats() if speculator else {"hits": 0, "wasted": 0}
+            rows.append({"mode": mode, **summarize(latencies), "model_calls": server.requests_served,
+                         "hits": counts["hits"], "wasted": counts["wasted"], "misrouted": misrouted})
+        await providers.aclose()
+    print(f"{requests} first messages, {ambiguous:.0%} ambiguous; model {latency_ms:.0f} ms to first token")
+    print_table(rows, ["mode", "p50_ms", "p95_ms", "model_calls", "hits", "wasted", "misrouted"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--ambiguous", type=float, default=0.2, help="share of short / mixed messages")
+    parser.add_argument("--latency-ms", type=float, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.ambiguous, args.latency_ms))
@@ -0,0 +1,116 @@
+"""
+Benchmark: post-hoc output guardrail vs incremental streaming output guardrail.
+
+The agent streams a structured `MessageOutput` (as in examples/agent_patterns/output_guardrails.py)
+from the stand-in server. For "rejected" answers the flag that trips the guardrail is in the
+partially parsed output after the first few dozen tokens; the SDK output guardrail can only look
+at it after the last token. Reports time to the rejection (or to completion), how many streamed
+events the caller received and how many model streams the server still sent to the end.
+
+    python -m testprj.benchmarks.streaming_guardrails --runs 20 --words 400
+"""
+
+import argparse
+import asyncio
+import time
+
+from agents import (
+    Agent,
+    GuardrailFunctionOutput,
+    OutputGuardrailTripwireTriggered,
+    Runner,
+    output_guardrail,
+    set_tracing_disabled,
+)
+from pydantic import BaseModel
+
+from testprj import providers
+from testprj.benchmarks.server import StandInServer, json_reply
+from testprj.benchmarks.stats import print_table, summarize
+from testprj.streaming_guardrails import run_streamed_guarded, streaming_output_guardrail
+
+set_tracing_disabled(True)
+
+
+class MessageOutput(BaseModel):
+    reasoning: str
+    is_game_or_sports_related: bool
+    response: str
+
+
+@output_guardrail
+def sports_check(ctx, agent, output: MessageOutput) -> GuardrailFunctionOutput:
+    return GuardrailFunctionOutput(output_info=None, tripwire_triggered=output.is_game_or_sports_related)
+
+
+@streaming_output_guardrail(every=16)
+def sports_stream_check(ctx, agent, partial) -> GuardrailFunctionOutput:
+    return GuardrailFunctionOutput(output_info=None,
+                                   tripwire_triggered=partial.fields.get("is_game_or_sports_related") is True)
+
+
+def _responder(words: int):
+    def respond(request: dict):
+        text = str(request["messages"][-1].get("content"))
+        return json_reply({
+            "reasoning": "The user asks about " + ("football" if "football" in text else "billing") + ".",
+            "is_game_or_sports_related": "football" in text,
+            "response": " ".join(["This is a long and careful answer."] * (words // 7)),
+        })
+
+    return respond
+
+
+async def _one(mode: str, agent: Agent, message: str) -> tuple[float, int, bool]:
+    start = time.perf_counter()
+    if mode == "post-hoc (sdk)":
+        result = Runner.run_streamed(agent, message)
+    else:
+        result = run_streamed_guarded(agent.clone(output_guardrails=[]), message, [sports_stream_check])
+    events = 0
+    try:
+        async for _ in result.stream_events():
+            events += 1
+        return time.perf_counter() - start, events, False
+    except OutputGuardrailTripwireTriggered:
+        return time.perf_counter() - start, events, True
+
+
+async def main(runs: int, words: int, latency: float, chunk_delay: float) -> None:
+    rows = []
+    server = StandInServer(_responder(words), latency=latency, chunk_delay=chunk_delay)
+    async with server:
+        providers.register_provider("standin", server.base_url, api_key="bench")
+        agent = Agent(name="Assistant", instructions="You are a helpful assistant.", output_type=MessageOutput,
+                      output_guardrails=[sports_check], model=providers.get_model("stand-in", provider="standin"))
+        await _one("streaming", agent, "warm up")
+
+        for case, message in [("accepted", "Why was I billed twice?"), ("rejected", "Who won the football final?")]:
+            for mode in ["post-hoc (sdk)", "streaming"]:
+                server.reset_stats()
+                times, events, tripped = [], [], 0
+                for _ in range(runs):
+                    elapsed, received, trip = await _one(mode, agent, message)
+                    times.append(elapsed)
+                    events.append(received)
+                    tripped += trip
+                await asyncio.sleep(chunk_delay * words + latency)  # let abandoned streams run out server-side
+                rows.append({"answer": case, "guardrail": mode, "tripped": tripped,
+                             "events_per_run": sum(events) / runs,
+                             "model_streams_completed": server.streams_completed, **summarize(times)})
+        await providers.aclose()
+
+    print(f"{runs} runs per row, ~{words} words per answer, first token {latency * 1000:.0f} ms, "
+          f"{chunk_delay * 1000:.0f} ms per chunk")
+    print_table(rows, ["answer", "guardrail", "tripped", "events_per_run", "model_streams_completed",
+                       "p50_ms", "p95_ms"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--words", type=int, default=400, help="length of the streamed answer")
+    parser.add_argument("--latency", type=float, default=0.1, help="time to first token (s)")
+    parser.add_argument("--chunk-delay", type=float, default=0.002, help="delay between streamed chunks (s)")
+    args = parser.parse_args()
+    asyncio.run(main(args.runs, args.words, args.latency, args.chunk_delay))
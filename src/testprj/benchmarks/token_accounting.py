@@ -0,0 +1,105 @@
+"""
+Benchmark: prompt-size accounting on a tool-heavy, multi-turn conversation.
+
+An agent with `--tools` function tools (one of which is called every turn) and dynamic
+instructions talks for `--turns` turns against the stand-in server, carrying
+`to_input_list()` forward. Prints where the prompt tokens go (per agent and per tool), how
+close the estimate is to the usage the server reports, the per-call cost of accounting, and
+tokenizer throughput with and without the per-string cache.
+
+    python -m testprj.benchmarks.token_accounting --tools 20 --turns 10
+"""
+
+import argparse
+import asyncio
+import random
+import string
+import time
+
+from agents import Agent, Runner, function_tool, set_tracing_disabled
+
+from testprj import providers
+from testprj.benchmarks.server import StandInServer, after_tool_call, text, tool_calls
+from testprj.benchmarks.stats import print_table
+from testprj.token_accounting import count_tokens, run_accounted
+
+set_tracing_disabled(True)
+
+
+def _tools(n: int) -> list:
+    def make(i: int):
+        @function_tool(name_override=f"lookup_{i}")
+        def lookup(query: str, limit: int = 10) -> str:
+            """Look up records in one of the internal systems and return the matching rows."""
+            return "\n".join(f"row {j}: {query} result with a few descriptive words" for j in range(limit))
+
+        return lookup
+
+    return [make(i) for i in range(n)]
+
+
+def respond(request: dict):
+    if after_tool_call(request):
+        return text("Here is a summary of the records you asked for, in a couple of sentences.")
+    return tool_calls(("lookup_0", {"query": "open orders", "limit": 10}))
+
+
+def instructions(ctx, agent) -> str:
+    return "You are a support agent for an online shop. Use the lookup tools to answer. " * 3
+
+
+async def _conversation(agent: Agent, turns: int, accounted: bool):
+    items, result = [], None
+    for turn in range(turns):
+        items.append({"role": "user", "content": f"Question {turn}: what are my open orders?"})
+        result = await (run_accounted if accounted else Runner.run)(agent, items)
+        items = result.to_input_list()
+    return result
+
+
+async def main(tools: int, turns: int) -> None:
+    async with StandInServer(respond) as server:
+        providers.register_provider("standin", server.base_url, api_key="bench")
+        agent = Agent(name="support_agent", instructions=instructions, tools=_tools(tools),
+                      model=providers.get_model("stand-in", provider="standin"))
+        await _conversation(agent, 1, accounted=True)  # warm up
+
+        timings = {}
+        for accounted in (False, True):
+            start = time.perf_counter()
+            result = await _conversation(agent, turns, accounted)
+            timings[accounted] = (time.perf_counter() - start) / (2 * turns)
+        await providers.aclose()
+
+    accountant = result.token_accounting  # the last turn's run (its calls carry the longest history)
+    by_agent = accountant.by_agent()
+    print(f"{tools} tools, turn {turns} of the conversation: {accountant.summary()}")
+    print_table([{"agent": name, **row} for name, row in by_agent.items()],
+                ["agent", "calls", "dynamic_instructions", "tools", "history", "tool_results", "estimated",
+                 "input_tokens", "output_tokens"])
+    print()
+    print_table([{"tool": name, **row} for name, row in list(accountant.by_tool().items())[:5]],
+                ["tool", "calls_listed", "schema_tokens", "result_tokens"])
+    print(f"\nper model call: {timings[False] * 1000:.2f} ms plain, {timings[True] * 1000:.2f} ms accounted")
+
+    random.seed(0)
+    texts = ["".join(random.choices(string.ascii_letters + " ", k=400)) for _ in range(2000)]
+    start = time.perf_counter()
+    for t in texts:
+        count_tokens.__wrapped__(t)  # bypasses the cache
+    uncached = (time.perf_counter() - start) / len(texts)
+    for t in texts:
+        count_tokens(t)
+    start = time.perf_counter()
+    for t in texts:
+        count_tokens(t)
+    cached = (time.perf_counter() - start) / len(texts)
+    print(f"counting a 400-char string: {uncached * 1e6:.1f} us the first time, {cached * 1e6:.2f} us when seen before")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tools", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.tools, args.turns))
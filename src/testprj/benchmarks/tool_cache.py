@@ -0,0 +1,98 @@
+"""
+Benchmark: repeated pure tool calls with and without memoization.
+
+An arithmetic agent runs `--runs` times against the stand-in server; each run's first answer
+calls `multiply` `--calls-per-turn` times in parallel with operands drawn from `--distinct`
+different pairs, like the repeated sub-expressions of the toolCalling.py prompts. The tool body
+costs `--tool-ms` of CPU (0 for the bare arithmetic), so the rows show both the dispatch saved
+per call and what memoizing a heavier pure function buys. Hit rates come from `ToolCacheHooks`.
+
+    python -m testprj.benchmarks.tool_cache --runs 200 --distinct 20 --tool-ms 2
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from agents import Agent, ModelSettings, Runner, set_tracing_disabled
+from agents.tool_context import ToolContext
+
+from testprj import providers
+from testprj.benchmarks.server import StandInServer, after_tool_call, text, tool_calls
+from testprj.benchmarks.stats import print_table, summarize
+from testprj.tool_cache import ToolCacheHooks, function_tool
+
+set_tracing_disabled(True)
+
+
+def _multiply(tool_ms: float, pure: bool):
+    @function_tool(pure=pure)
+    def multiply(a: float, b: float) -> str:
+        """Returns the product of two numbers."""
+        deadline = time.perf_counter() + tool_ms / 1000
+        while time.perf_counter() < deadline:  # stands in for a costlier pure computation
+            pass
+        return f"{a} * {b} = {a * b}"
+
+    return multiply
+
+
+def responder(distinct: int, calls_per_turn: int):
+    pairs = [(random.randint(1, 999), random.randint(1, 999)) for _ in range(distinct)]
+
+    def respond(request: dict):
+        if after_tool_call(request):
+            return text("Done.")
+        chosen = random.choices(pairs, k=calls_per_turn)
+        return tool_calls(*[("multiply", {"a": a, "b": b}) for a, b in chosen])
+
+    return respond
+
+
+async def _dispatch_us(tool, arguments: str, calls: int) -> float:
+    context = ToolContext(context=None, tool_name=tool.name, tool_call_id="bench")
+    start = time.perf_counter()
+    for _ in range(calls):
+        await tool.on_invoke_tool(context, arguments)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+async def main(runs: int, distinct: int, calls_per_turn: int, tool_ms: float) -> None:
+    random.seed(0)
+    rows = []
+    async with StandInServer(responder(distinct, calls_per_turn)) as server:
+        providers.register_provider("standin", server.base_url, api_key="bench")
+        model = providers.get_model("stand-in", provider="standin")
+        for pure in (False, True):
+            tool = _multiply(tool_ms, pure)
+            agent = Agent(name="Assistant", instructions="You are a helpful assistant", model=model, tools=[tool],
+                          model_settings=ModelSettings(parallel_tool_calls=True))
+            hooks = ToolCacheHooks()
+            latencies = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                await Runner.run(agent, "What is 12*34, 56*78 and 12*34 again?", hooks=hooks)
+                latencies.append(time.perf_counter() - start)
+            stats = hooks.stats().get("multiply", {})
+            rows.append({
+                "mode": "memoized" if pure else "plain",
+                **summarize(latencies),
+                "dispatch_us": await _dispatch_us(tool, '{"a": 12, "b": 34}', 1000),
+                "tool_calls": runs * calls_per_turn,
+                "hit_rate": stats.get("hit_rate"),
+            })
+        await providers.aclose()
+    print(f"{runs} runs, {calls_per_turn} multiply calls per run over {distinct} distinct operand pairs, "
+          f"{tool_ms} ms per tool body")
+    print_table(rows, ["mode", "p50_ms", "p95_ms", "p99_ms", "dispatch_us", "tool_calls", "hit_rate"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--distinct", type=int, default=20, help="distinct operand pairs the model asks for")
+    parser.add_argument("--calls-per-turn", type=int, default=3)
+    parser.add_argument("--tool-ms", type=float, default=2.0, help="CPU time of one tool body (ms)")
+    args = parser.parse_args()
+    asyncio.run(main(args.runs, args.distinct, args.calls_per_turn, args.tool_ms))
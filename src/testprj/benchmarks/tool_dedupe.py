@@ -0,0 +1,85 @@
+"""
+Benchmark: repeated tool calls within a run, with and without deduplication.
+
+The stand-in model asks for `--calls` parallel `get_quote` calls in its first turn, of which only
+`--distinct` are different (the rest repeat one of them), then asks for the same calls again in a
+second turn. `get_quote` stands in for an external API: each execution takes `--tool-ms` and
+consumes one unit of quota. Modes:
+
+    plain               - every call id runs the tool
+    within turns        - `deduplicated(tools)`
+    across turns        - `deduplicated(tools, across_turns=True)`
+
+    python -m testprj.benchmarks.tool_dedupe --runs 50 --calls 8 --distinct 3
+"""
+
+import argparse
+import asyncio
+import time
+
+from agents import Agent, ModelSettings, Runner, function_tool, set_tracing_disabled
+
+from testprj import providers
+from testprj.benchmarks.server import StandInServer, last_message, text, tool_calls
+from testprj.benchmarks.stats import print_table, summarize
+from testprj.tool_cache import ToolCacheHooks, deduplicated
+
+set_tracing_disabled(True)
+
+
+def responder(calls: int, distinct: int):
+    symbols = [f"SYM{i % distinct}" for i in range(calls)]
+
+    def respond(request: dict):
+        tool_turns = sum(1 for m in request.get("messages", []) if m.get("role") == "assistant")
+        if last_message(request).get("role") == "tool" and tool_turns >= 2:
+            return text("Here are the quotes.")
+        return tool_calls(*[("get_quote", {"symbol": symbol}) for symbol in symbols])
+
+    return respond
+
+
+async def main(runs: int, calls: int, distinct: int, tool_ms: float) -> None:
+    executions = 0
+
+    @function_tool
+    async def get_quote(symbol: str) -> str:
+        """Returns the latest price for a stock symbol."""
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(tool_ms / 1000)
+        return f"{symbol}: 101.5"
+
+    rows = []
+    async with StandInServer(responder(calls, distinct)) as server:
+        providers.register_provider("standin", server.base_url, api_key="bench")
+        model = providers.get_model("stand-in", provider="standin")
+        modes = {
+            "plain": [get_quote],
+            "within turns": deduplicated([get_quote]),
+            "across turns": deduplicated([get_quote], across_turns=True),
+        }
+        for mode, tools in modes.items():
+            agent = Agent(name="Assistant", instructions="You are a market assistant.", model=model, tools=tools,
+                          model_settings=ModelSettings(parallel_tool_calls=True))
+            hooks, latencies, executions = ToolCacheHooks(), [], 0
+            for _ in range(runs):
+                start = time.perf_counter()
+                await Runner.run(agent, "Quotes for my portfolio, then refresh them.", hooks=hooks)
+                latencies.append(time.perf_counter() - start)
+            counts = hooks.counts.get("get_quote", {})
+            rows.append({"mode": mode, **summarize(latencies), "tool_calls": runs * calls * 2,
+                         "executions": executions, "deduplicated": counts.get("deduplicated", 0)})
+        await providers.aclose()
+    print(f"{runs} runs; 2 turns of {calls} parallel calls over {distinct} distinct arguments; {tool_ms} ms per execution")
+    print_table(rows, ["mode", "p50_ms", "p95_ms", "p99_ms", "tool_calls", "executions", "deduplicated"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=8, help="parallel tool calls per model turn")
+    parser.add_argument("--distinct", type=int, default=3, help="different arguments among them")
+    parser.add_argument("--tool-ms", type=float, default=20.0, help="latency of one tool execution (ms)")
+    args = parser.parse_args()
+    asyncio.run(main(args.runs, args.calls, args.distinct, args.tool_ms))
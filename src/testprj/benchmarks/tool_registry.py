@@ -0,0 +1,96 @@
+"""
+Benchmark: per-request cost of sending tool schemas, with and without the tool registry.
+
+Calls a model with 4, 20 and 100 function tools (`--tools`) through an in-process HTTP
+transport that answers immediately, so the time measured is what the client side spends per
+turn: converting the tools, the openai request-param transform and JSON encoding. Compares the
+plain `OpenAIChatCompletionsModel` with `RegistryChatCompletionsModel` on the shared pooled
+client, and checks that both send the same request body.
+
+    python -m testprj.benchmarks.tool_registry --tools 4,20,100 --calls 300
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from agents import AsyncOpenAI, ModelSettings, ModelTracing, OpenAIChatCompletionsModel, function_tool
+
+from testprj import providers
+from testprj.benchmarks.server import completion_payload
+from testprj.benchmarks.stats import print_table, summarize
+from testprj.tool_registry import RegistryChatCompletionsModel, ToolRegistry
+
+
+def _tools(n: int) -> list:
+    def make(i: int):
+        @function_tool(name_override=f"lookup_{i}")
+        def lookup(query: str, limit: int = 10, include_archived: bool = False, fields: list[str] | None = None) -> str:
+            """Look up records in one of the internal systems.
+
+            Args:
+                query: Free-text search over the record titles and bodies.
+                limit: Maximum number of rows to return.
+                include_archived: Also search records that were archived.
+                fields: Columns to return; all of them when omitted.
+            """
+            return query
+
+        return lookup
+
+    return [make(i) for i in range(n)]
+
+
+def _client(client_class: type[httpx.AsyncClient], bodies: list[bytes]) -> AsyncOpenAI:
+    def handle(request: httpx.Request) -> httpx.Response:
+        bodies.append(request.content)
+        return httpx.Response(200, json=completion_payload("bench", "ok"))
+
+    return AsyncOpenAI(api_key="bench", base_url="http://bench.local/v1",
+                       http_client=client_class(transport=httpx.MockTransport(handle)))
+
+
+async def _calls(model, tools: list, calls: int) -> list[float]:
+    settings = ModelSettings(parallel_tool_calls=True)
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        await model.get_response("You are a support agent.", "What are my open orders?", settings, tools, None, [],
+                                 ModelTracing.DISABLED, previous_response_id=None, prompt=None)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def main(sizes: list[int], calls: int) -> None:
+    rows = []
+    for size in sizes:
+        tools = _tools(size)
+        plain_bodies, registry_bodies = [], []
+        registry = ToolRegistry()
+        models = {
+            "plain": OpenAIChatCompletionsModel("bench", _client(httpx.AsyncClient, plain_bodies)),
+            "registry": RegistryChatCompletionsModel("bench", _client(providers.PooledClient, registry_bodies), registry),
+        }
+        for mode, model in models.items():
+            await _calls(model, [], 1)  # warm up the client without tools
+            first = summarize(await _calls(model, tools, 1))  # the registry compiles here
+            latency = summarize(await _calls(model, tools, calls))
+            rows.append({"tools": size, "mode": mode, "first_call_ms": first["p50_ms"], **latency,
+                         "body_kb": len((plain_bodies if mode == "plain" else registry_bodies)[-1]) / 1024})
+        if json.loads(plain_bodies[-1]) != json.loads(registry_bodies[-1]):
+            raise AssertionError(f"request bodies differ with {size} tools")
+        rows[-1]["tool_sets"] = registry.stats()["tool_sets"]
+        rows[-1]["hit_rate"] = registry.stats()["hit_rate"]
+    print(f"{calls} calls per row (client side only, no network)")
+    print_table(rows, ["tools", "mode", "first_call_ms", "p50_ms", "p95_ms", "p99_ms", "body_kb", "tool_sets",
+                       "hit_rate"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tools", default="4,20,100", help="comma separated tool counts")
+    parser.add_argument("--calls", type=int, default=300)
+    args = parser.parse_args()
+    asyncio.run(main([int(n) for n in args.tools.split(",")], args.calls))
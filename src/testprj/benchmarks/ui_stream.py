@@ -0,0 +1,121 @@
+"""
+Benchmark: per-token UI updates vs coalesced flushes in the Chainlit streaming handler.
+
+Each session streams a long answer from the stand-in server into a fake Chainlit message whose
+"websocket" JSON-encodes every frame it is sent (what the Chainlit emitter does). Modes:
+
+    update per delta  - the old handler: `msg.content += delta; await msg.update()` per event,
+                        re-sending the whole message every time
+    token per delta   - `msg.stream_token(delta)` per event (only the new text, still one frame per token)
+    coalesced         - `stream_run(result, msg.stream_token)` (one frame per 30 ms / 256 chars)
+
+Reports frames and bytes per response, CPU spent in the UI path and end-to-end latency at
+`--sessions` concurrent conversations.
+
+    python -m testprj.benchmarks.ui_stream --sessions 50 --words 600
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from agents import Agent, RawResponsesStreamEvent, Runner, set_tracing_disabled
+
+from testprj import providers
+from testprj.benchmarks.server import StandInServer
+from testprj.benchmarks.stats import print_table, summarize
+from testprj.ui_stream import StreamStats, stream_run
+
+set_tracing_disabled(True)
+
+
+class FakeMessage:
+    """The parts of `cl.Message` the handler uses; every frame is JSON-encoded like a socket emit."""
+
+    def __init__(self, emit_delay: float = 0.0):
+        self.content = ""
+        self.frames = 0
+        self.bytes = 0
+        self.emit_delay = emit_delay
+
+    async def _emit(self, payload: dict) -> None:
+        self.frames += 1
+        self.bytes += len(json.dumps(payload))
+        if self.emit_delay:
+            await asyncio.sleep(self.emit_delay)  # a socket write with a full send buffer
+
+    async def update(self) -> None:
+        await self._emit({"id": "msg", "output": self.content, "streaming": False})
+
+    async def stream_token(self, token: str) -> None:
+        self.content += token
+        await self._emit({"id": "msg", "token": token, "isSequence": False})
+
+
+async def _one(mode: str, agent: Agent, message: str, interval: float, max_chars: int) -> tuple[FakeMessage, StreamStats]:
+    msg = FakeMessage()
+    result = Runner.run_streamed(agent, message)
+    if mode == "coalesced":
+        stats = await stream_run(result, msg.stream_token, interval=interval, max_chars=max_chars)
+    else:
+        stats = StreamStats()
+        start, cpu = time.perf_counter(), 0.0
+        async for event in result.stream_events():
+            t0 = time.process_time()
+            stats.events += 1
+            if isinstance(event, RawResponsesStreamEvent) and event.data.type == "response.output_text.delta":
+                stats.deltas += 1
+                stats.chars += len(event.data.delta)
+                if mode == "update per delta":
+                    msg.content += event.data.delta
+                    await msg.update()
+                else:
+                    await msg.stream_token(event.data.delta)
+            cpu += time.process_time() - t0
+        stats.duration_s, stats.ui_cpu_s = time.perf_counter() - start, cpu
+    await msg.update()
+    return msg, stats
+
+
+async def main(sessions: int, words: int, chunk_delay: float, interval: float, max_chars: int) -> None:
+    answer = " ".join(["word"] * words)
+    rows = []
+    async with StandInServer(answer, chunk_delay=chunk_delay) as server:
+        providers.register_provider("standin", server.base_url, api_key="bench")
+        agent = Agent(name="Assistant", instructions="You are a helpful assistant",
+                      model=providers.get_model("stand-in", provider="standin"))
+        await _one("coalesced", agent, "warm up", interval, max_chars)
+
+        for mode in ["update per delta", "token per delta", "coalesced"]:
+            start, cpu = time.perf_counter(), time.process_time()
+            done = await asyncio.gather(*(_one(mode, agent, f"question {i}", interval, max_chars) for i in range(sessions)))
+            wall, cpu = time.perf_counter() - start, time.process_time() - cpu
+            latency = summarize([stats.duration_s for _, stats in done])
+            rows.append({
+                "mode": mode,
+                "frames_per_response": sum(msg.frames for msg, _ in done) / sessions,
+                "kb_per_response": sum(msg.bytes for msg, _ in done) / sessions / 1024,
+                "ui_cpu_ms_per_response": sum(stats.ui_cpu_s for _, stats in done) / sessions * 1000,
+                "process_cpu_s": cpu,
+                "p50_ms": latency["p50_ms"],
+                "p95_ms": latency["p95_ms"],
+                "wall_s": wall,
+            })
+        await providers.aclose()
+
+    print(f"{sessions} concurrent sessions, {words} words per answer, flush every {interval * 1000:.0f} ms "
+          f"or {max_chars} chars")
+    print_table(rows, ["mode", "frames_per_response", "kb_per_response", "ui_cpu_ms_per_response",
+                       "process_cpu_s", "p50_ms", "p95_ms", "wall_s"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--words", type=int, default=600, help="words (= streamed chunks) per answer")
+    parser.add_argument("--chunk-delay", type=float, default=0.002, help="delay between streamed chunks (s)")
+    parser.add_argument("--interval", type=float, default=0.03, help="coalescing interval (s)")
+    parser.add_argument("--max-chars", type=int, default=256)
+    args = parser.parse_args()
+    asyncio.run(main(args.sessions, args.words, args.chunk_delay, args.interval, args.max_chars))
@@ -0,0 +1,107 @@
+"""
+Load test: `get_current_weather` (practices/toolCalling.py) under concurrent agent runs.
+
+A fake OpenWeatherMap server runs on its own thread (so a blocking client cannot deadlock it).
+Each simulated run asks for two cities at once, the way the model emits parallel tool calls for
+"karachi and lahore". Modes:
+
+    legacy sync        - the old blocking `requests.get` tool
+    async+cache        - the async, pooled, cached and coalesced tool on 8 popular cities (mostly
+                         cache hits and shared in-flight requests)
+    async, cold cache  - the async tool with a distinct city per lookup: every call goes upstream,
+                         so this row measures the non-blocking I/O itself
+
+and watch the event-loop lag as concurrency grows.
+
+    python -m testprj.benchmarks.weather_load --levels 50,100,250,500
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import requests
+from agents import RunContextWrapper, function_tool
+from agents.tool_context import ToolContext
+
+from testprj.benchmarks.server import FakeWeatherServer, serve_in_thread
+from testprj.benchmarks.stats import LoopLagMonitor, print_table, summarize
+from testprj.practices import toolCalling
+
+CITIES = ["karachi", "lahore", "Islamabad", "quetta", "Peshawar", "multan", " Karachi ", "LAHORE"]
+
+
+def make_legacy_tool(base_url: str):
+    # The previous implementation, verbatim apart from the URL: sync requests.get, no timeout.
+    @function_tool
+    def get_current_weather(city: str) -> str:
+        params = {'q': city, 'appid': 'bench', 'units': 'metric'}
+        try:
+            response = requests.get(base_url, params=params)
+            data = response.json()
+            if response.status_code == 200:
+                weather = data['weather'][0]['description'].capitalize()
+                temp = data['main']['temp']
+                return f"The current weather in {city} is {weather} with a temperature of {temp}°C."
+            else:
+                return f"Error: {data.get('message', 'Unable to fetch weather.')}"
+        except Exception as e:
+            return f"Exception occurred: {str(e)}"
+
+    return get_current_weather
+
+
+async def run_level(tool, runs: int, seed: int, distinct: bool = False) -> dict:
+    rng = random.Random(seed)
+    context = RunContextWrapper(context=None)
+
+    async def one_run(i: int) -> float:
+        start = time.perf_counter()
+        calls = [
+            tool.on_invoke_tool(
+                ToolContext(context=context.context, tool_name=tool.name, tool_call_id=f"call_{i}_{n}"),
+                json.dumps({"city": f"town-{i}-{n}" if distinct else rng.choice(CITIES)}),
+            )
+            for n in range(2)
+        ]
+        await asyncio.gather(*calls)
+        return time.perf_counter() - start
+
+    async with LoopLagMonitor() as lag:
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(one_run(i) for i in range(runs)))
+        wall = time.perf_counter() - start
+    return {"wall_s": wall, **summarize(list(latencies)), **lag.summary()}
+
+
+async def main(levels: list[int], latency: float, seed: int) -> None:
+    rows = []
+    with serve_in_thread(FakeWeatherServer(latency=latency)) as server:
+        url = server.weather_url
+        legacy = make_legacy_tool(url)
+        toolCalling.WEATHER_BASE_URL = url
+        for runs in levels:
+            for mode, tool, distinct in (
+                ("legacy sync", legacy, False),
+                ("async+cache", toolCalling.get_current_weather, False),
+                ("async, cold cache", toolCalling.get_current_weather, True),
+            ):
+                toolCalling.weather_cache.clear()  # every level starts cold
+                server.reset_stats()
+                row = await run_level(tool, runs, seed, distinct)
+                rows.append({"mode": mode, "runs": runs, "upstream_calls": server.requests_served, **row})
+
+    print(f"fake weather server latency {latency * 1000:.0f} ms, 2 parallel city lookups per run")
+    print_table(rows, ["mode", "runs", "upstream_calls", "wall_s", "p50_ms", "p99_ms",
+                       "lag_p50_ms", "lag_p99_ms", "lag_max_ms"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="50,100,250,500", help="comma separated concurrent runs")
+    parser.add_argument("--latency", type=float, default=0.01, help="fake upstream latency (s)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    asyncio.run(main([int(n) for n in args.levels.split(",")], args.latency, args.seed))
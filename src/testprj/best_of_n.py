@@ -0,0 +1,166 @@
+"""
+Best-of-N: run an agent N times concurrently and keep the best answer.
+
+parallelization_agent.py used to `asyncio.gather` three identical runs, so every request waited
+for the slowest sample, and only then ran the picker. `best_of_n` makes the fan-out bounded:
+
+- `n` candidate runs, at most `concurrency` at a time;
+- stops collecting once `quorum` candidates have finished, or at `deadline` seconds (if nothing
+  has finished by then, the first candidate to finish is taken) - the stragglers are cancelled;
+- with a `scorer` (text -> float, sync or async), candidates are scored as they come in and
+  collection stops early as soon as one reaches `accept_score`;
+- the choice is made by the `picker` agent over the collected candidates when one is given,
+  otherwise it is the best-scored (or the first finished) candidate.
+
+    outcome = await best_of_n(spanish_agent, msg, n=5, quorum=3, deadline=4.0, picker=translation_picker)
+    outcome.choice          # the picker's final output
+    outcome.stats()         # wall time, per-candidate latency / tokens / status, picker latency
+
+Tail latency is then bounded by `deadline` (+ the picker call) instead of the slowest sample.
+
+When no candidate finished, `choice` and `chosen` are None and the candidates carry the errors
+(`outcome.errors()`). Token counts are only known for finished candidates: a failed or cancelled
+run may have spent tokens too, so the token totals in `stats()` are lower bounds.
+"""
+
+import asyncio
+import inspect
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from agents import Agent, ItemHelpers, Runner, RunResult, TResponseInputItem
+
+Scorer = Callable[[str], float | Awaitable[float]]
+
+
+@dataclass
+class Candidate:
+    index: int
+    status: Literal["pending", "done", "failed", "cancelled"] = "pending"
+    output: str | None = None  # text of the run's message outputs
+    result: RunResult | None = None
+    score: float | None = None
+    latency_s: float = 0.0
+    input_tokens: int | None = None  # None: unknown (the run failed or was cancelled)
+    output_tokens: int | None = None
+    error: str | None = None
+
+
+@dataclass
+class BestOfNResult:
+    choice: Any
+    chosen: Candidate | None  # the candidate the choice came from, when it was not made by a picker
+    candidates: list[Candidate] = field(default_factory=list)
+    wall_s: float = 0.0
+    picker_latency_s: float = 0.0
+
+    def finished(self) -> list[Candidate]:
+        return [c for c in self.candidates if c.status == "done"]
+
+    def errors(self) -> list[str]:
+        return [f"candidate {c.index}: {c.error}" for c in self.candidates if c.status == "failed"]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "wall_ms": self.wall_s * 1000,
+            "picker_ms": self.picker_latency_s * 1000,
+            "finished": len(self.finished()),
+            "cancelled": sum(c.status == "cancelled" for c in self.candidates),
+            "failed": sum(c.status == "failed" for c in self.candidates),
+            # finished candidates only: cancelled and failed runs spent an unknown number of tokens
+            "completed_input_tokens": sum(c.input_tokens or 0 for c in self.candidates),
+            "completed_output_tokens": sum(c.output_tokens or 0 for c in self.candidates),
+            "candidates": [
+                {"index": c.index, "status": c.status, "latency_ms": c.latency_s * 1000, "score": c.score,
+                 "input_tokens": c.input_tokens, "output_tokens": c.output_tokens, "error": c.error}
+                for c in self.candidates
+            ],
+        }
+
+
+def picker_prompt(input: str | list[TResponseInputItem], outputs: list[str]) -> str:
+    """Default input of the picker agent: the original input and the numbered candidates."""
+    if isinstance(input, str):
+        text = input
+    else:  # the latest message of a conversation
+        last = input[-1] if input else {}
+        text = str(last.get("content", "")) if isinstance(last, dict) else str(last)
+    options = "\n\n".join(f"{i}. {output}" for i, output in enumerate(outputs, 1))
+    return f"Input: {text}\n\nCandidates:\n{options}"
+
+
+async def best_of_n(
+    agent: Agent[Any],
+    input: str | list[TResponseInputItem],
+    *,
+    n: int = 3,
+    concurrency: int | None = None,
+    quorum: int | None = None,
+    deadline: float | None = None,
+    scorer: Scorer | None = None,
+    accept_score: float | None = None,
+    picker: Agent[Any] | None = None,
+    picker_input: Callable[[str | list[TResponseInputItem], list[str]], str | list[TResponseInputItem]] = picker_prompt,
+    **run_kwargs: Any,
+) -> BestOfNResult:
+    """Run `agent` on `input` up to `n` times and choose one answer (see the module docstring)."""
+    quorum = min(quorum or n, n)
+    slots = asyncio.Semaphore(concurrency or n)
+    candidates = [Candidate(index) for index in range(n)]
+    start = time.perf_counter()
+
+    async def sample(candidate: Candidate) -> Candidate:
+        async with slots:
+            began = time.perf_counter()
+            try:
+                result = await Runner.run(agent, input, **run_kwargs)
+            except Exception as e:
+                candidate.status, candidate.error = "failed", str(e)
+                return candidate
+            finally:
+                candidate.latency_s = time.perf_counter() - began
+        usage = result.context_wrapper.usage
+        candidate.result, candidate.input_tokens, candidate.output_tokens = result, usage.input_tokens, usage.output_tokens
+        candidate.output = ItemHelpers.text_message_outputs(result.new_items) or str(result.final_output)
+        if scorer is not None:
+            score = scorer(candidate.output)
+            candidate.score = await score if inspect.isawaitable(score) else score
+        candidate.status = "done"
+        return candidate
+
+    tasks = {asyncio.ensure_future(sample(candidate)) for candidate in candidates}
+    done: list[Candidate] = []
+    try:
+        while tasks and len(done) < quorum:
+            remaining = None if deadline is None else deadline - (time.perf_counter() - start)
+            if remaining is not None and remaining <= 0 and done:
+                break
+            finished, tasks = await asyncio.wait(
+                tasks, timeout=remaining if remaining is None or remaining > 0 else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            done += [c for c in (task.result() for task in finished) if c.status == "done"]
+            if accept_score is not None and any(c.score is not None and c.score >= accept_score for c in done):
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks)
+    for candidate in candidates:
+        if candidate.status == "pending":
+            candidate.status = "cancelled"
+
+    outcome = BestOfNResult(choice=None, chosen=None, candidates=candidates)
+    if done and picker is not None:
+        began = time.perf_counter()
+        picked = await Runner.run(picker, picker_input(input, [c.output for c in done]), **run_kwargs)
+        outcome.picker_latency_s = time.perf_counter() - began
+        outcome.choice = picked.final_output
+    elif done:
+        outcome.chosen = max(done, key=lambda c: c.score) if scorer is not None else done[0]
+        outcome.choice = outcome.chosen.output
+    outcome.wall_s = time.perf_counter() - start
+    return outcome
@@ -0,0 +1,343 @@
+"""
+Model cascade: answer with a cheap (local) model first, escalate only when its answer does not hold up.
+
+Most requests in these examples are easy enough for the local Ollama `llama3.2:latest`; a few
+need Gemini. `CascadeModel` is a `Model` over an ordered set of tiers. Every call goes to the first
+tier, and its response is accepted only if it passes every check:
+
+- tool / handoff calls name a tool that was offered and carry a JSON object with the required
+  arguments (small models like to invent tools or emit broken arguments);
+- a final answer for a structured `output_type` parses into it (`output_schema.validate_json`);
+- the answer was not cut off at `max_tokens`;
+- a plain-text answer's `confidence(text)` is at least `min_confidence` (by default
+  `heuristic_confidence`: empty, hedging, refusing or repetitive answers score low);
+- no `guardrails` trip on the final output (regular `OutputGuardrail`s, run with an empty
+  context on the parsed output).
+
+Otherwise - or if the tier fails outright, e.g. Ollama is not running - the same request goes to
+the next tier. The last tier's answer is returned as is (the Runner's own validation and the
+agent's output guardrails still apply to whatever is returned). A tier that failed outright is
+skipped for `cooldown` seconds, so a local server that is down does not cost every call a
+connection attempt (and the client's retries) first.
+
+The tokens of escalated answers were spent too: they are added to the usage of the answer that
+is returned (so the run's `context_wrapper.usage` counts them) and to the per-tier `tokens` in
+`stats()`.
+
+    model = CascadeModel({
+        "ollama": get_model("llama3.2:latest", provider="ollama"),
+        "gemini": get_model("gemini-1.5-flash"),
+    })
+    agent = Agent(name="evaluator", output_type=EvaluationFeedback, model=model, ...)
+    model.stats()  # {"calls": {"ollama": 40, "gemini": 7}, "hit_rate": {"ollama": 0.82, ...}, "tokens": {...}, ...}
+
+Streaming: a tier that may still be escalated from is read to the end before its events are
+released (its answer has to be checked first); the last tier streams straight through.
+"""
+
+import json
+import logging
+import re
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Callable, Mapping
+from typing import Any
+
+from agents import (
+    Agent,
+    AgentOutputSchemaBase,
+    FunctionTool,
+    Handoff,
+    Model,
+    ModelResponse,
+    ModelSettings,
+    ModelTracing,
+    OutputGuardrail,
+    RunContextWrapper,
+    Tool,
+    TResponseInputItem,
+    Usage,
+)
+from agents.items import ItemHelpers, TResponseOutputItem, TResponseStreamEvent
+from openai.types.responses import ResponseUsage
+
+logger = logging.getLogger(__name__)
+
+HEDGES = re.compile(
+    r"\b(i'?m not (sure|certain)|i do ?n[o']t know|i am not (sure|certain)|i cannot (help|answer|determine)|"
+    r"i can'?t (help|answer|determine)|i(?: am|'m) unable to|as an ai\b|i don'?t have (access|enough information))",
+    re.IGNORECASE,
+)
+
+
+def heuristic_confidence(text: str) -> float:
+    """0..1 from the text alone: empty, hedging ("I'm not sure...") and looping answers score low."""
+    text = text.strip()
+    if not text:
+        return 0.0
+    score = 1.0
+    if HEDGES.search(text):
+        score *= 0.3
+    sentences = [s.strip().lower() for s in re.split(r"[.!?\n]+", text) if s.strip()]
+    if len(sentences) >= 4 and len(set(sentences)) / len(sentences) < 0.5:
+        score *= 0.3  # the same sentences over and over
+    return score
+
+
+def _usage(response: Any) -> Usage:
+    """The SDK `Usage` of a streamed `response.completed` response (what the Runner would count)."""
+    if response.usage is None:
+        return Usage(requests=1)
+    return Usage(
+        requests=1,
+        input_tokens=response.usage.input_tokens,
+        output_tokens=response.usage.output_tokens,
+        total_tokens=response.usage.total_tokens,
+        input_tokens_details=response.usage.input_tokens_details,
+        output_tokens_details=response.usage.output_tokens_details,
+    )
+
+
+def _with_spent(event: TResponseStreamEvent, spent: Usage) -> TResponseStreamEvent:
+    """A `response.completed` event whose usage also counts `spent` (the escalated tiers' tokens)."""
+    if not spent.requests:
+        return event
+    usage = _usage(event.response)
+    usage.add(spent)
+    merged = ResponseUsage(
+        input_tokens=usage.input_tokens,
+        output_tokens=usage.output_tokens,
+        total_tokens=usage.total_tokens,
+        input_tokens_details=usage.input_tokens_details,
+        output_tokens_details=usage.output_tokens_details,
+    )
+    return event.model_copy(update={"response": event.response.model_copy(update={"usage": merged})})
+
+
+def _final_text(output: list[TResponseOutputItem]) -> str | None:
+    """The message text of a final answer, None if the response calls tools instead."""
+    if any(getattr(item, "type", None) == "function_call" for item in output):
+        return None
+    return "".join(ItemHelpers.extract_last_text(item) or "" for item in output)
+
+
+class CascadeModel(Model):
+    """Tries `tiers` in order; a tier's response is returned once it passes the checks (the last always is)."""
+
+    def __init__(
+        self,
+        tiers: Mapping[str, Model],
+        min_confidence: float = 0.5,
+        confidence: Callable[[str], float] = heuristic_confidence,
+        guardrails: list[OutputGuardrail[Any]] | None = None,
+        agent: Agent[Any] | None = None,  # passed to the guardrails
+        cooldown: float = 30.0,  # seconds a tier that failed outright is skipped
+    ):
+        if not tiers:
+            raise ValueError("CascadeModel needs at least one tier")
+        self.tiers = dict(tiers)
+        self.min_confidence = min_confidence
+        self.confidence = confidence
+        self.guardrails = guardrails or []
+        self.agent = agent
+        self.cooldown = cooldown
+        self.calls: Counter[str] = Counter()
+        self.accepted: Counter[str] = Counter()
+        self.skipped: Counter[str] = Counter()  # calls that bypassed a tier in its cooldown
+        self.seconds: Counter[str] = Counter()
+        self.tokens: Counter[str] = Counter()
+        self.escalations: Counter[str] = Counter()  # reason -> count
+        self._down_until: dict[str, float] = {}
+
+    async def check(
+        self,
+        output: list[TResponseOutputItem],
+        usage: Usage | None,
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+    ) -> str | None:
+        """Why a response should be escalated, or None if it can be used."""
+        offered = {tool.name: tool for tool in tools if isinstance(tool, FunctionTool)}
+        handoff_names = {handoff.tool_name for handoff in handoffs}
+        for item in output:
+            if getattr(item, "type", None) != "function_call":
+                continue
+            if item.name not in offered and item.name not in handoff_names:
+                return "tool_call"
+            try:
+                arguments = json.loads(item.arguments or "{}")
+            except json.JSONDecodeError:
+                return "tool_call"
+            if not isinstance(arguments, dict):
+                return "tool_call"
+            tool = offered.get(item.name)
+            if tool is not None and set(tool.params_json_schema.get("required", [])) - arguments.keys():
+                return "tool_call"
+
+        text = _final_text(output)
+        if text is None:
+            return None  # tool calls only: nothing to judge until the answer
+        if model_settings.max_tokens and usage is not None and usage.output_tokens >= model_settings.max_tokens:
+            return "truncated"
+        final_output: Any = text
+        if output_schema is not None and not output_schema.is_plain_text():
+            try:
+                final_output = output_schema.validate_json(text)
+            except Exception:
+                return "schema"
+        elif self.confidence(text) < self.min_confidence:
+            return "confidence"
+        context = RunContextWrapper(context=None)
+        for guardrail in self.guardrails:
+            result = await guardrail.run(context, self.agent, final_output)
+            if result.output.tripwire_triggered:
+                return "guardrail"
+        return None
+
+    def _escalate(self, tier: str, reason: str) -> None:
+        self.escalations[reason] += 1
+        if reason == "error":
+            self._down_until[tier] = time.monotonic() + self.cooldown
+        logger.debug("cascade tier %s escalated: %s", tier, reason)
+
+    def _cooling_down(self, tier: str) -> bool:
+        if time.monotonic() < self._down_until.get(tier, 0.0):
+            self.skipped[tier] += 1
+            return True
+        return False
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        prompt: Any | None,
+    ) -> ModelResponse:
+        *cheaper, (last_name, last) = self.tiers.items()
+        spent = Usage()  # tokens of escalated answers
+        for name, model in cheaper:
+            if self._cooling_down(name):
+                continue
+            self.calls[name] += 1
+            start = time.perf_counter()
+            response = None
+            try:
+                response = await model.get_response(
+                    system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+                    previous_response_id=previous_response_id, prompt=prompt,
+                )
+                self.tokens[name] += response.usage.total_tokens
+                reason = await self.check(response.output, response.usage, model_settings, tools, output_schema, handoffs)
+            except Exception:
+                logger.warning("cascade tier %s failed; escalating", name, exc_info=True)
+                reason = "error"
+            finally:
+                self.seconds[name] += time.perf_counter() - start
+            if reason is None:
+                self.accepted[name] += 1
+                response.usage.add(spent)
+                return response
+            if response is not None:
+                spent.add(response.usage)
+            self._escalate(name, reason)
+
+        self.calls[last_name] += 1
+        start = time.perf_counter()
+        try:
+            response = await last.get_response(
+                system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+                previous_response_id=previous_response_id, prompt=prompt,
+            )
+        finally:
+            self.seconds[last_name] += time.perf_counter() - start
+        self.tokens[last_name] += response.usage.total_tokens
+        self.accepted[last_name] += 1
+        response.usage.add(spent)
+        return response
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        prompt: Any | None,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        *cheaper, (last_name, last) = self.tiers.items()
+        spent = Usage()  # tokens of escalated answers
+        for name, model in cheaper:
+            if self._cooling_down(name):
+                continue
+            self.calls[name] += 1
+            start = time.perf_counter()
+            events: list[TResponseStreamEvent] = []
+            completed = None
+            try:
+                async for event in model.stream_response(
+                    system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+                    previous_response_id=previous_response_id, prompt=prompt,
+                ):
+                    events.append(event)
+                    if getattr(event, "type", None) == "response.completed":
+                        completed = event.response
+                if completed is None:
+                    reason = "error"
+                else:
+                    usage = _usage(completed)
+                    self.tokens[name] += usage.total_tokens
+                    reason = await self.check(completed.output, usage, model_settings, tools, output_schema, handoffs)
+            except Exception:
+                logger.warning("cascade tier %s failed; escalating", name, exc_info=True)
+                reason = "error"
+            finally:
+                self.seconds[name] += time.perf_counter() - start
+            if reason is None:
+                self.accepted[name] += 1
+                for event in events:
+                    if getattr(event, "type", None) == "response.completed":
+                        event = _with_spent(event, spent)
+                    yield event
+                return
+            if completed is not None:
+                spent.add(_usage(completed))
+            self._escalate(name, reason)
+
+        self.calls[last_name] += 1
+        start = time.perf_counter()
+        try:
+            async for event in last.stream_response(
+                system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+                previous_response_id=previous_response_id, prompt=prompt,
+            ):
+                if getattr(event, "type", None) == "response.completed":
+                    self.tokens[last_name] += _usage(event.response).total_tokens
+                    event = _with_spent(event, spent)
+                yield event
+        finally:
+            self.seconds[last_name] += time.perf_counter() - start
+        self.accepted[last_name] += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Per tier: calls, accepted answers, hit rate, cooldown skips, time and tokens spent; escalations by reason."""
+        return {
+            "calls": dict(self.calls),
+            "accepted": dict(self.accepted),
+            "hit_rate": {name: self.accepted[name] / self.calls[name] if self.calls[name] else 0.0 for name in self.tiers},
+            "skipped": dict(self.skipped),
+            "seconds": {name: round(self.seconds[name], 3) for name in self.tiers},
+            "tokens": {name: self.tokens[name] for name in self.tiers},
+            "escalations": dict(self.escalations),
+        }
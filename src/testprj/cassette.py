@@ -0,0 +1,196 @@
+"""
+Record/replay cassettes for `OpenAIChatCompletionsModel`.
+
+None of the flows can be benchmarked without a live Gemini or Ollama endpoint. A cassette
+captures every chat-completions request -> response (streamed chunks included, together with the
+time between chunks) into a compact JSON-lines file, and replays it deterministically with no
+network. Replay happens at the HTTP-client boundary, so the SDK's own conversion, streaming,
+tool-dispatch and guardrail code still runs exactly as it does live - which is what we want to
+measure on CI.
+
+Usage:
+    from testprj.cassette import Cassette, CassetteModel
+
+    cassette = Cassette("cassettes/handoff.jsonl.gz", mode="record")   # or "replay" / "auto"
+    model = CassetteModel("gemini-1.5-flash", cassette, openai_client=get_client())
+
+Or for every flow at once (no code changes), via `testprj.providers.get_model`:
+    AGENT_CASSETTE=cassettes/run.jsonl.gz AGENT_CASSETTE_MODE=record python -m ...
+    AGENT_CASSETTE=cassettes/run.jsonl.gz AGENT_CASSETTE_LATENCY=1.0 python -m ...   # replay at recorded speed
+
+Modes:
+    record  - call the real client and append every interaction to the file
+    replay  - never touch the network; unknown requests raise `CassetteMiss`
+    auto    - replay when recorded, otherwise record
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import time
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from types import SimpleNamespace
+from typing import Any, Literal
+
+from agents import AsyncOpenAI, OpenAIChatCompletionsModel
+from openai import NOT_GIVEN
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+CassetteMode = Literal["record", "replay", "auto"]
+
+# Request fields that change between SDK versions/runs but not the model's answer.
+_IGNORED_FIELDS = {"extra_headers", "extra_query", "extra_body", "metadata", "store", "stream_options"}
+
+
+class CassetteMiss(KeyError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+def request_key(request: dict[str, Any]) -> str:
+    """Canonical hash of a chat-completions request (order-insensitive, sentinel-free)."""
+    canonical = {
+        k: v for k, v in request.items() if k not in _IGNORED_FIELDS and v is not NOT_GIVEN and v is not None
+    }
+    blob = json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()[:32]
+
+
+class Cassette:
+    def __init__(self, path: str | os.PathLike, mode: CassetteMode = "replay"):
+        self.path = os.fspath(path)
+        self.mode = mode
+        self._entries: dict[str, list[dict]] = defaultdict(list)
+        self._cursor: dict[str, int] = defaultdict(int)
+        self.hits = 0
+        self.recorded = 0
+        self._load()
+
+    def _open(self, mode: str):
+        if self.path.endswith(".gz"):
+            return gzip.open(self.path, mode + "t", encoding="utf-8")
+        return open(self.path, mode, encoding="utf-8")
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            if self.mode == "replay":
+                raise FileNotFoundError(f"Cassette {self.path} does not exist (record it first)")
+            return
+        with self._open("r") as fh:
+            for line in fh:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry["key"]].append(entry)
+
+    def lookup(self, key: str) -> dict | None:
+        """Next recorded entry for `key`. Repeated identical requests replay their recordings in order."""
+        entries = self._entries.get(key)
+        if not entries:
+            return None
+        index = self._cursor[key] % len(entries)
+        self._cursor[key] += 1
+        self.hits += 1
+        return entries[index]
+
+    def append(self, entry: dict) -> None:
+        self._entries[entry["key"]].append(entry)
+        self._cursor[entry["key"]] += 1  # a later identical request should get the *next* recording
+        self.recorded += 1
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._open("a") as fh:
+            fh.write(json.dumps(entry, separators=(",", ":"), ensure_ascii=False) + "\n")
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._entries.values())
+
+
+class _CassetteCompletions:
+    def __init__(self, client: "CassetteClient"):
+        self._client = client
+
+    async def create(self, **request: Any) -> ChatCompletion | AsyncIterator[ChatCompletionChunk]:
+        return await self._client.create(request)
+
+
+class CassetteClient:
+    """Duck-typed stand-in for `AsyncOpenAI` as used by `OpenAIChatCompletionsModel`."""
+
+    def __init__(self, cassette: Cassette, real_client: AsyncOpenAI | None = None, latency_scale: float = 0.0):
+        self.cassette = cassette
+        self.real_client = real_client
+        self.latency_scale = latency_scale  # 0 = as fast as possible, 1.0 = recorded timing
+        self.base_url = real_client.base_url if real_client is not None else "http://cassette.invalid/v1"
+        self.chat = SimpleNamespace(completions=_CassetteCompletions(self))
+
+    async def create(self, request: dict[str, Any]) -> ChatCompletion | AsyncIterator[ChatCompletionChunk]:
+        key = request_key(request)
+        stream = bool(request.get("stream"))
+        if self.cassette.mode != "record":
+            entry = self.cassette.lookup(key)
+            if entry is not None:
+                return await self._replay(entry)
+            if self.cassette.mode == "replay":
+                raise CassetteMiss(f"No recording for request {key} (model={request.get('model')}) in {self.cassette.path}")
+        if self.real_client is None:
+            raise RuntimeError("Recording needs a real openai_client")
+        return await self._record(key, request, stream)
+
+    async def _replay(self, entry: dict) -> ChatCompletion | AsyncIterator[ChatCompletionChunk]:
+        if not entry["stream"]:
+            await self._sleep(entry["elapsed"])
+            return ChatCompletion.model_validate(entry["response"])
+        return self._replay_stream(entry["chunks"])
+
+    async def _replay_stream(self, chunks: list[list]) -> AsyncIterator[ChatCompletionChunk]:
+        for delay, chunk in chunks:
+            await self._sleep(delay)
+            yield ChatCompletionChunk.model_validate(chunk)
+
+    async def _sleep(self, seconds: float) -> None:
+        if self.latency_scale and seconds:
+            await asyncio.sleep(seconds * self.latency_scale)
+
+    async def _record(self, key: str, request: dict, stream: bool) -> ChatCompletion | AsyncIterator[ChatCompletionChunk]:
+        start = time.perf_counter()
+        response = await self.real_client.chat.completions.create(**request)
+        if not stream:
+            self.cassette.append({
+                "key": key,
+                "model": request.get("model"),
+                "stream": False,
+                "elapsed": round(time.perf_counter() - start, 4),
+                "response": response.model_dump(exclude_none=True),
+            })
+            return response
+        return self._record_stream(key, request, response, start)
+
+    async def _record_stream(self, key: str, request: dict, stream, start: float) -> AsyncIterator[ChatCompletionChunk]:
+        chunks = []
+        last = start
+        async for chunk in stream:
+            now = time.perf_counter()
+            chunks.append([round(now - last, 4), chunk.model_dump(exclude_none=True)])  # first delay = time to first chunk
+            last = now
+            yield chunk
+        self.cassette.append({"key": key, "model": request.get("model"), "stream": True, "chunks": chunks})
+
+
+class CassetteModel(OpenAIChatCompletionsModel):
+    """`OpenAIChatCompletionsModel` whose HTTP calls go through a cassette."""
+
+    def __init__(
+        self,
+        model: str,
+        cassette: Cassette | str,
+        openai_client: AsyncOpenAI | None = None,
+        mode: CassetteMode = "replay",
+        latency_scale: float = 0.0,
+    ):
+        if not isinstance(cassette, Cassette):
+            cassette = Cassette(cassette, mode=mode)
+        self.cassette = cassette
+        super().__init__(model=model, openai_client=CassetteClient(cassette, openai_client, latency_scale))
@@ -1,22 +1,16 @@
 # Import core components from the openai-agents framework
 from dataclasses import dataclass
 from datetime import datetime
-from agents import Agent, ModelSettings, RunContextWrapper, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, function_tool, set_tracing_disabled
+from agents import Agent, ModelSettings, RunContextWrapper, Runner, function_tool, set_tracing_disabled
+from testprj.loop_runner import run_agent
+from testprj.providers import get_model
+from testprj import tool_cache
 from dotenv import load_dotenv
 import os
 load_dotenv()
 
-# Set up the external language model provider (Google's Gemini, using OpenAI-compatible API)
-externalProvider = AsyncOpenAI(
-    api_key=os.getenv("GEMINI_API_KEY"),  # API key for Gemini
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",  # Gemini-compatible endpoint
-)
-
-# Create a chat completions model using the Gemini model via the OpenAI API interface
-model = OpenAIChatCompletionsModel(
-    model="gemini-1.5-flash",  # Name of the Gemini model to use
-    openai_client=externalProvider  # The provider configured above
-)
+# Gemini model served from the shared, pooled provider client (see testprj/providers.py)
+model = get_model("gemini-1.5-flash")
 
 # Disable internal tracing/logging (optional – for performance or privacy)
 set_tracing_disabled(True)
@@ -32,7 +26,8 @@ def excersize_routine() -> str:
     print(f"Excercising body part")
     return f"excersises for this week for body part."
 
-@function_tool
+# Semi-pure: the time is reused for up to a second (several calls within one turn share it)
+@tool_cache.function_tool(ttl=1.0)
 def get_current_time() -> str:
     """
     Returns the current system time in ISO 8601 format.
@@ -66,17 +61,20 @@ def runAgent():
     )
    
     # Run the agent synchronously with a given input
+    hooks = tool_cache.ToolCacheHooks()  # hit rate of the memoized get_current_time across the session
     while True:
         iinput = input("Enter your message: ")
         if iinput == "exit" or iinput == "":
             break
-        response = Runner.run_sync(
+        response = run_agent(  # one background loop for the whole session: the pooled connection stays warm
             starting_agent=agent,
             input=iinput,  # Input message to the assistant
-            max_turns=2 #max_turns is the maximum number of turns the agent will take to complete the task
+            max_turns=2, #max_turns is the maximum number of turns the agent will take to complete the task
                         #llm receive a input either from user or from tool call is count as one turn
+            hooks=hooks,
         )
         print(response.final_output)
+        print(f"tool cache: {hooks.stats()}")
 
    
     
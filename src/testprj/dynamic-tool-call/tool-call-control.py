@@ -1,22 +1,14 @@
 # Import core components from the openai-agents framework
 from dataclasses import dataclass
-from agents import Agent, ModelSettings, RunContextWrapper, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, function_tool, set_tracing_disabled
+from agents import Agent, ModelSettings, RunContextWrapper, Runner, function_tool, set_tracing_disabled
+from testprj.providers import get_model
 
 from dotenv import load_dotenv
 import os
 load_dotenv()
 
-# Set up the external language model provider (Google's Gemini, using OpenAI-compatible API)
-externalProvider = AsyncOpenAI(
-    api_key=os.getenv("GEMINI_API_KEY"),  # API key for Gemini
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",  # Gemini-compatible endpoint
-)
-
-# Create a chat completions model using the Gemini model via the OpenAI API interface
-model = OpenAIChatCompletionsModel(
-    model="gemini-1.5-flash",  # Name of the Gemini model to use
-    openai_client=externalProvider  # The provider configured above
-)
+# Gemini model served from the shared, pooled provider client (see testprj/providers.py)
+model = get_model("gemini-1.5-flash")
 
 # Disable internal tracing/logging (optional – for performance or privacy)
 set_tracing_disabled(True)
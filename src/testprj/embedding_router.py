@@ -0,0 +1,194 @@
+"""
+Embedding-based handoff routing for agents with many handoffs.
+
+A triage agent like `agent_f_2` in practices/handOff.py sends the name, description and schema of
+EVERY handoff with every request, so prompt tokens (and latency) grow with the number of
+specialists - and the model picks among all of them. `EmbeddingRouter` puts a vector index in
+front of it:
+
+- each handoff agent's `handoff_description` (or its name) is embedded ONCE into an in-memory
+  NumPy matrix (`HandoffIndex`, L2-normalized rows; embeddings are cached by text, so adding
+  agents only embeds the new ones);
+- per request the user input is embedded and scored against every row (one matrix-vector
+  product, cosine similarity);
+- a clear winner (`route_above`, `margin` ahead of the runner-up) is routed to directly - no
+  triage call at all; otherwise the triage agent runs with only the top-k handoffs.
+
+Embeddings come from the provider's OpenAI-compatible `/embeddings` endpoint (`ProviderEmbedder`,
+on the shared pooled client) or, without any model call, from `HashingEmbedder` (hashed
+bag-of-words). If embedding fails - or NumPy is not installed - the router falls back to the
+unmodified triage agent.
+
+    router = EmbeddingRouter(agent_f_2, ProviderEmbedder("text-embedding-004"), k=3)
+    agent = await router.select("what is the diameter of jupiter?")  # a tutor, or agent_f_2 with <= 3 handoffs
+    router.stats()  # {"routed": 12, "narrowed": 30, "fallback": 0, "routed_rate": 0.29, ...}
+"""
+
+import logging
+import re
+import zlib
+from collections.abc import Sequence
+from typing import Any, Protocol
+
+from agents import Agent, Handoff, TResponseInputItem
+
+from testprj import providers
+from testprj.caching import TTLCache
+from testprj._sdk import last_user_text
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is an optional extra
+    np = None
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"\w+")
+
+
+class Embedder(Protocol):
+    async def embed(self, texts: list[str]) -> "np.ndarray":
+        """One row per text."""
+        ...
+
+
+class HashingEmbedder:
+    """Signed hashed unigrams + bigrams; no model call, but only lexical similarity."""
+
+    def __init__(self, dim: int = 2048):
+        self.dim = dim
+
+    def _vector(self, text: str) -> "np.ndarray":
+        tokens = _TOKEN.findall(text.lower())
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for gram in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            h = zlib.crc32(gram.encode())
+            vector[h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        return vector
+
+    async def embed(self, texts: list[str]) -> "np.ndarray":
+        return np.stack([self._vector(text) for text in texts]) if texts else np.zeros((0, self.dim), np.float32)
+
+
+class ProviderEmbedder:
+    """The `/embeddings` endpoint of a provider registered in `testprj.providers`."""
+
+    def __init__(self, model: str = "text-embedding-004", provider: str = "gemini"):
+        self.model = model
+        self.provider = provider
+
+    async def embed(self, texts: list[str]) -> "np.ndarray":
+        response = await providers.get_client(self.provider).embeddings.create(model=self.model, input=texts)
+        rows = sorted(response.data, key=lambda item: item.index)
+        return np.asarray([row.embedding for row in rows], dtype=np.float32)
+
+
+def _normalize(matrix: "np.ndarray") -> "np.ndarray":
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def _describe(agent: Agent[Any]) -> str:
+    return (agent.handoff_description or agent.name).strip()
+
+
+class HandoffIndex:
+    """Normalized embeddings of handoff agents, one row per agent."""
+
+    def __init__(self, embedder: Embedder, cache: TTLCache | None = None):
+        self.embedder = embedder
+        self.cache = cache if cache is not None else TTLCache(maxsize=4096, ttl=None)  # text -> unit vector
+        self.agents: list[Agent[Any]] = []
+        self.matrix: "np.ndarray | None" = None
+        self._ids: set[int] = set()  # the index holds its agents, so their ids stay unique
+
+    async def add(self, agents: Sequence[Agent[Any]]) -> None:
+        new = [agent for agent in agents if id(agent) not in self._ids]
+        if not new:
+            return
+        if np is None:
+            raise RuntimeError("HandoffIndex needs numpy (pip install 'testprj[numpy]')")
+        texts = [_describe(agent) for agent in new]
+        missing = sorted({text for text in texts if self.cache.get(text) is None})
+        if missing:
+            for text, vector in zip(missing, _normalize(await self.embedder.embed(missing))):
+                self.cache.set(text, vector)
+        new = [agent for agent in new if id(agent) not in self._ids]  # added by a concurrent call meanwhile
+        if not new:
+            return
+        rows = np.stack([self.cache.get(_describe(agent)) for agent in new])
+        self.matrix = rows if self.matrix is None else np.vstack([self.matrix, rows])
+        self.agents.extend(new)
+        self._ids.update(id(agent) for agent in new)
+
+    async def search(self, text: str, k: int) -> list[tuple[Agent[Any], float]]:
+        """The `k` most similar agents, best first, with their cosine similarity."""
+        if self.matrix is None or not text.strip():
+            return []
+        query = _normalize(await self.embedder.embed([text]))[0]
+        scores = self.matrix @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.agents[i], float(scores[i])) for i in top]
+
+
+class EmbeddingRouter:
+    def __init__(
+        self,
+        triage: Agent[Any],
+        embedder: Embedder | None = None,
+        k: int = 3,
+        route_above: float = 0.6,
+        margin: float = 0.1,
+        index: HandoffIndex | None = None,
+    ):
+        self.triage = triage
+        self.k = k
+        self.route_above = route_above
+        self.margin = margin
+        self.index = index or HandoffIndex(embedder or HashingEmbedder())
+        self._narrowed: TTLCache = TTLCache(maxsize=1024, ttl=None)  # top-k ids -> triage clone
+        self.counts = {"routed": 0, "narrowed": 0, "fallback": 0}
+
+    def _agent_handoffs(self) -> list[Agent[Any]]:
+        return [h for h in self.triage.handoffs if isinstance(h, Agent)]
+
+    def _narrow(self, agents: list[Agent[Any]]) -> Agent[Any]:
+        # Handoff objects (handoff(...)) cannot be indexed by description; they are always kept
+        fixed = [h for h in self.triage.handoffs if isinstance(h, Handoff)]
+        key = tuple(id(agent) for agent in agents)
+        clone = self._narrowed.get(key)
+        if clone is None:
+            # the same clone for the same top-k, so compiled tool sets (tool_registry) stay cached;
+            # the clone holds its handoff agents, so the ids in its key cannot be reused
+            clone = self.triage.clone(handoffs=[*agents, *fixed])
+            self._narrowed.set(key, clone)
+        return clone
+
+    async def select(self, input: str | list[TResponseInputItem]) -> Agent[Any]:
+        """A specialist to start on, the triage agent with the top-k handoffs, or the triage agent itself."""
+        try:
+            await self.index.add(self._agent_handoffs())
+            ranked = await self.index.search(last_user_text(input), self.k)
+        except Exception:
+            logger.warning("handoff embedding failed; using every handoff", exc_info=True)
+            ranked = []
+        if not ranked:
+            self.counts["fallback"] += 1
+            return self.triage
+        best_agent, best = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else -1.0
+        if best >= self.route_above and best - runner_up >= self.margin:
+            self.counts["routed"] += 1
+            return best_agent
+        self.counts["narrowed"] += 1
+        return self._narrow([agent for agent, _ in ranked])
+
+    def stats(self) -> dict[str, float]:
+        total = sum(self.counts.values())
+        return {
+            **self.counts,
+            "routed_rate": self.counts["routed"] / total if total else 0.0,
+            "indexed": len(self.index.agents),
+        }
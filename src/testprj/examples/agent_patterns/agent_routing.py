@@ -2,29 +2,32 @@ import asyncio
 from typing import Any, Literal
 import uuid
 from agents import (Agent, AgentHooks, FunctionToolResult, ModelSettings, RawResponsesStreamEvent, RunContextWrapper, RunHooks, 
-                    Runner, AsyncOpenAI, OpenAIChatCompletionsModel, TResponseInputItem, Tool, ToolsToFinalOutputFunction, 
+                    Runner, TResponseInputItem, Tool, ToolsToFinalOutputFunction, 
                     ToolsToFinalOutputResult, function_tool, set_tracing_disabled)
+from testprj.caching import TTLCache
+from testprj.history_compaction import HistoryCompactor, compacted
+from testprj.prerouter import PreRouter, Route
+from testprj.speculative_handoff import HandoffSpeculator
+from testprj.providers import get_model
+from testprj import tool_cache
 from dotenv import load_dotenv
 import os
 
 from pydantic import BaseModel
 load_dotenv()
 
-# Set up the external language model provider (Google's Gemini, using OpenAI-compatible API)
-externalProvider = AsyncOpenAI(
-    api_key="ollama",  # dummy value to satisfy SDK
-    base_url="http://localhost:11434/v1"  # local Ollama endpoint
-)
-
-# Create a chat completions model using the Gemini model via the OpenAI API interface
-model = OpenAIChatCompletionsModel(
-    model="llama3.2:latest",  # Name of the llama model to use from ollama
-    openai_client=externalProvider  # The provider configured above
-)
+# Local Ollama model served from the shared, pooled provider client (see testprj/providers.py)
+model = get_model("llama3.2:latest", provider="ollama")
 
 # Disable internal tracing/logging (optional – for performance or privacy)
 set_tracing_disabled(True)
 
+# `inputs = result.to_input_list()` is carried for the whole conversation: each agent compacts
+# older turns into a summary beyond its own token budget; the summaries are shared between agents
+summaries = TTLCache(maxsize=1024, ttl=None)
+language_model = compacted(model, HistoryCompactor(budget_tokens=2000, cache=summaries))
+triage_model = compacted(model, HistoryCompactor(budget_tokens=800, keep_recent=2, cache=summaries))
+
 """
 This example shows the handoffs/routing pattern. The triage agent receives the first message, and
 then hands off to the appropriate agent based on the language of the request. Responses are
@@ -37,7 +40,7 @@ def return_to_triage() -> str:
     print("return_to_triage tool called")
     return "Returning to triage agent"
 
-@function_tool(name_override="multiply")
+@tool_cache.function_tool(name_override="multiply", pure=True)  # memoized: same numbers, same product
 def multiply(a: int, b: int) -> int:
     """Multiply two numbers"""
     print(f"multiply tool called with {a} and {b}")
@@ -56,7 +59,7 @@ french_agent = Agent(
     name="french_agent",
     instructions="""You only speak French. If the user asks to go back to the main menu, 
     switch languages, or talk to a different agent, use the return_to_triage tool.""",
-    model=model,
+    model=language_model,
     tools=[return_to_triage],
 )
 
@@ -64,7 +67,7 @@ spanish_agent = Agent(
     name="spanish_agent",
     instructions="""You only speak Spanish. If the user asks to go back to the main menu, 
     switch languages, or talk to a different agent, use the return_to_triage tool.""",
-    model=model,
+    model=language_model,
     tools=[return_to_triage],
 )
 
@@ -72,7 +75,7 @@ english_agent = Agent(
     name="english_agent",
     instructions="""You only speak English. If the user asks to go back to the main menu, 
     switch languages, or talk to a different agent, use the return_to_triage tool.""",
-    model=model,
+    model=language_model,
     tools=[return_to_triage, multiply],
 )
 
@@ -82,15 +85,41 @@ triage_agent = Agent(
     the language or request.
     Welcome users and help them choose the right language agent.""",
     handoffs=[french_agent, spanish_agent, english_agent],
-    model=model,
+    model=triage_model,
     
 )
 
+language_routes = [
+    Route(spanish_agent, languages=["es"]),
+    Route(french_agent, languages=["fr"]),
+    Route(english_agent, languages=["en"]),
+]
+# A message that names a language ("Please reply in French: ...", "dímelo en inglés") asks for that
+# language, whatever it is written in: triage decides those
+language_requests = [
+    r"(?:in|into|to)\s+(?:english|spanish|french)",
+    r"(?:en|al)\s+(?:ingl[eé]s|espa[nñ]ol|franc[eé]s|anglais|espagnol|fran[cç]ais)",
+]
+
+# When triage does run, the language agent's first call starts before triage has finished: on a
+# lenient guess from the same rules, or as soon as the handoff shows up in the triage stream.
+# A wrong guess is thrown away.
+likely_language = PreRouter(language_routes, fallback=triage_agent, threshold=0.5, min_evidence=1,
+                            defer=language_requests)
+handoff_speculator = HandoffSpeculator(predict=lambda text: getattr(likely_language.decide(text), "agent", None))
+speculative_triage = handoff_speculator.prepare(triage_agent)
+
+# Unambiguous first messages (clearly Spanish, French or English) start on the language agent
+# directly; short or mixed ones still go through the triage model call.
+language_router = PreRouter(language_routes, fallback=speculative_triage, defer=language_requests)
+
 
 async def main():
     msg = input("Hi! We speak French, Spanish and English. How can I help? ")
-    agent = triage_agent
+    agent = language_router.select(msg)
+    print(f"pre-router: {language_router.stats()}")
     inputs: list[TResponseInputItem] = [{"content": msg, "role": "user"}]
+    tool_hooks = tool_cache.ToolCacheHooks()  # memoized multiply calls and hits over the conversation
 
     while True:
         # Each conversation turn is a single trace. Normally, each input from the user would be an
@@ -99,6 +128,7 @@ async def main():
         result = Runner.run_streamed(
             agent,
             input=inputs,
+            hooks=tool_hooks,
         )
         # Track if we need to switch back to triage
         should_switch_to_triage_flag = False
@@ -118,17 +148,21 @@ async def main():
 
         inputs = result.to_input_list()
         print("\n")
+        if tool_hooks.counts:
+            print(f"tool cache: {tool_hooks.stats()}")
+        if handoff_speculator.counts["started"]:
+            print(f"speculative handoffs: {handoff_speculator.stats()}")
 
         # If switch was requested via tool and we're not already on triage, go back to triage agent
         if should_switch_to_triage_flag and agent.name != "triage_agent":
-            agent = triage_agent
+            agent = speculative_triage
             inputs.append({"content": "I'd like to switch languages or go back to the main menu.", "role": "user"})
         else:
             user_msg = input("Enter a message (or type 'switch language' to change): ")
             
             # Manual check for switch request - only if not already on triage
             if should_switch_to_triage(user_msg) and agent.name != "triage_agent":
-                agent = triage_agent
+                agent = speculative_triage
                 inputs.append({"content": "I'd like to switch languages.", "role": "user"})
             else:
                 inputs.append({"content": user_msg, "role": "user"})
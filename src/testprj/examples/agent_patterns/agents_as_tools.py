@@ -1,25 +1,25 @@
 # Import core components from the openai-agents framework
 import asyncio
-from agents import Agent, AgentHooks, ModelSettings, RunContextWrapper, RunHooks, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, Tool, function_tool, set_tracing_disabled
+from agents import Agent, AgentHooks, ModelSettings, RunContextWrapper, RunHooks, Runner, Tool, function_tool, set_tracing_disabled
+from testprj.parallel_tools import ToolLimiter
+from testprj.providers import get_model
 from dotenv import load_dotenv
 import os
 load_dotenv()
 
-# Set up the external language model provider (Google's Gemini, using OpenAI-compatible API)
-externalProvider = AsyncOpenAI(
-    api_key=os.getenv("GEMINI_API_KEY"),  # API key for Gemini
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",  # Gemini-compatible endpoint
-)
-
-# Create a chat completions model using the Gemini model via the OpenAI API interface
-model = OpenAIChatCompletionsModel(
-    model="gemini-1.5-flash",  # Name of the Gemini model to use
-    openai_client=externalProvider  # The provider configured above
-)
+# Gemini model served from the shared, pooled provider client (see testprj/providers.py)
+model = get_model("gemini-1.5-flash")
 
 # Disable internal tracing/logging (optional – for performance or privacy)
 set_tracing_disabled(True)
 
+# Translator sub-runs requested in one turn run concurrently: at most AGENT_TOOL_CONCURRENCY at a
+# time (across every orchestrator run of the worker), each cancelled after AGENT_TOOL_TIMEOUT seconds
+translator_limiter = ToolLimiter(
+    max_concurrency=int(os.getenv("AGENT_TOOL_CONCURRENCY", "4")),
+    timeout=float(os.getenv("AGENT_TOOL_TIMEOUT", "30")),
+)
+
 
 """
     This example shows the agents-as-tools pattern. The frontline agent receives a user message and
@@ -89,10 +89,10 @@ orchestrator_agent = Agent(
     name="orchestrator_agent",
     instructions=(
         "You are a translation agent. You use the tools given to you to translate."
-        "If asked for multiple translations, you call the relevant tools in order."
+        "If asked for multiple translations, you call all the relevant tools at once, in a single turn."
         "You never translate on your own, you always use the provided tools."
     ),
-    tools=[
+    tools=translator_limiter.wrap_all([
         spanish_agent.as_tool(
             tool_name="translate_to_spanish",
             tool_description="Translate the user's message to Spanish",
@@ -109,8 +109,9 @@ orchestrator_agent = Agent(
             tool_name="translate_to_urdu",
             tool_description="Translate the user's message to Urdu",
         ),
-    ],
+    ]),
     model=model,
+    model_settings=ModelSettings(parallel_tool_calls=True),
     hooks=CustomAgentHook(),
 )
 
@@ -1,23 +1,18 @@
 # Import core components from the openai-agents framework
-import asyncio
-from agents import Agent, AgentHooks, ModelSettings, RunContextWrapper, RunHooks, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, Tool, function_tool, set_tracing_disabled
+import uuid
+from agents import Agent, AgentHooks, ModelSettings, RunContextWrapper, RunHooks, Runner, Tool, function_tool, set_tracing_disabled
+from testprj.loop_runner import run
+from testprj.pipeline import Pipeline, Stage, StageStore
+from testprj.providers import get_model
+from testprj.response_cache import cached
 from dotenv import load_dotenv
 import os
 
 from pydantic import BaseModel
 load_dotenv()
 
-# Set up the external language model provider (Google's Gemini, using OpenAI-compatible API)
-externalProvider = AsyncOpenAI(
-    api_key=os.getenv("GEMINI_API_KEY"),  # API key for Gemini
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",  # Gemini-compatible endpoint
-)
-
-# Create a chat completions model using the Gemini model via the OpenAI API interface
-model = OpenAIChatCompletionsModel(
-    model="gemini-1.5-flash",  # Name of the Gemini model to use
-    openai_client=externalProvider  # The provider configured above
-)
+# Gemini model served from the shared, pooled provider client (see testprj/providers.py)
+model = get_model("gemini-1.5-flash")
 
 # Disable internal tracing/logging (optional – for performance or privacy)
 set_tracing_disabled(True)
@@ -70,7 +65,7 @@ outline_checker_agent = Agent(
     name="outline_checker_agent",
     instructions="Read the given story outline, and judge the quality. Also, determine if it is a horror story.",
     output_type=OutlineCheckerOutput, #This tells the agent what kind of structured output you expect it to return
-    model=model,
+    model=cached(model), # the same outline always gets the same verdict, so re-judging it is served from cache
     hooks=CustomAgentHook(),
 )
 
@@ -81,48 +76,59 @@ story_agent = Agent(
     model=model,
     hooks=CustomAgentHook(),
 )
-def main():
-    input_prompt = input("What kind of story do you want? ")
 
-    # Ensure the entire workflow is a single trace
-    # with trace("Deterministic story flow"):
-        # 1. Generate an outline
-    outline_result = asyncio.run(Runner.run(
-        story_outline_agent,
-        input_prompt,
-    ))
+
+# One DAG on one event loop: outline -> check -> story, with the quality / horror gate as a
+# conditional edge. Each stage output is checkpointed; with PIPELINE_CACHE_PATH set they are kept
+# on disk, and re-running with the same PIPELINE_RUN_ID resumes after the last stage that completed.
+story_pipeline = Pipeline(
+    [
+        Stage("outline", story_outline_agent),
+        Stage("check", outline_checker_agent, after=["outline"]),
+        Stage(
+            "story",
+            story_agent,
+            after=["outline", "check"],
+            prompt=lambda outputs: outputs["outline"],
+            when=lambda outputs: outputs["check"].good_quality and outputs["check"].is_horror,
+        ),
+    ],
+    store=StageStore(os.getenv("PIPELINE_CACHE_PATH") or None),
+)
+
+
+async def write_story(input_prompt: str, run_id: str | None = None) -> str | None:
+    result = await story_pipeline.run(input_prompt, run_id=run_id)
+    if result.error is not None:
+        if story_pipeline.store.disk is not None:
+            print(f"Stage {result.failed_stage} failed ({result.error}); re-run with PIPELINE_RUN_ID={run_id} to resume.")
+        else:  # memory-only checkpoints are gone once this process exits
+            print(f"Stage {result.failed_stage} failed ({result.error}); set PIPELINE_CACHE_PATH to keep checkpoints for a resume.")
+        return None
+    print(f"Stages: {result.status}")
     print("///Outline generated///")
 
-    # 2. Check the outline
-    outline_checker_result =  asyncio.run(Runner.run(
-        outline_checker_agent,
-        outline_result.final_output,
-    ))
-
-    # 3. Add a gate to stop if the outline is not good quality or not a scifi story
-    
-    """
-    assert isinstance(outline_checker_result.final_output, OutlineCheckerOutput)
-    This is a safety check to make sure the output is actually of the type you expected.
-        If the model returned something invalid or unstructured, this would raise an error instead of continuing with bad data.
-    """
-    assert isinstance(outline_checker_result.final_output, OutlineCheckerOutput)
-    if not outline_checker_result.final_output.good_quality:
+    # Gate: the story stage only ran if the outline is good quality and a horror story.
+    # The checker's structured output comes back as OutlineCheckerOutput (also from a checkpoint).
+    check = result.outputs["check"]
+    assert isinstance(check, OutlineCheckerOutput)
+    if not check.good_quality:
         print("Outline is not good quality, so we stop here.")
-        exit(0)
-
-    if not outline_checker_result.final_output.is_horror:
+        return None
+    if not check.is_horror:
         print("Outline is not a horror story, so we stop here.")
-        exit(0)
+        return None
 
     print("///Outline is good quality and a horror story, so we continue to write the story.///")
+    return result.outputs["story"]
 
-    # 4. Write the story
-    story_result =  asyncio.run(Runner.run(
-        story_agent,
-        outline_result.final_output,
-    ))
-    print(f"Story: {story_result.final_output}")
+
+def main():
+    input_prompt = input("What kind of story do you want? ")
+    run_id = os.getenv("PIPELINE_RUN_ID") or uuid.uuid4().hex
+    story = run(write_story(input_prompt, run_id))
+    if story is not None:
+        print(f"Story: {story}")
 
 
 if __name__ == "__main__":
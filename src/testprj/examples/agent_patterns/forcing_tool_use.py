@@ -1,25 +1,17 @@
 import asyncio
 from typing import Any, Literal
 from agents import (Agent, AgentHooks, FunctionToolResult, ModelSettings, RunContextWrapper, RunHooks, 
-                    Runner, AsyncOpenAI, OpenAIChatCompletionsModel, Tool, ToolsToFinalOutputFunction, 
+                    Runner, Tool, ToolsToFinalOutputFunction, 
                     ToolsToFinalOutputResult, function_tool, set_tracing_disabled)
+from testprj.providers import get_model
 from dotenv import load_dotenv
 import os
 
 from pydantic import BaseModel
 load_dotenv()
 
-# Set up the external language model provider (Google's Gemini, using OpenAI-compatible API)
-externalProvider = AsyncOpenAI(
-    api_key="ollama",  # dummy value to satisfy SDK
-    base_url="http://localhost:11434/v1"  # local Ollama endpoint
-)
-
-# Create a chat completions model using the Gemini model via the OpenAI API interface
-model = OpenAIChatCompletionsModel(
-    model="llama3.2:latest",  # Name of the llama model to use from ollama
-    openai_client=externalProvider  # The provider configured above
-)
+# Local Ollama model served from the shared, pooled provider client (see testprj/providers.py)
+model = get_model("llama3.2:latest", provider="ollama")
 
 # Disable internal tracing/logging (optional – for performance or privacy)
 set_tracing_disabled(True)
@@ -1,25 +1,19 @@
 import asyncio
 from typing import Any, Literal
 from agents import (Agent,  GuardrailFunctionOutput, InputGuardrailTripwireTriggered, RunContextWrapper, 
-                    Runner, AsyncOpenAI, OpenAIChatCompletionsModel, TResponseInputItem, Tool, ToolsToFinalOutputFunction, 
+                    Runner, TResponseInputItem, Tool, ToolsToFinalOutputFunction, 
                      function_tool, input_guardrail, set_tracing_disabled)
+from testprj.providers import get_model
+from testprj.preclassifier import PreClassifier, verdict_log
+from testprj.response_cache import cached
 from dotenv import load_dotenv
 import os
 
 from pydantic import BaseModel
 load_dotenv()
 
-# Set up the external language model provider (Google's Gemini, using OpenAI-compatible API)
-externalProvider = AsyncOpenAI(
-    api_key="ollama",  # dummy value to satisfy SDK
-    base_url="http://localhost:11434/v1"  # local Ollama endpoint
-)
-
-# Create a chat completions model using the Gemini model via the OpenAI API interface
-model = OpenAIChatCompletionsModel(
-    model="llama3.2:latest",  # Name of the llama model to use from ollama
-    openai_client=externalProvider  # The provider configured above
-)
+# Local Ollama model served from the shared, pooled provider client (see testprj/providers.py)
+model = get_model("llama3.2:latest", provider="ollama")
 
 # Disable internal tracing/logging (optional – for performance or privacy)
 set_tracing_disabled(True)
@@ -51,11 +45,22 @@ guardrail_agent = Agent(
     name="Guardrail check",
     instructions="Check if the user input is containing any sensitive or abusive information.",
     output_type=SensitiveInput,
-    model=model,
+    # sensitive_precheck.guard passes only the latest user message, so the cache key is that message:
+    # a message checked before (in this or another conversation) is answered from the response cache
+    model=cached(model),
+)
+
+
+# Local first stage: clear cases are decided without a model call, the rest escalate to the agent above.
+sensitive_precheck = PreClassifier(
+    block_terms=["kill you", "hurt you", "credit card number", "card number", "social security number", "my password is", "idiot", "stupid"],
+    allow_terms=["hi", "hello", "hey", "thanks", "thank you", "good morning", "bye"],
+    log_path=verdict_log("sensitive_input"),
 )
 
 
 @input_guardrail
+@sensitive_precheck.guard
 async def sensitive_input_guardrail(
     context: RunContextWrapper[None], agent: Agent, input: str | list[TResponseInputItem]
 ) -> GuardrailFunctionOutput:
@@ -73,15 +78,15 @@ async def sensitive_input_guardrail(
 
 ### 2. The run loop
 
+agent = Agent(
+    name="Customer support agent",
+    instructions="You are a customer support agent. You help customers with their questions.",
+    input_guardrails=[sensitive_input_guardrail],
+    model=model,
+)
+
 
 async def main():
-    agent = Agent(
-        name="Customer support agent",
-        instructions="You are a customer support agent. You help customers with their questions.",
-        input_guardrails=[sensitive_input_guardrail],
-        model=model,
-    )
-
     input_data: list[TResponseInputItem] = []
 
     while True:
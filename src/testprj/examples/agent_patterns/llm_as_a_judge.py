@@ -3,8 +3,12 @@ from dataclasses import dataclass
 import json
 from typing import Any, Literal
 from agents import (Agent,  GuardrailFunctionOutput, InputGuardrailTripwireTriggered, ItemHelpers, OutputGuardrailTripwireTriggered, RunContextWrapper, 
-                    Runner, AsyncOpenAI, OpenAIChatCompletionsModel, TResponseInputItem, Tool, ToolsToFinalOutputFunction, 
+                    Runner, TResponseInputItem, Tool, ToolsToFinalOutputFunction, 
                      function_tool, input_guardrail, output_guardrail, set_tracing_disabled)
+from testprj.cascade import CascadeModel
+from testprj.history_compaction import HistoryCompactor, compacted
+from testprj.judge_search import judge_search
+from testprj.providers import get_model
 from dotenv import load_dotenv
 import os
 
@@ -12,17 +16,8 @@ import os
 from pydantic import BaseModel, Field
 load_dotenv()
 
-# Set up the external language model provider (Google's Gemini, using OpenAI-compatible API)
-externalProvider = AsyncOpenAI(
-    api_key="ollama",  # dummy value to satisfy SDK
-    base_url="http://localhost:11434/v1"  # local Ollama endpoint
-)
-
-# Create a chat completions model using the Gemini model via the OpenAI API interface
-model = OpenAIChatCompletionsModel(
-    model="llama3.2:latest",  # Name of the llama model to use from ollama
-    openai_client=externalProvider  # The provider configured above
-)
+# Local Ollama model served from the shared, pooled provider client (see testprj/providers.py)
+model = get_model("llama3.2:latest", provider="ollama")
 
 # Disable internal tracing/logging (optional – for performance or privacy)
 set_tracing_disabled(True)
@@ -35,13 +30,15 @@ The second agent judges the outline and provides feedback. We loop until the jud
 with the outline.
 """
 
+# Every "Feedback:" round resends the whole history; older rounds are compacted into a summary
+# once an agent's input exceeds its token budget (see testprj/history_compaction.py)
 story_outline_generator = Agent(
     name="story_outline_generator",
     instructions=(
         "You generate a very short story outline based on the user's input. "
         "If there is any feedback provided, use it to improve the outline."
     ),
-    model=model,
+    model=compacted(model, HistoryCompactor(budget_tokens=1500, keep_recent=4)),
 )
 
 
@@ -51,20 +48,69 @@ class EvaluationFeedback:
     score: Literal["pass", "needs_improvement", "fail"]
 
 
+@output_guardrail
+def actionable_feedback(context: RunContextWrapper, agent: Agent, output: EvaluationFeedback) -> GuardrailFunctionOutput:
+    # a verdict other than "pass" has to say what to improve, or the next round has nothing to go on
+    return GuardrailFunctionOutput(output_info=None, tripwire_triggered=output.score != "pass" and not output.feedback.strip())
+
+
+# The evaluator answers on llama3.2 first; a verdict that does not parse into EvaluationFeedback or
+# fails `actionable_feedback` is asked again on Gemini (see testprj/cascade.py)
+evaluator_model = CascadeModel(
+    {"ollama": model, "gemini": get_model("gemini-1.5-flash")},
+    guardrails=[actionable_feedback],
+)
+
+# Shared by the evaluator and the batch evaluator, so serial and search mode judge by the same rules
+JUDGE_RUBRIC = (
+    "Never give it a pass on the first try. After 5 attempts, you can give it a pass if the story outline is good enough - do not go for perfection"
+)
+
 evaluator = Agent[None](
     name="evaluator",
     instructions=(
         "You evaluate a story outline and decide if it's good enough. "
-        "If it's not good enough, you provide feedback on what needs to be improved. "
-        "Never give it a pass on the first try. After 5 attempts, you can give it a pass if the story outline is good enough - do not go for perfection"
+        "If it's not good enough, you provide feedback on what needs to be improved. " + JUDGE_RUBRIC
     ),
     output_type=EvaluationFeedback,
-    model=model,
+    model=compacted(evaluator_model, HistoryCompactor(budget_tokens=1000, keep_recent=2)),
 )
 
 
-async def main() -> None:
-    msg = input("What kind of story would you like to hear? ")
+@dataclass
+class BatchEvaluation:
+    evaluations: list[EvaluationFeedback]  # one per candidate, in the order given
+
+
+# Judges all candidates of a search round in one call (see search_outline)
+batch_evaluator = Agent[None](
+    name="batch_evaluator",
+    instructions=(
+        "You evaluate several candidate story outlines and decide for each if it's good enough. "
+        "For every candidate, in the order given, provide feedback on what needs to be improved and a score. " + JUDGE_RUBRIC
+    ),
+    output_type=BatchEvaluation,
+    model=compacted(model, HistoryCompactor(budget_tokens=1500, keep_recent=2)),
+)
+
+# Search mode: JUDGE_CANDIDATES outlines per round, judged in one batched call, until one passes,
+# JUDGE_MAX_ROUNDS rounds or JUDGE_BUDGET seconds
+JUDGE_CANDIDATES = int(os.getenv("JUDGE_CANDIDATES", "1"))
+JUDGE_MAX_ROUNDS = int(os.getenv("JUDGE_MAX_ROUNDS", "5"))
+JUDGE_BUDGET = float(os.getenv("JUDGE_BUDGET", "120"))
+
+
+async def search_outline(msg: str, k: int = 3) -> str | None:
+    search = await judge_search(
+        story_outline_generator, evaluator, msg,
+        k=k, batch_evaluator=batch_evaluator, max_rounds=JUDGE_MAX_ROUNDS, budget_s=JUDGE_BUDGET,
+    )
+    print(f"Search: passed={search.passed} after {search.rounds} round(s), {search.model_calls} model calls "
+          f"({search.sample_attempts} outlines started), {search.wall_s:.1f}s")
+    return search.output
+
+
+async def generate_outline(msg: str) -> str | None:
     input_items: list[TResponseInputItem] = [{"content": msg, "role": "user"}]
 
     latest_outline: str | None = None
@@ -157,7 +203,17 @@ async def main() -> None:
 
         input_items.append({"content": f"Feedback: {result.feedback}", "role": "user"})
 
+    return latest_outline
+
+
+async def main() -> None:
+    msg = input("What kind of story would you like to hear? ")
+    if JUDGE_CANDIDATES > 1:
+        latest_outline = await search_outline(msg, JUDGE_CANDIDATES)
+    else:
+        latest_outline = await generate_outline(msg)
     print(f"Final story outline: {latest_outline}")
+    print(f"Evaluator cascade: {evaluator_model.stats()}")
 
 
 if __name__ == "__main__":
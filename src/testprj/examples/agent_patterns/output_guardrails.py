@@ -2,8 +2,10 @@ import asyncio
 import json
 from typing import Any, Literal
 from agents import (Agent,  GuardrailFunctionOutput, InputGuardrailTripwireTriggered, OutputGuardrailTripwireTriggered, RunContextWrapper, 
-                    Runner, AsyncOpenAI, OpenAIChatCompletionsModel, TResponseInputItem, Tool, ToolsToFinalOutputFunction, 
+                    Runner, TResponseInputItem, Tool, ToolsToFinalOutputFunction, 
                      function_tool, input_guardrail, output_guardrail, set_tracing_disabled)
+from testprj.providers import get_model
+from testprj.streaming_guardrails import PartialOutput, run_streamed_guarded, streaming_output_guardrail
 from dotenv import load_dotenv
 import os
 
@@ -11,17 +13,8 @@ import os
 from pydantic import BaseModel, Field
 load_dotenv()
 
-# Set up the external language model provider (Google's Gemini, using OpenAI-compatible API)
-externalProvider = AsyncOpenAI(
-    api_key="ollama",  # dummy value to satisfy SDK
-    base_url="http://localhost:11434/v1"  # local Ollama endpoint
-)
-
-# Create a chat completions model using the Gemini model via the OpenAI API interface
-model = OpenAIChatCompletionsModel(
-    model="llama3.2:latest",  # Name of the llama model to use from ollama
-    openai_client=externalProvider  # The provider configured above
-)
+# Local Ollama model served from the shared, pooled provider client (see testprj/providers.py)
+model = get_model("llama3.2:latest", provider="ollama")
 
 # Disable internal tracing/logging (optional – for performance or privacy)
 set_tracing_disabled(True)
@@ -41,11 +34,12 @@ game or sports related information.
 
 
 # The agent's output type
+# (the flag comes before `response` so a streaming guardrail sees it before the long text is generated)
 class MessageOutput(BaseModel):
     reasoning: str = Field(description="Thoughts on how to respond to the user's message")
+    is_game_or_sports_related: bool = Field(description="Whether the response is game or sports related")
     response: str = Field(description="The response to the user's message")
     user_name: str | None = Field(description="The name of the user who sent the message, if known")
-    is_game_or_sports_related: bool = Field(description="Whether the response is game or sports related")
     
 
 
@@ -60,6 +54,18 @@ async def sensitive_data_check(
     )
 
 
+# Streaming variant: checks the partially parsed MessageOutput as it is generated, so the response is
+# cut off as soon as `is_game_or_sports_related` shows up as true instead of after the last token.
+@streaming_output_guardrail(every=16)
+def sensitive_data_stream_check(
+    context: RunContextWrapper, agent: Agent, partial: PartialOutput
+) -> GuardrailFunctionOutput:
+    return GuardrailFunctionOutput(
+        output_info=partial.fields,
+        tripwire_triggered=partial.fields.get("is_game_or_sports_related") is True,
+    )
+
+
 agent = Agent(
     name="Assistant",
     instructions="You are a helpful assistant.",
@@ -79,9 +85,9 @@ async def main():
             break
         # This should trip the guardrail
         try:
-            result = await Runner.run(
-                agent, user_input
-            )
+            result = run_streamed_guarded(agent, user_input, [sensitive_data_stream_check])
+            async for _ in result.stream_events():
+                pass
             print(
                 f"Guardrail didn't trip - this is unexpected. Output: {json.dumps(result.final_output.model_dump(), indent=2)}"
             )
@@ -2,8 +2,10 @@ import asyncio
 import json
 from typing import Any, Literal
 from agents import (Agent,  GuardrailFunctionOutput, InputGuardrailTripwireTriggered, ItemHelpers, OutputGuardrailTripwireTriggered, RunContextWrapper, 
-                    Runner, AsyncOpenAI, OpenAIChatCompletionsModel, TResponseInputItem, Tool, ToolsToFinalOutputFunction, 
+                    Runner, TResponseInputItem, Tool, ToolsToFinalOutputFunction, 
                      function_tool, input_guardrail, output_guardrail, set_tracing_disabled)
+from testprj.best_of_n import best_of_n
+from testprj.providers import get_model
 from dotenv import load_dotenv
 import os
 
@@ -11,17 +13,8 @@ import os
 from pydantic import BaseModel, Field
 load_dotenv()
 
-# Set up the external language model provider (Google's Gemini, using OpenAI-compatible API)
-externalProvider = AsyncOpenAI(
-    api_key="ollama",  # dummy value to satisfy SDK
-    base_url="http://localhost:11434/v1"  # local Ollama endpoint
-)
-
-# Create a chat completions model using the Gemini model via the OpenAI API interface
-model = OpenAIChatCompletionsModel(
-    model="llama3.2:latest",  # Name of the llama model to use from ollama
-    openai_client=externalProvider  # The provider configured above
-)
+# Local Ollama model served from the shared, pooled provider client (see testprj/providers.py)
+model = get_model("llama3.2:latest", provider="ollama")
 
 # Disable internal tracing/logging (optional – for performance or privacy)
 set_tracing_disabled(True)
@@ -44,53 +37,56 @@ translation_picker = Agent(
 )
 
 
-async def main():
-    msg = input("Hi! Enter a message, and we'll translate it to Spanish.\n\n")
+# N samples, a quorum to wait for and a deadline after which stragglers are cancelled
+TRANSLATION_SAMPLES = int(os.getenv("TRANSLATION_SAMPLES", "3"))
+TRANSLATION_QUORUM = int(os.getenv("TRANSLATION_QUORUM", "2"))
+TRANSLATION_DEADLINE = float(os.getenv("TRANSLATION_DEADLINE", "5"))  # seconds
+
+
+def _picker_input(msg: str, outputs: list[str]) -> str:
+    translations = "\n\n".join(outputs)
+    print(f"\n\nTranslations:\n\n{translations}")
+    return f"Input: {msg}\n\nTranslations:\n{translations}"
 
+
+async def pick_best_translation(msg: str) -> str:
     """
     What it does:
 
-        Runs the same translation agent 3 times in parallel
-        asyncio.gather() waits for all three to complete
+        Runs the same translation agent TRANSLATION_SAMPLES times in parallel (best_of_n)
+        Waits for TRANSLATION_QUORUM of them (or TRANSLATION_DEADLINE seconds) and cancels the rest
         Each run might produce slightly different translations due to LLM randomness
 
         Example output:
         Translation 1: "Hola, ¿cómo estás?"
         Translation 2: "Hola, ¿qué tal?"
         Translation 3: "Saludos, ¿cómo te encuentras?"
+
+    The picker then chooses among the translations that made it in time. Raises RuntimeError
+    when no translation finished.
     """
-    res_1, res_2, res_3 = await asyncio.gather(
-        Runner.run(
-            spanish_agent,
-            msg,
-        ),
-        Runner.run(
-            spanish_agent,
-            msg,
-        ),
-        Runner.run(
-            spanish_agent,
-            msg,
-        ),
+    outcome = await best_of_n(
+        spanish_agent,
+        msg,
+        n=TRANSLATION_SAMPLES,
+        quorum=TRANSLATION_QUORUM,
+        deadline=TRANSLATION_DEADLINE,
+        picker=translation_picker,
+        picker_input=_picker_input,
     )
-    #extracts just the text content from the latest response of all three
-    outputs = [
-        ItemHelpers.text_message_outputs(res_1.new_items),
-        ItemHelpers.text_message_outputs(res_2.new_items),
-        ItemHelpers.text_message_outputs(res_3.new_items),
-    ]
-    #join the outputs into a single string
-    translations = "\n\n".join(outputs)
-    print(f"\n\nTranslations:\n\n{translations}")
+    if not outcome.finished():
+        raise RuntimeError(f"No translation finished: {outcome.errors() or 'every sample was cancelled'}")
+    return outcome.choice
 
-    best_translation = await Runner.run(
-        translation_picker,
-        f"Input: {msg}\n\nTranslations:\n{translations}",
-    )
+
+async def main():
+    msg = input("Hi! Enter a message, and we'll translate it to Spanish.\n\n")
+
+    best_translation = await pick_best_translation(msg)
 
     print("\n\n-----")
 
-    print(f"Best translation: {best_translation.final_output}")
+    print(f"Best translation: {best_translation}")
 
 
 if __name__ == "__main__":
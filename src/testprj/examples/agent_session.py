@@ -1,21 +1,15 @@
 import asyncio
+import os
 from typing import Any
-from agents import (Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, set_tracing_disabled, SQLiteSession)
+from agents import (Agent, Runner, set_tracing_disabled)
+from testprj.providers import get_model
+from testprj.session_store import SessionStore
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Set up the external language model provider (Ollama)
-externalProvider = AsyncOpenAI(
-    api_key="ollama",  # dummy value to satisfy SDK
-    base_url="http://localhost:11434/v1"  # local Ollama endpoint
-)
-
-# Create a chat completions model using the Llama vision model via the OpenAI API interface
-model = OpenAIChatCompletionsModel(
-    model="llama3.2:latest",  # Use the vision-specific model
-    openai_client=externalProvider
-)
+# Local Ollama model served from the shared, pooled provider client (see testprj/providers.py)
+model = get_model("llama3.2:latest", provider="ollama")
 
 set_tracing_disabled(True)
 
@@ -27,18 +21,21 @@ across multiple agent runs without manually handling .to_input_list().
 """
 
 
+# Create an agent
+agent = Agent(
+    name="Assistant",
+    instructions="Reply very concisely.",
+    model=model,
+)
 
-async def main():
-    # Create an agent
-    agent = Agent(
-        name="Assistant",
-        instructions="Reply very concisely.",
-        model=model,
-    )
 
+async def main():
     # Create a session instance that will persist across runs
+    # (one SessionStore serves every conversation: WAL, batched writes, indexed tail reads;
+    # SESSION_DB_PATH=sessions.db keeps the history on disk, the default is in memory)
+    store = SessionStore(os.getenv("SESSION_DB_PATH", ":memory:"))
     session_id = "conversation_123"
-    session = SQLiteSession(session_id)
+    session = store.session(session_id)
 
     print("=== Session Example ===")
     print("The agent will remember previous messages automatically.\n")
@@ -79,6 +76,8 @@ async def main():
     all_items = await session.get_items()
     print(f"Total items in session: {len(all_items)}")
 
+    await store.aclose()
+
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,264 @@
+"""
+History compaction for long conversations and judge loops.
+
+Carrying `result.to_input_list()` from turn to turn (agent_routing.py, the "Feedback:" rounds of
+llm_as_a_judge.py) makes every model call resend the whole conversation, so prompt cost grows
+linearly with its length. `CompactingModel` wraps an agent's model and, before each call whose
+input is over `budget_tokens`, replaces the older part of the history with one summary message:
+
+- the last `keep_recent` items stay verbatim (more are summarized if those alone exceed the
+  budget; a tool call is never separated from its output);
+- everything before is summarized - extractively by default (first sentence of every message,
+  no model call), or by a cheap model with `ModelSummarizer`;
+- summaries are cached by a hash of the history prefix they cover, and built incrementally: the
+  next turn only summarizes the items that fell out of the recent window since the last one.
+
+    from testprj.history_compaction import HistoryCompactor, compacted
+
+    agent = Agent(..., model=compacted(model, HistoryCompactor(budget_tokens=1500)))
+
+Token counts come from `token_accounting.count_tokens` (tiktoken, or a fast estimate). `compactor.stats()` reports the tokens
+saved and the time spent compacting. Inputs that use `previous_response_id` are left alone (the
+server holds that history).
+"""
+
+import hashlib
+import json
+import re
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+from agents import (
+    Agent,
+    AgentOutputSchemaBase,
+    Handoff,
+    Model,
+    ModelResponse,
+    ModelSettings,
+    ModelTracing,
+    Runner,
+    Tool,
+    TResponseInputItem,
+)
+from agents.items import TResponseStreamEvent
+
+from testprj.caching import SingleFlight, TTLCache
+from testprj.token_accounting import count_tokens
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+# (previous summary or None, items to add to it, max characters) -> new summary
+Summarizer = Callable[[str | None, list[TResponseInputItem], int], Awaitable[str]]
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s")
+
+
+def _as_dict(item: Any) -> dict:
+    return item if isinstance(item, dict) else item.model_dump(exclude_unset=True)
+
+
+def item_text(item: TResponseInputItem) -> str:
+    """A one-line, human-readable rendering of an input item."""
+    item = _as_dict(item)
+    kind = item.get("type", "message")
+    if kind == "function_call":
+        return f"called {item.get('name')}({item.get('arguments', '')})"
+    if kind == "function_call_output":
+        return f"tool result: {item.get('output', '')}"
+    content = item.get("content", "")
+    if isinstance(content, list):
+        content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return f"{item.get('role', kind)}: {content}"
+
+
+def item_tokens(item: TResponseInputItem) -> int:
+    return count_tokens(item_text(item)) + 4  # per-message framing
+
+
+async def extractive_summary(previous: str | None, items: list[TResponseInputItem], max_chars: int) -> str:
+    """First sentence of every item, appended to `previous`; keeps the first and the latest lines."""
+    lines = previous.splitlines() if previous else []
+    for item in items:
+        text = " ".join(item_text(item).split())
+        lines.append(_SENTENCE.split(text, maxsplit=1)[0][:200])
+    # the opening request plus as many of the most recent lines as fit
+    kept, size = [], len(lines[0])
+    for line in reversed(lines[1:]):
+        if size + len(line) + 1 > max_chars:
+            break
+        kept.append(line)
+        size += len(line) + 1
+    return "\n".join([lines[0], *reversed(kept)])[:max_chars]
+
+
+class ModelSummarizer:
+    """Summarizes with a (cheap) model instead of extractively."""
+
+    def __init__(self, model: Model | str, instructions: str | None = None):
+        self.agent = Agent(
+            name="history_summarizer",
+            instructions=instructions or (
+                "You compress conversation history. Merge the previous summary and the new messages into "
+                "one short summary that keeps every fact, decision, name, number and open request. "
+                "Reply with the summary only."
+            ),
+            model=model,
+        )
+
+    async def __call__(self, previous: str | None, items: list[TResponseInputItem], max_chars: int) -> str:
+        transcript = "\n".join(item_text(item) for item in items)
+        prompt = (
+            f"Previous summary:\n{previous or '(none)'}\n\nNew messages:\n{transcript}\n\n"
+            f"Write the updated summary in at most {max_chars} characters."
+        )
+        result = await Runner.run(self.agent, prompt)
+        return str(result.final_output)[:max_chars]
+
+
+class HistoryCompactor:
+    def __init__(
+        self,
+        budget_tokens: int = 2000,
+        keep_recent: int = 6,
+        summary_tokens: int | None = None,
+        summarizer: Summarizer = extractive_summary,
+        cache: TTLCache | None = None,
+    ):
+        self.budget_tokens = budget_tokens
+        self.keep_recent = keep_recent
+        self.summary_tokens = summary_tokens or budget_tokens // 4
+        self.summarizer = summarizer
+        self.cache = cache if cache is not None else TTLCache(maxsize=1024, ttl=None)  # prefix hash -> summary
+        self.inflight = SingleFlight()
+        self.counts = {"calls": 0, "compacted": 0, "tokens_in": 0, "tokens_out": 0,
+                       "summary_hits": 0, "summaries": 0, "items_summarized": 0}
+        self.compaction_s = 0.0
+
+    def _cut(self, tokens: list[int], items: list[dict]) -> int:
+        """Index of the first item kept verbatim."""
+        cut = max(len(items) - self.keep_recent, 1)
+        room = self.budget_tokens - self.summary_tokens
+        recent = sum(tokens[cut:])
+        while cut < len(items) - 1 and recent > room:
+            recent -= tokens[cut]
+            cut += 1
+        # every kept output needs its call: with parallel tool calls ([call A, call B, out A, out B])
+        # the cut moves to the first call of the group, not just over the outputs
+        calls = {item.get("call_id"): i for i, item in enumerate(items) if item.get("type") == "function_call"}
+        while True:
+            needed = [calls[item.get("call_id")] for item in items[cut:]
+                      if item.get("type") == "function_call_output" and item.get("call_id") in calls]
+            if not needed or min(needed) >= cut:
+                return cut
+            cut = min(needed)
+
+    async def _summary(self, items: list[dict], cut: int) -> str:
+        prefixes, digest = [], b""
+        for item in items[:cut]:
+            digest = hashlib.sha256(digest + json.dumps(item, sort_keys=True, default=str).encode()).digest()
+            prefixes.append(digest.hex())
+        summary = self.cache.get(prefixes[-1])
+        if summary is not None:
+            self.counts["summary_hits"] += 1
+            return summary
+        # build on the longest prefix already summarized (the previous turn's, usually)
+        start, previous = 0, None
+        for index in range(cut - 2, -1, -1):
+            previous = self.cache.get(prefixes[index])
+            if previous is not None:
+                start = index + 1
+                break
+
+        async def summarize() -> str:
+            text = await self.summarizer(previous, items[start:cut], self.summary_tokens * 4)
+            self.cache.set(prefixes[-1], text)
+            self.counts["summaries"] += 1
+            self.counts["items_summarized"] += cut - start
+            return text
+
+        return await self.inflight.do(prefixes[-1], summarize)
+
+    async def compact(self, input: str | list[TResponseInputItem]) -> str | list[TResponseInputItem]:
+        if isinstance(input, str):
+            return input
+        start = time.perf_counter()
+        try:
+            items = [_as_dict(item) for item in input]
+            tokens = [item_tokens(item) for item in items]
+            self.counts["calls"] += 1
+            self.counts["tokens_in"] += sum(tokens)
+            cut = self._cut(tokens, items) if sum(tokens) > self.budget_tokens and len(items) > 1 else 0
+            if cut == 0:
+                self.counts["tokens_out"] += sum(tokens)
+                return input
+            summary = await self._summary(items, cut)
+            compacted = [{"role": "system", "content": SUMMARY_PREFIX + summary}, *items[cut:]]
+            self.counts["compacted"] += 1
+            self.counts["tokens_out"] += sum(item_tokens(item) for item in compacted)
+            return compacted
+        finally:
+            self.compaction_s += time.perf_counter() - start
+
+    def stats(self) -> dict[str, float]:
+        calls = self.counts["calls"]
+        return {
+            **self.counts,
+            "tokens_saved": self.counts["tokens_in"] - self.counts["tokens_out"],
+            "saved_ratio": 1 - self.counts["tokens_out"] / self.counts["tokens_in"] if self.counts["tokens_in"] else 0.0,
+            "compaction_ms_per_call": self.compaction_s / calls * 1000 if calls else 0.0,
+        }
+
+
+class CompactingModel(Model):
+    """A `Model` whose input history is compacted to the compactor's token budget before each call."""
+
+    def __init__(self, model: Model, compactor: HistoryCompactor | None = None):
+        self.model = model
+        self.compactor = compactor if compactor is not None else HistoryCompactor()
+
+    async def _input(self, input: str | list[TResponseInputItem], previous_response_id: str | None):
+        return input if previous_response_id else await self.compactor.compact(input)
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        prompt: Any | None,
+    ) -> ModelResponse:
+        return await self.model.get_response(
+            system_instructions, await self._input(input, previous_response_id), model_settings, tools,
+            output_schema, handoffs, tracing, previous_response_id=previous_response_id, prompt=prompt,
+        )
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        prompt: Any | None,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        stream = self.model.stream_response(
+            system_instructions, await self._input(input, previous_response_id), model_settings, tools,
+            output_schema, handoffs, tracing, previous_response_id=previous_response_id, prompt=prompt,
+        )
+        async for event in stream:
+            yield event
+
+
+def compacted(model: Model, compactor: HistoryCompactor | None = None) -> CompactingModel:
+    """Wrap `model` so long histories are compacted to `compactor.budget_tokens` (2000 by default)."""
+    return CompactingModel(model, compactor)
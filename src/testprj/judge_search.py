@@ -0,0 +1,121 @@
+"""
+Search mode for the LLM-as-a-judge loop.
+
+llm_as_a_judge.py improves ONE outline per round: generate, judge, feed the judge's feedback
+back, repeat - two sequential model calls per round, and usually several rounds before a pass.
+`judge_search` explores K candidates per round instead:
+
+- the generator is sampled K times in parallel (`best_of_n`, bounded by what is left of the
+  wall-clock budget);
+- the candidates are judged together: in ONE call to `batch_evaluator` when given, otherwise by
+  K parallel calls to `evaluator`;
+- the search stops at the first candidate that passes; otherwise the round's best-ranked
+  candidate and its feedback seed the next round, until `max_rounds` or `budget_s` runs out.
+  The result is the best-ranked candidate of all rounds (the latest on a tie).
+
+Verdicts follow the judge's `EvaluationFeedback` shape (`.score` in "pass" / "needs_improvement" /
+"fail" and `.feedback`); a batch evaluator returns an object whose `.evaluations` lists one
+verdict per candidate, in the order the candidates were numbered.
+
+    search = await judge_search(generator, evaluator, "A ghost story at sea", k=3,
+                                batch_evaluator=batch_evaluator, max_rounds=5, budget_s=60)
+    search.output, search.passed, search.rounds, search.model_calls
+
+`model_calls` counts completed generator samples and judge calls; `sample_attempts` also counts
+the samples that were cancelled at the deadline or failed.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from agents import Agent, Runner, TResponseInputItem
+
+from testprj.best_of_n import Candidate, best_of_n
+
+SCORE_RANK = {"pass": 0, "needs_improvement": 1, "fail": 2}
+
+
+@dataclass
+class JudgeSearchResult:
+    output: str | None  # the passing outline, or the best one found
+    verdict: Any
+    passed: bool
+    rounds: int
+    model_calls: int
+    sample_attempts: int
+    wall_s: float
+
+
+def batch_prompt(input_items: list[TResponseInputItem], outputs: list[str]) -> list[TResponseInputItem]:
+    """The batch evaluator's input: the conversation so far, then the numbered candidates."""
+    options = "\n\n".join(f"Candidate {i}:\n{output}" for i, output in enumerate(outputs, 1))
+    return [*input_items, {"role": "user", "content": f"Evaluate each of these {len(outputs)} candidates:\n\n{options}"}]
+
+
+def _rank(pair: tuple[Candidate, Any]) -> int:
+    return SCORE_RANK.get(pair[1].score, len(SCORE_RANK))
+
+
+async def _judge(
+    candidates: list[Candidate], input_items: list[TResponseInputItem], evaluator: Agent[Any],
+    batch_evaluator: Agent[Any] | None,
+) -> tuple[list[Any], int]:
+    if batch_evaluator is not None:
+        result = await Runner.run(batch_evaluator, batch_prompt(input_items, [c.output for c in candidates]))
+        verdicts = list(getattr(result.final_output, "evaluations", []))
+        if len(verdicts) == len(candidates):
+            return verdicts, 1
+        # the batch answer does not line up with the candidates: judge them one by one
+        calls = 1
+    else:
+        calls = 0
+    results = await asyncio.gather(*[Runner.run(evaluator, c.result.to_input_list()) for c in candidates])
+    return [r.final_output for r in results], calls + len(candidates)
+
+
+async def judge_search(
+    generator: Agent[Any],
+    evaluator: Agent[Any],
+    input: str | list[TResponseInputItem],
+    *,
+    k: int = 3,
+    batch_evaluator: Agent[Any] | None = None,
+    max_rounds: int = 5,
+    budget_s: float | None = None,
+) -> JudgeSearchResult:
+    start = time.perf_counter()
+    input_items: list[TResponseInputItem] = [{"content": input, "role": "user"}] if isinstance(input, str) else input
+    best: tuple[Candidate, Any] | None = None
+    model_calls = sample_attempts = rounds = 0
+    while rounds < max_rounds:
+        remaining = None if budget_s is None else budget_s - (time.perf_counter() - start)
+        if remaining is not None and remaining <= 0:
+            break
+        rounds += 1
+        sampled = await best_of_n(generator, input_items, n=k, deadline=remaining)
+        candidates = sampled.finished()
+        model_calls += len(candidates)
+        sample_attempts += len(sampled.candidates)
+        if not candidates:
+            continue
+        verdicts, calls = await _judge(candidates, input_items, evaluator, batch_evaluator)
+        model_calls += calls
+        ranked = sorted(zip(candidates, verdicts), key=_rank)
+        # a later round can rank worse than an earlier one: keep the best outline seen so far
+        if best is None or _rank(ranked[0]) <= _rank(best):
+            best = ranked[0]
+        if best[1].score == "pass":
+            break
+        candidate, verdict = ranked[0]  # the next round builds on the latest judged outline
+        input_items = [*candidate.result.to_input_list(), {"content": f"Feedback: {verdict.feedback}", "role": "user"}]
+    return JudgeSearchResult(
+        output=best[0].output if best else None,
+        verdict=best[1] if best else None,
+        passed=best is not None and best[1].score == "pass",
+        rounds=rounds,
+        model_calls=model_calls,
+        sample_attempts=sample_attempts,
+        wall_s=time.perf_counter() - start,
+    )
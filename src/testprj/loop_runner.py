@@ -0,0 +1,135 @@
+"""
+One long-lived event loop for synchronous scripts.
+
+The practice scripts call `asyncio.run(Runner.run(...))` (or `Runner.run_sync`) several times per
+process. Every `asyncio.run` creates a new event loop and closes it afterwards, and whatever was
+bound to that loop goes with it: the pooled provider connections (`testprj.providers` opens a
+new pool - new connections, new TLS handshakes - on every loop), and loop-bound locks and tasks
+of caches and sessions start over. `Runner.run_sync` keeps a loop, but stops working once an
+`asyncio.run` has cleared the thread's loop. `LoopRunner` keeps ONE event loop running in a
+daemon thread and gives synchronous code a facade that submits coroutines to it, so everything
+created on the loop stays warm across calls:
+
+    from testprj.loop_runner import run, run_agent
+
+    result = run_agent(agent, "what is 1+1?", max_turns=2)      # == Runner.run on the shared loop
+    story = run(write_story("A horror story"))                  # any coroutine
+
+`run`/`run_agent` use a process-wide runner that is started on first use and closed (pending
+tasks cancelled, provider clients closed) at interpreter exit. Code that is already async should
+simply `await` - calling `run()` from the runner's own loop would deadlock and raises instead.
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import threading
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+from agents import Agent, RunResult, Runner, TResponseInputItem
+
+from testprj import providers
+
+T = TypeVar("T")
+
+
+class LoopRunner:
+    def __init__(self, name: str = "agent-loop"):
+        self.name = name
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The runner's event loop (started on first access)."""
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    ready = threading.Event()
+                    self._thread = threading.Thread(target=self._serve, args=(loop, ready), name=self.name, daemon=True)
+                    self._thread.start()
+                    ready.wait()
+                    self._loop = loop
+        return self._loop
+
+    @staticmethod
+    def _serve(loop: asyncio.AbstractEventLoop, ready: threading.Event) -> None:
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        loop.run_forever()
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> concurrent.futures.Future[T]:
+        """Schedule `coro` on the runner's loop without waiting for it."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+        """Run `coro` on the runner's loop and block until it is done (cancelled on timeout / Ctrl-C)."""
+        if self._loop is not None and threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("LoopRunner.run() called from its own event loop; await the coroutine instead")
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def run_agent(
+        self, starting_agent: Agent[Any], input: str | list[TResponseInputItem], *, timeout: float | None = None,
+        **run_kwargs: Any,
+    ) -> RunResult:
+        """`Runner.run(...)` on the runner's loop - a drop-in for `Runner.run_sync`."""
+        return self.run(Runner.run(starting_agent, input, **run_kwargs), timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Cancel pending tasks, close the provider clients and stop the loop thread."""
+        with self._lock:
+            loop, thread, self._loop, self._thread = self._loop, self._thread, None, None
+        if loop is None or not loop.is_running():
+            return
+
+        async def shutdown() -> None:
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await providers.aclose()
+
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), loop).result(timeout)
+        except (concurrent.futures.TimeoutError, RuntimeError):
+            pass
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+            if not thread.is_alive():
+                loop.close()
+
+
+_default: LoopRunner | None = None
+_default_lock = threading.Lock()
+
+
+def get_runner() -> LoopRunner:
+    """The process-wide runner, closed at interpreter exit."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = LoopRunner()
+                atexit.register(_default.close)
+    return _default
+
+
+def run(coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+    return get_runner().run(coro, timeout)
+
+
+def run_agent(
+    starting_agent: Agent[Any], input: str | list[TResponseInputItem], *, timeout: float | None = None,
+    **run_kwargs: Any,
+) -> RunResult:
+    return get_runner().run_agent(starting_agent, input, timeout=timeout, **run_kwargs)
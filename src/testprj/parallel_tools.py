@@ -0,0 +1,68 @@
+"""
+Bounded, concurrent agent-as-tool calls.
+
+The Runner already executes all function-tool calls of one model turn concurrently - so a
+"translate to Spanish, French, Italian and Urdu" request takes the time of the slowest
+translator *if* the orchestrator asks for all four in one turn (parallel tool calls, and no
+"call the tools in order" in its instructions). What is missing is a bound: every
+`Agent.as_tool` call is a whole sub-run with its own model calls, and one hung sub-run holds the
+orchestrator turn forever.
+
+`ToolLimiter` wraps tools so that at most `max_concurrency` of them execute at once (callers over
+the cap wait their turn) and each execution is cancelled after `timeout` seconds, answering the
+model with an error message instead of failing the run:
+
+    limiter = ToolLimiter(max_concurrency=4, timeout=30)
+    orchestrator = Agent(..., tools=limiter.wrap_all([spanish_agent.as_tool(...), ...]),
+                         model_settings=ModelSettings(parallel_tool_calls=True))
+
+The cap is shared by every run using the limiter's tools, so it also bounds the sub-runs a busy
+worker starts. `limiter.stats()` reports calls, timeouts, the time spent waiting for a slot and
+the peak concurrency.
+"""
+
+import asyncio
+import dataclasses
+import time
+from typing import Any
+
+from agents import FunctionTool, Tool
+
+
+class ToolLimiter:
+    def __init__(self, max_concurrency: int = 4, timeout: float | None = 30.0):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout  # seconds per execution, not counting the wait for a slot; None disables it
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.running = 0
+        self.counts = {"calls": 0, "timeouts": 0, "peak_running": 0}
+        self.wait_s = 0.0
+
+    def wrap(self, tool: FunctionTool) -> FunctionTool:
+        invoke = tool.on_invoke_tool
+
+        async def on_invoke_tool(ctx: Any, arguments: str) -> Any:
+            queued = time.perf_counter()
+            async with self._slots:
+                self.wait_s += time.perf_counter() - queued
+                self.counts["calls"] += 1
+                self.running += 1
+                self.counts["peak_running"] = max(self.counts["peak_running"], self.running)
+                try:
+                    async with asyncio.timeout(self.timeout):
+                        return await invoke(ctx, arguments)
+                except TimeoutError:
+                    self.counts["timeouts"] += 1
+                    return f"Error: {tool.name} did not finish within {self.timeout:g}s. Answer without it."
+                finally:
+                    self.running -= 1
+
+        return dataclasses.replace(tool, on_invoke_tool=on_invoke_tool)
+
+    def wrap_all(self, tools: list[Tool]) -> list[Tool]:
+        """`tools` with every function tool (including `Agent.as_tool` tools) bounded by this limiter."""
+        return [self.wrap(tool) if isinstance(tool, FunctionTool) else tool for tool in tools]
+
+    def stats(self) -> dict[str, float]:
+        calls = self.counts["calls"]
+        return {**self.counts, "wait_ms_per_call": self.wait_s / calls * 1000 if calls else 0.0}
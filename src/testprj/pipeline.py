@@ -0,0 +1,204 @@
+"""
+Declarative agent pipelines (DAGs) with checkpointed stages.
+
+deterministic.py chained its agents with one `asyncio.run(...)` per step - an event loop (and a
+cold connection pool) per step - and a failure in the last step meant recomputing all of them.
+`Pipeline` runs a DAG of agent stages on one event loop:
+
+- a `Stage` names the stages it reads (`after`), builds its agent input from their outputs
+  (`prompt`; by default the single upstream output, or the pipeline input for root stages) and
+  may be gated by a condition on them (`when`) - a gated-off stage and everything downstream of
+  it is skipped;
+- stages whose inputs are ready run concurrently;
+- each stage output is checkpointed under a content address (stage, agent, input, `run_id`) in a
+  `StageStore` (memory, plus SQLite with `path=`); running the pipeline again - after a crash, a
+  failed stage, or for the same input - resumes from the checkpoints and only runs what is missing.
+
+    pipeline = Pipeline([
+        Stage("outline", outline_agent),
+        Stage("check", checker_agent, after=["outline"]),
+        Stage("story", story_agent, after=["outline", "check"], prompt=lambda out: out["outline"],
+              when=lambda out: out["check"].good_quality),
+    ], store=StageStore("pipeline.db"))
+    result = await pipeline.run("A horror story", run_id="job-42")
+    result.outputs["story"], result.status        # {"outline": "cached", "check": "done", ...}
+
+Without a `run_id` checkpoints are shared by every run with the same input; pass one to scope them
+to a job (and to resume exactly that job). Outputs are stored with the agent's `output_type`
+(pydantic), so structured outputs come back as the same types.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from agents import Agent, Runner, TResponseInputItem
+from pydantic import TypeAdapter
+
+from testprj.caching import SqliteCache, TTLCache
+
+PIPELINE_INPUT = "input"
+
+StageStatus = Literal["done", "cached", "skipped", "failed", "cancelled"]
+
+
+@dataclass
+class Stage:
+    name: str
+    agent: Agent[Any]
+    after: list[str] = field(default_factory=list)
+    prompt: Callable[[dict[str, Any]], str | list[TResponseInputItem]] | None = None
+    when: Callable[[dict[str, Any]], bool] | None = None
+    checkpoint: bool = True
+
+    def build_input(self, outputs: dict[str, Any]) -> str | list[TResponseInputItem]:
+        if self.prompt is not None:
+            return self.prompt(outputs)
+        if not self.after:
+            return outputs[PIPELINE_INPUT]
+        if len(self.after) == 1:
+            value = outputs[self.after[0]]
+            return value if isinstance(value, (str, list)) else str(value)
+        return "\n\n".join(f"{name}:\n{outputs[name]}" for name in self.after)
+
+
+class StageStore:
+    """Content-addressed stage outputs: memory, plus an optional SQLite file (`path`)."""
+
+    def __init__(self, path: str | os.PathLike | None = None, maxsize: int = 1024, ttl: float | None = None):
+        self.ttl = ttl
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.disk = SqliteCache(os.fspath(path), table="stage_outputs") if path else None
+
+    async def get(self, key: str, adapter: TypeAdapter) -> Any:
+        value = self.memory.get(key)
+        if value is not None or self.disk is None:
+            return value
+        blob = await asyncio.to_thread(self.disk.get, key)
+        if blob is None:
+            return None
+        value = adapter.validate_json(blob)
+        self.memory.set(key, value)
+        return value
+
+    async def set(self, key: str, value: Any, adapter: TypeAdapter) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, adapter.dump_json(value).decode(), self.ttl)
+
+
+@dataclass
+class PipelineResult:
+    outputs: dict[str, Any]
+    status: dict[str, StageStatus]
+    timings: dict[str, float]  # seconds per stage run (0 for checkpoints)
+    error: BaseException | None = None
+    failed_stage: str | None = None
+
+
+def _stage_key(stage: Stage, agent_input: Any, run_id: str | None) -> str:
+    agent = stage.agent
+    canonical = {
+        "stage": stage.name,
+        "agent": agent.name,
+        "instructions": agent.instructions if isinstance(agent.instructions, str) else None,
+        "output_type": getattr(agent.output_type, "__qualname__", str(agent.output_type)),
+        "input": agent_input,
+        "run_id": run_id,
+    }
+    blob = json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+class Pipeline:
+    def __init__(self, stages: list[Stage], store: StageStore | None = None):
+        names = [stage.name for stage in stages]
+        if len(set(names)) != len(names) or PIPELINE_INPUT in names:
+            raise ValueError(f"Stage names must be unique and not {PIPELINE_INPUT!r}: {names}")
+        for stage in stages:
+            unknown = [name for name in stage.after if name not in names]
+            if unknown:
+                raise ValueError(f"Stage {stage.name!r} reads unknown stages {unknown}")
+        self.stages = {stage.name: stage for stage in stages}
+        self.store = store if store is not None else StageStore()
+        self._adapters = {stage.name: TypeAdapter(stage.agent.output_type or str) for stage in stages}
+        self._check_acyclic()
+
+    def _check_acyclic(self) -> None:
+        state: dict[str, int] = {}  # 1 = visiting, 2 = done
+
+        def visit(name: str) -> None:
+            if state.get(name) == 1:
+                raise ValueError(f"Pipeline has a cycle through stage {name!r}")
+            if state.get(name) != 2:
+                state[name] = 1
+                for upstream in self.stages[name].after:
+                    visit(upstream)
+                state[name] = 2
+
+        for name in self.stages:
+            visit(name)
+
+    async def _run_stage(self, stage: Stage, outputs: dict[str, Any], run_id: str | None, result: PipelineResult,
+                         run_kwargs: dict[str, Any]) -> None:
+        agent_input = stage.build_input(outputs)
+        adapter = self._adapters[stage.name]
+        key = _stage_key(stage, agent_input, run_id)
+        if stage.checkpoint:
+            value = await self.store.get(key, adapter)
+            if value is not None:
+                outputs[stage.name], result.status[stage.name], result.timings[stage.name] = value, "cached", 0.0
+                return
+        start = time.perf_counter()
+        run = await Runner.run(stage.agent, agent_input, **run_kwargs)
+        result.timings[stage.name] = time.perf_counter() - start
+        outputs[stage.name], result.status[stage.name] = run.final_output, "done"
+        if stage.checkpoint:
+            await self.store.set(key, run.final_output, adapter)
+
+    async def run(self, input: str | list[TResponseInputItem], *, run_id: str | None = None,
+                  **run_kwargs: Any) -> PipelineResult:
+        """Run every stage whose inputs are ready (concurrently), skipping gated-off branches."""
+        outputs: dict[str, Any] = {PIPELINE_INPUT: input}
+        result = PipelineResult(outputs, {}, {})
+        running: dict[asyncio.Task, str] = {}
+        try:
+            while True:
+                for name, stage in self.stages.items():
+                    if name in result.status or name in running.values():
+                        continue
+                    if any(upstream in result.status and result.status[upstream] not in ("done", "cached")
+                           for upstream in stage.after):
+                        result.status[name] = "skipped"  # an upstream stage was skipped or failed
+                        continue
+                    if not all(upstream in outputs for upstream in stage.after):
+                        continue
+                    if stage.when is not None and not stage.when(outputs):
+                        result.status[name] = "skipped"
+                        continue
+                    task = asyncio.ensure_future(self._run_stage(stage, outputs, run_id, result, run_kwargs))
+                    running[task] = name
+                if not running:
+                    break
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    name = running.pop(task)
+                    if task.exception() is not None:
+                        result.status[name], result.error, result.failed_stage = "failed", task.exception(), name
+                if result.error is not None:
+                    break
+        finally:
+            for task, name in running.items():
+                task.cancel()
+                result.status[name] = "cancelled"
+            if running:
+                await asyncio.wait(running)
+        for name in self.stages:
+            result.status.setdefault(name, "skipped")
+        del outputs[PIPELINE_INPUT]
+        return result
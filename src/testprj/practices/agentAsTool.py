@@ -1,8 +1,9 @@
 from dataclasses import dataclass
-from agents import Agent, AgentHooks, RunContextWrapper, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, TContext, Tool, set_tracing_disabled,function_tool,handoff
+from agents import Agent, AgentHooks, RunContextWrapper, Runner, TContext, Tool, set_tracing_disabled,function_tool,handoff
+from testprj.providers import get_model
 from pydantic import BaseModel
 import requests
-import asyncio
+from testprj.loop_runner import run_agent
 
 from agents import enable_verbose_stdout_logging # for debugging
 
@@ -13,17 +14,8 @@ from dotenv import load_dotenv
 import os
 load_dotenv()
 
-# Set up the external language model provider (Google's Gemini, using OpenAI-compatible API)
-externalProvider = AsyncOpenAI(
-    api_key=os.getenv("GEMINI_API_KEY"),  # API key for Gemini
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",  # Gemini-compatible endpoint
-)
-
-# Create a chat completions model using the Gemini model via the OpenAI API interface
-model = OpenAIChatCompletionsModel(
-    model="gemini-2.0-flash",  # Name of the Gemini model to use
-    openai_client=externalProvider  # The provider configured above
-)
+# Gemini model served from the shared, pooled provider client (see testprj/providers.py)
+model = get_model("gemini-2.0-flash")
 
 
 class PhysicsAnswer(BaseModel):
@@ -94,11 +86,12 @@ front_agent = Agent(
     tools=[urdu_tool],
 )
 
-response = asyncio.run(Runner.run(
+# Runner.run on the shared background loop (testprj/loop_runner.py): pooled connections stay warm across calls
+response = run_agent(
     starting_agent=front_agent,
     input="what is ur name , translate this in urdu?",
 
-))
+)
 # Print execution trace
 print(response.final_output)
 # if isinstance(response.final_output, PhysicsAnswer):
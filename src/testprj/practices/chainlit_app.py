@@ -1,21 +1,24 @@
 # chainlit_app.py
+import logging
+
 import chainlit as cl
-from agents import Agent, AsyncOpenAI, OpenAIChatCompletionsModel, Runner, set_tracing_disabled, function_tool, ModelSettings
+from agents import Agent, Runner, set_tracing_disabled, function_tool, ModelSettings
+from testprj.admission import AdmissionController, Busy
+from testprj.providers import get_model
+from testprj.ui_stream import StreamStats, stream_run
 
 from dotenv import load_dotenv
 import os
 load_dotenv()
 
-# Set up the external language model provider (Google's Gemini, using OpenAI-compatible API)
-externalProvider = AsyncOpenAI(
-    api_key=os.getenv("GEMINI_API_KEY"),  # API key for Gemini
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",  # Gemini-compatible endpoint
-)
+logger = logging.getLogger(__name__)
 
-model = OpenAIChatCompletionsModel(
-    model="gemini-1.5-flash",
-    openai_client=externalProvider
-)
+# UI flush budget: push buffered text at most every UI_FLUSH_MS milliseconds or UI_FLUSH_CHARS characters
+UI_FLUSH_MS = float(os.getenv("UI_FLUSH_MS", "30"))
+UI_FLUSH_CHARS = int(os.getenv("UI_FLUSH_CHARS", "256"))
+
+# Gemini model served from the shared, pooled provider client (see testprj/providers.py)
+model = get_model("gemini-1.5-flash")
 
 set_tracing_disabled(True)
 
@@ -24,18 +27,33 @@ set_tracing_disabled(True)
 def add(a: float, b: float) -> str:
     return f"{a} + {b} = {a + b}"
 
+# The agent is built once at startup and shared by every session (it holds no per-run state)
+agent = Agent(
+    name="Assistant",
+    instructions="You are a helpful assistant",
+    model=model,
+    # tools=[add],  # Enable if needed
+    # model_settings=ModelSettings(tool_choice="required")
+)
+
+# One run per session at a time, ADMISSION_MAX_RUNNING runs overall, ADMISSION_QUEUE_DEPTH waiting;
+# beyond that messages are turned away right away instead of piling up model calls
+admission = AdmissionController.from_env()
+
+BUSY_REPLY = "The assistant is busy right now, please try again in a moment."
+
 # Chainlit on_message hook
 @cl.on_message
 async def on_message(message: cl.Message):
-    # Construct your agent
-    agent = Agent(
-        name="Assistant",
-        instructions="You are a helpful assistant",
-        model=model,
-        # tools=[add],  # Enable if needed
-        # model_settings=ModelSettings(tool_choice="required")
-    )
+    try:
+        async with admission.slot(cl.user_session.get("id")):
+            await respond(message)
+    except Busy as exc:
+        logger.warning("rejected message: %s | %s", exc.reason, admission.stats())
+        await cl.Message(content=BUSY_REPLY).send()
 
+
+async def respond(message: cl.Message):
     # Create a Chainlit message object to stream updates
     msg = cl.Message(content="")
     await msg.send()
@@ -46,19 +64,17 @@ async def on_message(message: cl.Message):
         input=message.content
     )
 
-    async for event in result.stream_events():
-        # Try to print delta/text/etc.
-        if hasattr(event, "delta") and event.delta:
-            msg.content += event.delta
-            await msg.update()
-        elif hasattr(event, "text") and event.text:
-            msg.content += event.text
-            await msg.update()
-        elif hasattr(event, "message") and event.message and hasattr(event.message, "content"):
-            msg.content += event.message.content
-            await msg.update()
+    # Text deltas are coalesced into one websocket frame per UI_FLUSH_MS / UI_FLUSH_CHARS
+    # (msg.stream_token sends only the new text; one msg.update() at the end)
+    stats = await stream_run(result, msg.stream_token, interval=UI_FLUSH_MS / 1000, max_chars=UI_FLUSH_CHARS)
 
     # Optionally update final output if streaming didn’t work
     if not msg.content.strip():
-        msg.content = result.final_output
-        await msg.update()
+        msg.content = str(result.final_output)
+    await msg.update()
+
+    # Per-session totals, to tune the flush budget
+    session_stats = cl.user_session.get("stream_stats") or StreamStats()
+    session_stats.add(stats)
+    cl.user_session.set("stream_stats", session_stats)
+    logger.info("response: %s | session: %s", stats.summary(), session_stats.summary())
@@ -1,6 +1,8 @@
 # Import core components from the openai-agents framework
-import asyncio
-from agents import Agent, ModelSettings, RunContextWrapper, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, function_tool, set_tracing_disabled
+from agents import Agent, ModelSettings, RunContextWrapper, Runner, function_tool, set_tracing_disabled
+from testprj.loop_runner import run
+from testprj.providers import get_model
+from testprj.token_accounting import run_accounted
 from agents.agent import StopAtTools
 from dataclasses import dataclass
 
@@ -8,18 +10,8 @@ from dotenv import load_dotenv
 import os
 load_dotenv()
 
-# Set up the external language model provider (Google's Gemini, using OpenAI-compatible API)
-externalProvider = AsyncOpenAI(
-    api_key=os.getenv("GEMINI_API_KEY"),  # API key for Gemini
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",  # Gemini-compatible endpoint
-)
-
-
-# Create a chat completions model using the Gemini model via the OpenAI API interface
-model = OpenAIChatCompletionsModel(
-    model="gemini-1.5-flash",  # Name of the Gemini model to use
-    openai_client=externalProvider  # The provider configured above
-)
+# Gemini model served from the shared, pooled provider client (see testprj/providers.py)
+model = get_model("gemini-1.5-flash")
 set_tracing_disabled(True)
 
 @dataclass
@@ -52,11 +44,13 @@ def runAgent():
         instructions=get_dynamic_instruction,
         model=model,
     )
-    response = asyncio.run(Runner.run(
+    # run_accounted = Runner.run + an estimate of what every prompt is made of (instructions, tools, history)
+    response = run(run_accounted(
         starting_agent=agent,
         input="what is ur current role?",
         context = instance
     ))
     print(response.final_output)
+    print(response.token_accounting.by_agent())
 
 runAgent()
\ No newline at end of file
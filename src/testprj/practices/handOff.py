@@ -1,23 +1,17 @@
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, set_tracing_disabled,function_tool,handoff
+from agents import Agent, Runner, set_tracing_disabled,function_tool,handoff
+from testprj.providers import get_model
 import requests
-import asyncio
+from testprj.loop_runner import run
+from testprj.embedding_router import EmbeddingRouter, ProviderEmbedder
+from testprj.prerouter import PreRouter, Route
 
 set_tracing_disabled(True)
 from dotenv import load_dotenv
 import os
 load_dotenv()
 
-# Set up the external language model provider (Google's Gemini, using OpenAI-compatible API)
-externalProvider = AsyncOpenAI(
-    api_key=os.getenv("GEMINI_API_KEY"),  # API key for Gemini
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",  # Gemini-compatible endpoint
-)
-
-# Create a chat completions model using the Gemini model via the OpenAI API interface
-model = OpenAIChatCompletionsModel(
-    model="gemini-1.5-flash",  # Name of the Gemini model to use
-    openai_client=externalProvider  # The provider configured above
-)
+# Gemini model served from the shared, pooled provider client (see testprj/providers.py)
+model = get_model("gemini-1.5-flash")
 
 history_tutor_agent = Agent(
     name="History Tutor",
@@ -106,19 +100,46 @@ agent_f_2 = Agent(
     handoffs = [astronaunt_tutor_agent,science_tutor_agent,sindhi_tutor_agent]
 )
 
-response = asyncio.run(Runner.run(
-    starting_agent=agent_f_1,
-    input="what is the integral of 1/x and who is the founder of india?"
-))
-
-response_f_2 = asyncio.run(Runner.run(
-    starting_agent=agent_f_2,
-    input="what is the diameter of jupyter and sun,this is the question of astronaut?"
-))
-
-print(response.final_output)
-print(response.last_agent.name)
-print(response_f_2.final_output)
-print(response_f_2.last_agent.name)
+# Questions that clearly belong to one tutor skip agent_f_1's handoff call; mixed ones (like the
+# first question below, math AND history) still go through it.
+tutor_router = PreRouter(
+    [
+        Route(math_tutor_agent, keywords=["integral", "derivative", "equation", "algebra", "calculus", "geometry",
+                                          "solve", "multiply", "divide", "fraction", "theorem"]),
+        Route(history_tutor_agent, keywords=["history", "founder", "founded", "empire", "war", "king", "queen",
+                                             "dynasty", "revolution", "independence", "century"]),
+    ],
+    fallback=agent_f_1,
+)
 
+# agent_f_2 only sees the handoffs closest to the question (or none, when one tutor clearly
+# matches), so its prompt stays the same size however many tutors it gets.
+specialist_router = EmbeddingRouter(
+    agent_f_2,
+    ProviderEmbedder(os.getenv("HANDOFF_EMBEDDING_MODEL", "text-embedding-004")),
+    k=2,
+)
 
+async def main():
+    question = "what is the integral of 1/x and who is the founder of india?"
+    response = await Runner.run(
+        starting_agent=tutor_router.select(question),
+        input=question
+    )
+
+    question_f_2 = "what is the diameter of jupyter and sun,this is the question of astronaut?"
+    response_f_2 = await Runner.run(
+        starting_agent=await specialist_router.select(question_f_2),
+        input=question_f_2
+    )
+
+    print(response.final_output)
+    print(response.last_agent.name)
+    print(response_f_2.final_output)
+    print(response_f_2.last_agent.name)
+    print(f"pre-router: {tutor_router.stats()}")
+    print(f"embedding router: {specialist_router.stats()}")
+
+
+if __name__ == "__main__":
+    run(main())  # on the shared background loop (testprj/loop_runner.py)
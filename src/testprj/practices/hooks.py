@@ -1,5 +1,6 @@
 import asyncio
-from agents import Agent, AgentHooks, ModelSettings, RunContextWrapper, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, Tool, function_tool, set_tracing_disabled,RunHooks
+from agents import Agent, AgentHooks, ModelSettings, RunContextWrapper, Runner, Tool, function_tool, set_tracing_disabled,RunHooks
+from testprj.providers import get_model
 from agents.agent import StopAtTools
 from dataclasses import dataclass
 
@@ -7,18 +8,8 @@ from dotenv import load_dotenv
 import os
 load_dotenv()
 
-# Set up the external language model provider (Google's Gemini, using OpenAI-compatible API)
-externalProvider = AsyncOpenAI(
-    api_key=os.getenv("GEMINI_API_KEY"),  # API key for Gemini
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",  # Gemini-compatible endpoint
-)
-
-
-# Create a chat completions model using the Gemini model via the OpenAI API interface
-model = OpenAIChatCompletionsModel(
-    model="gemini-1.5-flash",  # Name of the Gemini model to use
-    openai_client=externalProvider  # The provider configured above
-)
+# Gemini model served from the shared, pooled provider client (see testprj/providers.py)
+model = get_model("gemini-1.5-flash")
 set_tracing_disabled(True)
 
 
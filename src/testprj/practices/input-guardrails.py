@@ -1,4 +1,8 @@
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, set_tracing_disabled,function_tool,handoff
+from agents import Agent, Runner, set_tracing_disabled,function_tool,handoff
+from testprj.providers import get_model
+from testprj.preclassifier import PreClassifier, verdict_log
+from testprj.response_cache import cached
+from testprj.speculative import run_speculative
 import requests
 import asyncio
 from dataclasses import dataclass
@@ -21,17 +25,8 @@ from dotenv import load_dotenv
 import os
 load_dotenv()
 
-# Set up the external language model provider (Google's Gemini, using OpenAI-compatible API)
-externalProvider = AsyncOpenAI(
-    api_key=os.getenv("GEMINI_API_KEY"),  # API key for Gemini
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",  # Gemini-compatible endpoint
-)
-
-# Create a chat completions model using the Gemini model via the OpenAI API interface
-model = OpenAIChatCompletionsModel(
-    model="gemini-1.5-flash",  # Name of the Gemini model to use
-    openai_client=externalProvider  # The provider configured above
-)
+# Gemini model served from the shared, pooled provider client (see testprj/providers.py)
+model = get_model("gemini-1.5-flash")
 
 
 
@@ -42,12 +37,22 @@ class MathHomeworkOutput(BaseModel):
 guardrail_agent = Agent( 
     name="Guardrail check",
     instructions="Check if the user is asking you to do their math homework.",
-    model=model,
+    model=cached(model),  # identical checks are answered from the response cache
     output_type=MathHomeworkOutput,
 )
 
 
+# Local first stage: obvious homework (or obvious small talk) is decided without a model call.
+math_precheck = PreClassifier(
+    block_terms=["solve for", "integral of", "derivative of", "my math homework"],
+    block_patterns=[r"\d+\s*[a-z]?\s*[-+*/^]\s*\d+\s*[a-z]?\s*=\s*-?\d+"],  # e.g. 2x + 5 = 11
+    allow_terms=["hi", "hello", "hey", "thanks", "thank you", "bye"],
+    log_path=verdict_log("math_homework"),
+)
+
+
 @input_guardrail
+@math_precheck.guard
 async def math_guardrail( 
     ctx: RunContextWrapper[None], agent: Agent, input: str | list[TResponseInputItem]
 ) -> GuardrailFunctionOutput:
@@ -71,7 +76,8 @@ agent = Agent(
 async def main():
     # This should trip the guardrail
     try:
-        response = await Runner.run(agent, "Hello, what is the weather in karachi?")
+        # the agent's first model call starts alongside math_guardrail and is cancelled if it trips
+        response = await run_speculative(agent, "Hello, what is the weather in karachi?")
         print("--------------------------------")
         print(response.final_output)
         # print("Guardrail didn't trip - this is unexpected")
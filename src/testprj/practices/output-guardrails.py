@@ -1,4 +1,6 @@
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, set_tracing_disabled,function_tool,handoff
+from agents import Agent, Runner, set_tracing_disabled,function_tool,handoff
+from testprj.providers import get_model
+from testprj.streaming_guardrails import PartialOutput, run_streamed_guarded, streaming_output_guardrail
 import requests
 import asyncio
 from dataclasses import dataclass
@@ -32,17 +34,8 @@ from dotenv import load_dotenv
 import os
 load_dotenv()
 
-# Set up the external language model provider (Google's Gemini, using OpenAI-compatible API)
-externalProvider = AsyncOpenAI(
-    api_key=os.getenv("GEMINI_API_KEY"),  # API key for Gemini
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",  # Gemini-compatible endpoint
-)
-
-# Create a chat completions model using the Gemini model via the OpenAI API interface
-model = OpenAIChatCompletionsModel(
-    model="gemini-1.5-flash",  # Name of the Gemini model to use
-    openai_client=externalProvider  # The provider configured above
-)
+# Gemini model served from the shared, pooled provider client (see testprj/providers.py)
+model = get_model("gemini-1.5-flash")
 
 
 class MessageOutput(BaseModel): 
@@ -59,6 +52,9 @@ guardrail_agent = Agent(
     output_type=MathOutput,
 )
 
+# Post-hoc form for plain `Runner.run` (agent.clone(output_guardrails=[math_guardrail])). Not attached
+# to the agent below: run_streamed_guarded already checks the complete output once more at the end,
+# so both together would pay for the LLM check twice.
 @output_guardrail
 async def math_guardrail(  
     ctx: RunContextWrapper, agent: Agent, output: MessageOutput
@@ -70,21 +66,37 @@ async def math_guardrail(
         tripwire_triggered=result.final_output.is_math,
     )
 
+# The same check while the answer streams: runs on the partially generated `response` field every
+# ~200 characters (one check in flight at a time) and stops the generation as soon as it trips.
+@streaming_output_guardrail(every=200)
+async def math_stream_guardrail(
+    ctx: RunContextWrapper, agent: Agent, partial: PartialOutput
+) -> GuardrailFunctionOutput:
+    text = partial.fields.get("response") or partial.text
+    result = await Runner.run(guardrail_agent, text, context=ctx.context)
+
+    return GuardrailFunctionOutput(
+        output_info=result.final_output,
+        tripwire_triggered=result.final_output.is_math,
+    )
+
 agent = Agent( 
     name="Customer support agent",
     instructions="You are a customer support agent. You help customers with their questions.",
     model=model,
-    output_guardrails=[math_guardrail],
     output_type=MessageOutput,
 )
 
 async def main():
     # This should trip the guardrail
     try:
-        await Runner.run(agent, "Hello, what is the weather in karachi?")
+        result = run_streamed_guarded(agent, "Hello, what is the weather in karachi?", [math_stream_guardrail])
+        async for _ in result.stream_events():
+            pass
         print("Guardrail didn't trip - this is unexpected")
 
     except OutputGuardrailTripwireTriggered:
         print("Math output guardrail tripped")
 
-asyncio.run(main())
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
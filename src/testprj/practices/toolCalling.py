@@ -1,59 +1,95 @@
 # Import core components from the openai-agents framework
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, set_tracing_disabled,function_tool
-import requests
-import asyncio
+from agents import Agent, ModelSettings, Runner, set_tracing_disabled
+from testprj.caching import SingleFlight, TTLCache
+from testprj.loop_runner import run, run_agent
+from testprj.tool_cache import ToolCacheHooks, deduplicated, function_tool
+from testprj.providers import get_model
+import httpx
 
 from dotenv import load_dotenv
 import os
 load_dotenv()
 
-# Set up the external language model provider (Google's Gemini, using OpenAI-compatible API)
-externalProvider = AsyncOpenAI(
-    api_key=os.getenv("GEMINI_API_KEY"),  # API key for Gemini
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",  # Gemini-compatible endpoint
-)
+# Gemini model served from the shared, pooled provider client (see testprj/providers.py)
+model = get_model("gemini-1.5-flash")
 
-# Create a chat completions model using the Gemini model via the OpenAI API interface
-model = OpenAIChatCompletionsModel(
-    model="gemini-1.5-flash",  # Name of the Gemini model to use
-    openai_client=externalProvider  # The provider configured above
-)
+# Weather lookups run on the asyncio loop next to every other agent run, so they must never block it.
+# One pooled async HTTP client is shared by all calls, readings are cached per normalized city
+# (TTL + LRU) and concurrent lookups for the same city share a single in-flight request.
+WEATHER_BASE_URL = os.getenv("OPENWEATHER_BASE_URL", "http://api.openweathermap.org/data/2.5/weather")
+WEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY", "1d7527df97376b8cd1cec4882abe27f8")
+WEATHER_TIMEOUT = float(os.getenv("OPENWEATHER_TIMEOUT", "5"))  # seconds per call
 
-#This is a tool that returns the temperature of the city
-@function_tool
-def get_current_weather(city: str) -> str:
-    """
-    Fetches the current weather for a given city using the OpenWeatherMap API.
+weather_cache = TTLCache(maxsize=512, ttl=600)  # weather barely changes within 10 minutes
+weather_inflight = SingleFlight()
+_weather_http: httpx.AsyncClient | None = None
 
-    Args:
-        city (str): Name of the city (or country capital) to get weather for.
-        api_key (str): Your OpenWeatherMap API key.
 
-    Returns:
-        str: Weather description and temperature in Celsius, or an error message.
-    """
-    base_url = "http://api.openweathermap.org/data/2.5/weather"
+def _weather_client() -> httpx.AsyncClient:
+    global _weather_http
+    if _weather_http is None:
+        _weather_http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+            timeout=httpx.Timeout(WEATHER_TIMEOUT),
+        )
+    return _weather_http
+
+
+def _normalize_city(city: str) -> str:
+    return " ".join(city.split()).casefold()  # "  Karachi " and "karachi" are one cache entry
+
+
+async def _fetch_weather(city: str) -> tuple[str, float] | str:
+    """(description, temperature) from the API, or an error message."""
     params = {
         'q': city,
-        'appid': '1d7527df97376b8cd1cec4882abe27f8',
+        'appid': WEATHER_API_KEY,
         'units': 'metric'  # Use 'imperial' for Fahrenheit
     }
-
     try:
-        response = requests.get(base_url, params=params)
+        response = await _weather_client().get(WEATHER_BASE_URL, params=params, timeout=WEATHER_TIMEOUT)
         data = response.json()
-
-        if response.status_code == 200:
-            weather = data['weather'][0]['description'].capitalize()
-            temp = data['main']['temp']
-            return f"The current weather in {city} is {weather} with a temperature of {temp}°C."
-        else:
-            return f"Error: {data.get('message', 'Unable to fetch weather.')}"
+    except httpx.TimeoutException:
+        return f"Error: weather service timed out after {WEATHER_TIMEOUT}s."
     except Exception as e:
         return f"Exception occurred: {str(e)}"
 
+    if response.status_code != 200:
+        return f"Error: {data.get('message', 'Unable to fetch weather.')}"
+    reading = (data['weather'][0]['description'].capitalize(), data['main']['temp'])
+    # only successful readings are cached, and without the city: each caller's spelling is used
+    weather_cache.set(_normalize_city(city), reading)
+    return reading
+
+
+def _describe_weather(city: str, reading: tuple[str, float] | str) -> str:
+    if isinstance(reading, str):
+        return reading
+    weather, temp = reading
+    return f"The current weather in {city} is {weather} with a temperature of {temp}°C."
+
 
+#This is a tool that returns the temperature of the city
 @function_tool
+async def get_current_weather(city: str) -> str:
+    """
+    Fetches the current weather for a given city using the OpenWeatherMap API.
+
+    Args:
+        city (str): Name of the city (or country capital) to get weather for.
+
+    Returns:
+        str: Weather description and temperature in Celsius, or an error message.
+    """
+    key = _normalize_city(city)
+    reading = weather_cache.get(key)
+    if reading is None:
+        reading = await weather_inflight.do(key, lambda: _fetch_weather(city))
+    return _describe_weather(city, reading)
+
+
+# Pure tools: the same arguments always give the same answer, so results are memoized (bounded LRU)
+@function_tool(pure=True)
 def get_addition(a: int, b: int) -> int:
     """
     Returns the sum of two integers.
@@ -73,28 +109,28 @@ def get_addition(a: int, b: int) -> int:
     return f"The addition of {a} and {b} is {a+b}"
 
 # Tool 1: Addition
-@function_tool
+@function_tool(pure=True)
 def add(a: float, b: float) -> str:
     """Returns the sum of two numbers."""
     print(f"testing tools addition")
     return f"{a} + {b} = {a + b}"
 
 # Tool 2: Subtraction
-@function_tool
+@function_tool(pure=True)
 def subtract(a: float, b: float) -> str:
     """Returns the result of subtracting b from a."""
     print(f"testing tools subtraction")
     return f"{a} - {b} = {a - b}"
 
 # Tool 3: Multiplication
-@function_tool
+@function_tool(pure=True)
 def multiply(a: float, b: float) -> str:
     """Returns the product of two numbers."""
     print(f"testing tools multiplication")
     return f"{a} * {b} = {a * b}"
 
 # Tool 4: Division
-@function_tool
+@function_tool(pure=True)
 def divide(a: float, b: float) -> str:
     """Returns the result of dividing a by b."""
     print(f"testing tools division")
@@ -103,6 +139,10 @@ def divide(a: float, b: float) -> str:
     return f"{a} / {b} = {a / b}"
 
 
+# Identical calls the model repeats within one turn (same tool, same arguments) run once and
+# every call id gets the result
+parallel_tools = deduplicated([add, subtract, multiply, divide, get_current_weather])
+
 # Disable internal tracing/logging (optional – for performance or privacy)
 set_tracing_disabled(True)
 
@@ -117,8 +157,8 @@ def runAgent():
         tools=[add,subtract] # This is the tool that will be used to get the temperature of the city
     )
 
-    # Run the agent synchronously with a given input
-    response = Runner.run_sync(
+    # Run the agent synchronously with a given input (on the shared background loop, see testprj/loop_runner.py)
+    response = run_agent(
         starting_agent=agent,
         input="What is the result of the 1+1-2"  # Input message to the assistant
     )
@@ -135,19 +175,23 @@ async def  runAgentAsync ():
         name="Assistant",
         instructions="You are a helpful assistant",
         model=model,  # Uses the Gemini model set above
-        tools=[add,subtract,multiply,divide,get_current_weather] # This is the tool that will be used to get the temperature of the city
+        tools=parallel_tools, # arithmetic tools and the weather tool, with repeated calls deduplicated
+        model_settings=ModelSettings(parallel_tool_calls=True), # "karachi and lahore" -> two weather calls in one turn, run concurrently
     )
 
     # Run the agent synchronously with a given input
+    hooks = ToolCacheHooks()  # counts memoized tool calls, cache hits and deduplicated calls
     response = await Runner.run(
         starting_agent=agent,
-        input="What is the result of the 1+1-200*200/50? and what is the current weather in karachi and lahore?"  # Input message to the assistant
+        input="What is the result of the 1+1-200*200/50? and what is the current weather in karachi and lahore?",  # Input message to the assistant
+        hooks=hooks,
     )
 
     # Print the agent's final response
     print(response.final_output)
+    print(f"tool cache: {hooks.stats()}")
     
 def testAsync():
-    asyncio.run(runAgentAsync())
+    run(runAgentAsync())
 
 
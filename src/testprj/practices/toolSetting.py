@@ -1,6 +1,7 @@
 # Import core components from the openai-agents framework
-import asyncio
-from agents import Agent, ModelSettings, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, function_tool, set_tracing_disabled
+from agents import Agent, ModelSettings, Runner, function_tool, set_tracing_disabled
+from testprj.loop_runner import run_agent
+from testprj.providers import get_model
 from agents.agent import StopAtTools
 
 import agentops
@@ -10,21 +11,9 @@ from dotenv import load_dotenv
 import os
 load_dotenv()
 
-# Set up the external language model provider (Google's Gemini, using OpenAI-compatible API)
-externalProvider = AsyncOpenAI(
-    api_key=os.getenv("GEMINI_API_KEY"),  # API key for Gemini
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",  # Gemini-compatible endpoint
-)
-# externalProvider = AsyncOpenAI(  # API key for Gemini
-#     api_key="1234567890",
-#     base_url="http://localhost:11434/api/chat",  # Gemini-compatible endpoint
-# )
-
-# Create a chat completions model using the Gemini model via the OpenAI API interface
-model = OpenAIChatCompletionsModel(
-    model="gemini-1.5-flash",  # Name of the Gemini model to use
-    openai_client=externalProvider  # The provider configured above
-)
+# Gemini model served from the shared, pooled provider client (see testprj/providers.py)
+# model = get_model("llama3.2:latest", provider="ollama")  # local alternative
+model = get_model("gemini-1.5-flash")
 
 # Disable internal tracing/logging (optional – for performance or privacy)
 set_tracing_disabled(True)
@@ -84,8 +73,8 @@ def runAgent():
         )
     )
 
-    # Run the agent synchronously with a given input
-    response = Runner.run_sync(
+    # Run the agent synchronously with a given input (every run shares one background loop, see testprj/loop_runner.py)
+    response = run_agent(
         starting_agent=agent,
         input="What is the capital of blackHole?"  # Input message to the assistant
     )
@@ -108,11 +97,11 @@ def  runAgentAsync ():
     )
 
     # Run the agent synchronously with a given input
-    response = asyncio.run(Runner.run(
+    response = run_agent(
         max_turns=2,
         starting_agent=agent,
         input="what is 1+1?"  # Input message to the assistant
-    ))
+    )
     print('tool_call_count',tool_call_count)
 
     # Print the agent's final response
@@ -134,11 +123,11 @@ def  runAgentAsyncWithoutllmVerification ():
     )
 
     # Run the agent synchronously with a given input
-    response = asyncio.run(Runner.run(
+    response = run_agent(
         # max_turns=2,
         starting_agent=agent,
         input="what is 2+2*300-1?"  # Input message to the assistant
-    ))
+    )
     print('tool_call_count',tool_call_count)
     # running asyncagent
     # Tool subtract called
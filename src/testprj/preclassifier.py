@@ -0,0 +1,297 @@
+"""
+Cheap local pre-classifier in front of LLM guardrails.
+
+Every `@input_guardrail` that calls `Runner.run(guardrail_agent, ...)` costs a second model call
+per user message, although most traffic is clearly benign. `PreClassifier.guard` wraps such a
+guardrail with two local stages and only escalates the uncertain cases to the LLM:
+
+1. keyword automaton - the block / allow term lists compiled into ONE regex alternation
+   (case-insensitive, word-bounded), so a message is scanned once however many terms there are.
+   A block hit trips the guardrail immediately; a message made ONLY of allow terms (and
+   punctuation) passes it - "thanks!" does, "thanks, my password is ..." does not.
+2. linear classifier - hashed bag-of-words + logistic regression in NumPy, trained from the
+   verdicts the LLM guardrail has already produced. Confident scores decide locally
+   (below `allow_below` passes, above `block_above` trips); anything in between escalates.
+
+Only the latest user message is classified, and only that message is passed to the wrapped LLM
+check (an earlier abusive turn must not trip every later one, and the logged verdict must belong
+to the text it is logged with). Every escalated verdict is logged - the newest `max_verdicts` in
+memory, plus every one in `log_path` as JSON lines when set (see `verdict_log` /
+GUARDRAIL_LOG_DIR; appended from a worker thread) - and the classifier is refit in a worker
+thread on the in-memory window every `retrain_every` new verdicts, so the share of messages
+decided locally grows with traffic.
+
+Usage:
+    sensitive_precheck = PreClassifier(block_terms=["password is", "kill you"], log_path=verdict_log("sensitive"))
+
+    @input_guardrail
+    @sensitive_precheck.guard
+    async def sensitive_input_guardrail(context, agent, input):
+        ...  # the existing LLM check
+
+NumPy is optional: without it only the keyword stage runs and everything else escalates.
+"""
+
+import asyncio
+import functools
+import json
+import os
+import re
+import zlib
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from agents import Agent, GuardrailFunctionOutput, RunContextWrapper, TResponseInputItem
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is an optional extra
+    np = None
+
+GuardrailFunction = Callable[
+    [RunContextWrapper[Any], Agent[Any], str | list[TResponseInputItem]], Awaitable[GuardrailFunctionOutput]
+]
+
+_TOKEN = re.compile(r"\w+")
+
+
+def verdict_log(name: str) -> str | None:
+    """`<GUARDRAIL_LOG_DIR>/<name>.jsonl` when GUARDRAIL_LOG_DIR is set, so verdicts survive restarts."""
+    directory = os.getenv("GUARDRAIL_LOG_DIR")
+    return os.path.join(directory, f"{name}.jsonl") if directory else None
+
+
+def input_text(input: str | list[TResponseInputItem]) -> str:
+    """The latest user message of a guardrail input (string or Responses-format item list)."""
+    if isinstance(input, str):
+        return input
+    for item in reversed(input):
+        if not isinstance(item, dict) or item.get("role") != "user":
+            continue
+        content = item.get("content")
+        if isinstance(content, str):
+            return content
+        if isinstance(content, list):
+            return "\n".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return ""
+
+
+class KeywordAutomaton:
+    """A term list compiled into one case-insensitive, word-bounded regex alternation."""
+
+    def __init__(self, terms: Iterable[str] = (), patterns: Iterable[str] = ()):
+        alternatives = [re.escape(term.strip()) for term in terms if term.strip()]
+        alternatives += list(patterns)
+        # longest first, so "kill you" wins over "kill" when both are listed
+        alternatives.sort(key=len, reverse=True)
+        self._regex = re.compile(r"\b(?:" + "|".join(alternatives) + r")\b", re.IGNORECASE) if alternatives else None
+
+    def find(self, text: str) -> list[str]:
+        if self._regex is None:
+            return []
+        return [match.group(0).lower() for match in self._regex.finditer(text)]
+
+    def covers(self, text: str) -> bool:
+        """Whether `text` is nothing but terms of this list, whitespace and punctuation."""
+        if self._regex is None or not self._regex.search(text):
+            return False
+        return _TOKEN.search(self._regex.sub(" ", text)) is None
+
+    def __bool__(self) -> bool:
+        return self._regex is not None
+
+
+class LinearClassifier:
+    """Hashed bag-of-words (unigrams + bigrams) logistic regression. Needs NumPy."""
+
+    def __init__(self, n_features: int = 2**14):
+        if np is None:
+            raise RuntimeError("LinearClassifier needs numpy (pip install 'testprj[numpy]')")
+        self.n_features = n_features
+        self.weights = np.zeros(n_features, dtype=np.float32)
+        self.bias = 0.0
+        self.trained = False
+
+    def _features(self, text: str) -> "np.ndarray":
+        tokens = _TOKEN.findall(text.lower())
+        grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        return np.fromiter((zlib.crc32(g.encode()) % self.n_features for g in grams), dtype=np.int64, count=len(grams))
+
+    def _coo(self, texts: list[str]) -> tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """Sparse (row, column, value) triplets; a dense matrix would be rows x n_features."""
+        rows, cols, values = [], [], []
+        for row, text in enumerate(texts):
+            indices = self._features(text)
+            if len(indices):
+                rows.append(np.full(len(indices), row))
+                cols.append(indices)
+                values.append(np.full(len(indices), 1.0 / np.sqrt(len(indices)), dtype=np.float32))
+        if not rows:
+            return np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0, np.float32)
+        return np.concatenate(rows), np.concatenate(cols), np.concatenate(values)
+
+    def fit(self, texts: list[str], labels: list[bool], epochs: int = 300, lr: float = 1.0, l2: float = 1e-4) -> None:
+        """Full-batch gradient descent; fine for the few thousand logged verdicts we train on."""
+        rows, cols, values = self._coo(texts)
+        n = len(texts)
+        y = np.asarray(labels, dtype=np.float32)
+        # weight the rare class up so a mostly-benign log still learns what "block" looks like
+        positives = max(float(y.sum()), 1.0)
+        negatives = max(float(n - y.sum()), 1.0)
+        sample_weight = np.where(y == 1, n / (2 * positives), n / (2 * negatives)).astype(np.float32)
+        w = np.zeros(self.n_features, dtype=np.float32)
+        b = 0.0
+        for _ in range(epochs):
+            scores = np.bincount(rows, weights=values * w[cols], minlength=n) + b
+            error = (1.0 / (1.0 + np.exp(-scores)) - y) * sample_weight
+            gradient = np.bincount(cols, weights=values * error[rows], minlength=self.n_features)
+            w -= (lr * (gradient / n + l2 * w)).astype(np.float32)
+            b -= lr * float(error.mean())
+        self.weights, self.bias, self.trained = w, b, True
+
+    def predict_proba(self, text: str) -> float:
+        indices = self._features(text)
+        if not len(indices):
+            return 0.0
+        score = float(self.weights[indices].sum() / np.sqrt(len(indices)) + self.bias)
+        return 1.0 / (1.0 + np.exp(-score))
+
+    def save(self, path: str | os.PathLike) -> None:
+        np.savez_compressed(path, weights=self.weights, bias=np.float32(self.bias))
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> "LinearClassifier":
+        data = np.load(path)
+        classifier = cls(n_features=len(data["weights"]))
+        classifier.weights, classifier.bias, classifier.trained = data["weights"], float(data["bias"]), True
+        return classifier
+
+
+@dataclass
+class LocalVerdict:
+    """`output_info` of a guardrail decided without the LLM."""
+
+    stage: str  # "keyword" | "classifier"
+    tripwire_triggered: bool
+    score: float | None = None
+    matched: list[str] = field(default_factory=list)
+
+
+class PreClassifier:
+    def __init__(
+        self,
+        block_terms: Iterable[str] = (),
+        allow_terms: Iterable[str] = (),
+        block_patterns: Iterable[str] = (),
+        classifier: "LinearClassifier | None" = None,
+        allow_below: float = 0.1,
+        block_above: float = 0.95,
+        log_path: str | os.PathLike | None = None,
+        retrain_every: int = 200,
+        min_training: int = 50,
+        max_verdicts: int = 5000,
+    ):
+        self.block = KeywordAutomaton(block_terms, block_patterns)
+        self.allow = KeywordAutomaton(allow_terms)
+        self.classifier = classifier
+        self.allow_below = allow_below
+        self.block_above = block_above
+        self.log_path = os.fspath(log_path) if log_path else None
+        self.retrain_every = retrain_every
+        self.min_training = min_training
+        self.verdicts: deque[tuple[str, bool]] = deque(maxlen=max_verdicts)  # the newest, for training
+        self._since_fit = 0
+        self._fitting: asyncio.Task | None = None
+        self._pending_lines: list[str] = []
+        self._writing: asyncio.Task | None = None
+        self.counts = {"keyword_block": 0, "keyword_allow": 0, "classifier_allow": 0, "classifier_block": 0, "escalated": 0}
+        if self.log_path and os.path.exists(self.log_path):
+            with open(self.log_path, encoding="utf-8") as fh:
+                self.verdicts.extend((e["text"], e["tripped"]) for e in map(json.loads, fh) if e)
+            self.fit()
+
+    def classify(self, text: str) -> LocalVerdict | None:
+        """Decide locally, or return None to escalate to the LLM guardrail."""
+        matched = self.block.find(text)
+        if matched:
+            self.counts["keyword_block"] += 1
+            return LocalVerdict("keyword", True, matched=matched)
+        # an allow term only vouches for a message that has nothing else in it
+        if self.allow.covers(text):
+            self.counts["keyword_allow"] += 1
+            return LocalVerdict("keyword", False, matched=self.allow.find(text))
+        if self.classifier is not None and self.classifier.trained:
+            score = self.classifier.predict_proba(text)
+            if score < self.allow_below:
+                self.counts["classifier_allow"] += 1
+                return LocalVerdict("classifier", False, score=score)
+            if score > self.block_above:
+                self.counts["classifier_block"] += 1
+                return LocalVerdict("classifier", True, score=score)
+        self.counts["escalated"] += 1
+        return None
+
+    def record(self, text: str, tripped: bool) -> None:
+        """Log an LLM verdict as training data; refits in the background every `retrain_every`."""
+        self.verdicts.append((text, tripped))
+        if self.log_path:
+            self._pending_lines.append(json.dumps({"text": text, "tripped": tripped}, ensure_ascii=False) + "\n")
+            if self._writing is None or self._writing.done():
+                self._writing = asyncio.get_running_loop().create_task(self._write_pending())
+        self._since_fit += 1
+        if self._since_fit >= self.retrain_every and (self._fitting is None or self._fitting.done()):
+            self._since_fit = 0
+            self._fitting = asyncio.get_running_loop().create_task(asyncio.to_thread(self.fit))
+
+    async def _write_pending(self) -> None:
+        # one writer at a time keeps the lines in order; verdicts recorded meanwhile go in the next batch
+        while self._pending_lines:
+            lines, self._pending_lines = self._pending_lines, []
+            await asyncio.to_thread(self._append, lines)
+
+    def _append(self, lines: list[str]) -> None:
+        directory = os.path.dirname(self.log_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.log_path, "a", encoding="utf-8") as fh:
+            fh.writelines(lines)
+
+    def fit(self) -> bool:
+        """Refit the classifier on the kept verdicts. Returns False when there is too little data."""
+        verdicts = list(self.verdicts)  # a snapshot: `record` keeps appending while this runs in a thread
+        labels = {tripped for _, tripped in verdicts}
+        if np is None or len(verdicts) < self.min_training or len(labels) < 2:
+            return False
+        classifier = LinearClassifier(self.classifier.n_features if self.classifier else 2**14)
+        texts, tripped = zip(*verdicts)
+        classifier.fit(list(texts), list(tripped))
+        self.classifier = classifier  # swap in one assignment; readers never see a half-trained model
+        return True
+
+    def guard(self, llm_check: GuardrailFunction) -> GuardrailFunction:
+        """Wrap an LLM guardrail function; apply `@input_guardrail` on top of this."""
+
+        @functools.wraps(llm_check)
+        async def guarded(ctx: RunContextWrapper[Any], agent: Agent[Any], input: str | list[TResponseInputItem]):
+            text = input_text(input)
+            verdict = self.classify(text)
+            if verdict is not None:
+                return GuardrailFunctionOutput(output_info=verdict, tripwire_triggered=verdict.tripwire_triggered)
+            if not text:
+                return await llm_check(ctx, agent, input)  # no user message to judge or learn from
+            # the LLM judges the same text that is classified and recorded
+            result = await llm_check(ctx, agent, text)
+            self.record(text, result.tripwire_triggered)
+            return result
+
+        return guarded
+
+    def stats(self) -> dict[str, float]:
+        total = sum(self.counts.values())
+        return {
+            **self.counts,
+            "local_rate": (total - self.counts["escalated"]) / total if total else 0.0,
+            "training_size": len(self.verdicts),
+        }
@@ -0,0 +1,175 @@
+"""
+Rule-based fast path in front of a triage agent.
+
+agent_routing.py sends every first message to `triage_agent` - one model call (and the latency of
+a full response) just to pick french / spanish / english - and practices/handOff.py does the same
+to pick a history or math tutor. Most of those messages are unambiguous. `PreRouter` decides them
+locally and starts the run on the target agent directly; only the rest goes through triage:
+
+1. keywords - every route's terms compiled into ONE automaton (`preclassifier.KeywordAutomaton`,
+   a single case-insensitive, word-bounded alternation), so a message is scanned once however
+   many routes and terms there are. Hits on exactly one route decide it.
+2. language ID - stopword and diacritic evidence per language (`LanguageID`). The best language
+   decides when it has at least `min_evidence` hits and `threshold` of all evidence, and exactly
+   one route serves it.
+
+Anything else - mixed keywords, short or mixed-language messages, and messages matching one of
+the `defer` patterns (e.g. an explicit "reply in French") - falls back to triage.
+
+    router = PreRouter(
+        [Route(spanish_agent, languages=["es"]), Route(french_agent, languages=["fr"]),
+         Route(english_agent, languages=["en"])],
+        fallback=triage_agent,
+    )
+    agent = router.select(msg)  # the target agent, or triage_agent when in doubt
+    router.stats()              # {"keyword": 3, "language": 41, "triage": 6, "triage_calls_saved": 44, ...}
+"""
+
+import re
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from agents import Agent, TResponseInputItem
+
+from testprj._sdk import last_user_text
+from testprj.preclassifier import KeywordAutomaton
+
+_WORD = re.compile(r"[^\W\d_]+")
+
+# Frequent function words and greetings. A word shared by several languages ("de", "la", "me")
+# splits its vote between them, so it adds evidence without tipping the balance.
+STOPWORDS: dict[str, frozenset[str]] = {
+    "en": frozenset(
+        "the and is are was were be have has do does did what which who how why when where this that these "
+        "those you your i my me we our it its of to in on for with from at by not can could would should "
+        "will please thanks thank hello hi hey there about tell explain".split()
+    ),
+    "es": frozenset(
+        "el la los las un una unos unas y es son está están estás fue ser tener tengo tiene qué que cómo "
+        "como cuál quién dónde cuándo por para con sin de del al en mi mis tu tus su yo tú usted me te se "
+        "no sí pero muy hola gracias favor buenos buenas días quiero puedes puede necesito ayuda".split()
+    ),
+    "fr": frozenset(
+        "le la les un une des et est sont était être avoir ai as a ont que qui quoi comment pourquoi où "
+        "quand pour avec sans de du au aux en dans mon ma mes ton ta tes son sa ses je tu il elle nous "
+        "vous ne pas mais très bonjour salut merci plaît voudrais veux peux pouvez besoin aide ça".split()
+    ),
+}
+# Characters that (almost) only occur in one of the languages above; each one counts as evidence.
+MARKERS: dict[str, str] = {
+    "ñ": "es", "¿": "es", "¡": "es",
+    "ç": "fr", "œ": "fr", "è": "fr", "ê": "fr", "à": "fr", "ù": "fr",
+}
+
+
+class LanguageID:
+    """Stopword / marker-character language scores; a few microseconds per message."""
+
+    def __init__(self, stopwords: dict[str, Iterable[str]] | None = None, markers: dict[str, str] | None = None):
+        languages: dict[str, list[str]] = {}
+        for lang, words in (stopwords or STOPWORDS).items():
+            for word in words:
+                languages.setdefault(word, []).append(lang)
+        self.votes = {word: [(lang, 1 / len(langs)) for lang in langs] for word, langs in languages.items()}
+        self.markers = MARKERS if markers is None else markers
+
+    def scores(self, text: str) -> Counter[str]:
+        lowered = text.lower()
+        scores: Counter[str] = Counter()
+        for word in _WORD.findall(lowered):
+            for lang, vote in self.votes.get(word, ()):
+                scores[lang] += vote
+        for char, lang in self.markers.items():
+            if char in lowered:
+                scores[lang] += 1
+        return scores
+
+    def detect(self, text: str) -> tuple[str | None, float, float]:
+        """(language, share of all evidence, evidence); (None, 0.0, 0.0) without any evidence."""
+        scores = self.scores(text)
+        if not scores:
+            return None, 0.0, 0.0
+        lang, best = scores.most_common(1)[0]
+        return lang, best / sum(scores.values()), best
+
+
+@dataclass
+class Route:
+    agent: Agent[Any]
+    keywords: list[str] = field(default_factory=list)
+    languages: list[str] = field(default_factory=list)
+    patterns: list[str] = field(default_factory=list)  # raw regex alternatives, like KeywordAutomaton's
+
+
+@dataclass
+class RouteDecision:
+    agent: Agent[Any]
+    stage: str  # "keyword" | "language"
+    confidence: float
+    matched: list[str] = field(default_factory=list)
+
+
+class PreRouter:
+    def __init__(
+        self,
+        routes: list[Route],
+        fallback: Agent[Any],
+        threshold: float = 0.75,
+        min_evidence: float = 2.0,
+        language_id: LanguageID | None = None,
+        defer: Iterable[str] = (),
+    ):
+        self.routes = routes
+        self.fallback = fallback
+        self.threshold = threshold
+        self.min_evidence = min_evidence
+        self.language_id = language_id or LanguageID()
+        self._defer = KeywordAutomaton(patterns=defer)  # always a triage decision
+        self._term_routes: dict[str, set[int]] = {}
+        for index, route in enumerate(routes):
+            for term in route.keywords:
+                self._term_routes.setdefault(term.strip().lower(), set()).add(index)
+        self._keywords = KeywordAutomaton(self._term_routes)
+        self._patterns = [(index, KeywordAutomaton(patterns=route.patterns)) for index, route in enumerate(routes)
+                          if route.patterns]
+        self._language_routes: dict[str, list[int]] = {}
+        for index, route in enumerate(routes):
+            for lang in route.languages:
+                self._language_routes.setdefault(lang, []).append(index)
+        self.counts = {"keyword": 0, "language": 0, "triage": 0}
+
+    def decide(self, text: str) -> RouteDecision | None:
+        """Pick a route locally, or return None to go through the triage agent."""
+        if self._defer.find(text):
+            return None
+        hits: dict[int, list[str]] = {}
+        for term in self._keywords.find(text):
+            for index in self._term_routes.get(term, ()):
+                hits.setdefault(index, []).append(term)
+        for index, automaton in self._patterns:
+            matched = automaton.find(text)
+            if matched:
+                hits.setdefault(index, []).extend(matched)
+        if len(hits) == 1:
+            (index, matched), = hits.items()
+            return RouteDecision(self.routes[index].agent, "keyword", 1.0, matched)
+        if hits:
+            return None  # keywords of several routes: a real triage decision
+        lang, confidence, evidence = self.language_id.detect(text)
+        candidates = self._language_routes.get(lang, []) if lang else []
+        if len(candidates) == 1 and confidence >= self.threshold and evidence >= self.min_evidence:
+            return RouteDecision(self.routes[candidates[0]].agent, "language", confidence, [lang])
+        return None
+
+    def select(self, input: str | list[TResponseInputItem]) -> Agent[Any]:
+        """The agent to start the run on: a routed target, or the fallback (triage) agent."""
+        decision = self.decide(last_user_text(input))
+        self.counts[decision.stage if decision else "triage"] += 1
+        return decision.agent if decision else self.fallback
+
+    def stats(self) -> dict[str, float]:
+        total = sum(self.counts.values())
+        saved = self.counts["keyword"] + self.counts["language"]
+        return {**self.counts, "triage_calls_saved": saved, "saved_rate": saved / total if total else 0.0}
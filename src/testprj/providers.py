@@ -0,0 +1,240 @@
+"""
+Shared provider registry.
+
+Every example used to build its own `AsyncOpenAI(...)` + `OpenAIChatCompletionsModel(...)` at
+import time, so loading several flows into one worker meant one HTTP connection pool (and one
+set of TLS handshakes / idle sockets) per module. This module keeps ONE lazily created,
+keep-alive client per base_url and hands out models bound to it. Connections belong to the event
+loop that opened them, so each client keeps one pool per running loop: scripts that call
+`asyncio.run` several times get a fresh pool on every new loop instead of a dead one.
+
+Usage:
+    from testprj.providers import get_model
+
+    model = get_model("gemini-1.5-flash")                    # Gemini (default provider)
+    model = get_model("llama3.2:latest", provider="ollama")  # local Ollama
+
+Pool limits can be tuned with `configure(...)` (before the first client is created) or with
+environment variables:
+    PROVIDER_MAX_CONNECTIONS, PROVIDER_MAX_KEEPALIVE, PROVIDER_KEEPALIVE_EXPIRY,
+    PROVIDER_TIMEOUT, PROVIDER_HTTP2
+Base URLs can be overridden per provider with GEMINI_BASE_URL / OLLAMA_BASE_URL
+(handy for pointing every flow at the local stand-in server in `testprj.benchmarks`).
+Set AGENT_CASSETTE (+ AGENT_CASSETTE_MODE, AGENT_CASSETTE_LATENCY) to record or replay every
+model call through `testprj.cassette`.
+
+Models are `RegistryChatCompletionsModel`s: tool schemas are compiled and JSON-encoded once per
+tool set (`testprj.tool_registry`) and the shared clients splice the encoded bytes into each
+request body.
+"""
+
+import asyncio
+import contextvars
+import importlib.util
+import os
+import threading
+import weakref
+from dataclasses import dataclass, field, replace
+
+import httpx
+from agents import AsyncOpenAI, OpenAIChatCompletionsModel
+from dotenv import load_dotenv
+
+from testprj.cassette import Cassette, CassetteModel
+from testprj.tool_registry import RegistryChatCompletionsModel, encode_body
+
+load_dotenv()
+
+
+@dataclass(frozen=True)
+class Provider:
+    base_url: str
+    api_key_env: str | None = None  # env var holding the key (Gemini)
+    api_key: str | None = None  # static key for local endpoints (Ollama wants any non-empty value)
+
+
+@dataclass
+class PoolSettings:
+    max_connections: int = field(default_factory=lambda: int(os.getenv("PROVIDER_MAX_CONNECTIONS", "100")))
+    max_keepalive_connections: int = field(default_factory=lambda: int(os.getenv("PROVIDER_MAX_KEEPALIVE", "20")))
+    keepalive_expiry: float = field(default_factory=lambda: float(os.getenv("PROVIDER_KEEPALIVE_EXPIRY", "30")))
+    timeout: float = field(default_factory=lambda: float(os.getenv("PROVIDER_TIMEOUT", "60")))
+    # HTTP/2 needs the optional `h2` package (pip install "httpx[http2]"); we fall back to
+    # keep-alive HTTP/1.1 when it is not installed instead of failing at client creation.
+    http2: bool = field(default_factory=lambda: os.getenv("PROVIDER_HTTP2", "1") != "0")
+
+
+PROVIDERS: dict[str, Provider] = {
+    "gemini": Provider(
+        base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
+        api_key_env="GEMINI_API_KEY",
+    ),
+    "ollama": Provider(
+        base_url="http://localhost:11434/v1",
+        api_key="ollama",  # dummy value to satisfy SDK
+    ),
+}
+
+_settings = PoolSettings()
+_clients: dict[str, AsyncOpenAI] = {}  # keyed on base_url, so two providers on one host share a pool
+_models: dict[tuple[str, str], OpenAIChatCompletionsModel] = {}
+_cassettes: dict[str, Cassette] = {}
+_lock = threading.Lock()
+# set (via `response_collecting_context`) when a caller wants the HTTP responses it opens
+_response_sink: contextvars.ContextVar[list[httpx.Response] | None] = contextvars.ContextVar("response_sink", default=None)
+
+
+def configure(**overrides) -> PoolSettings:
+    """Override pool settings. Only affects clients created after the call."""
+    global _settings
+    _settings = replace(_settings, **overrides)
+    return _settings
+
+
+def register_provider(name: str, base_url: str, api_key: str | None = None, api_key_env: str | None = None) -> None:
+    """Add (or replace) a named provider, e.g. a second Ollama box or a test server."""
+    PROVIDERS[name] = Provider(base_url=base_url, api_key=api_key, api_key_env=api_key_env)
+
+
+def _base_url(name: str) -> str:
+    return os.getenv(f"{name.upper()}_BASE_URL", PROVIDERS[name].base_url)
+
+
+async def _collect_response(response: httpx.Response) -> None:
+    sink = _response_sink.get()
+    if sink is not None:
+        sink.append(response)
+
+
+def response_collecting_context(sink: list[httpx.Response]) -> contextvars.Context:
+    """A copy of the current context in which every response of the shared clients is appended to `sink`.
+
+    Run a task in it (`asyncio.create_task(coro, context=...)`) to be able to close the responses that
+    task opened - e.g. to stop a streamed generation the SDK would otherwise keep reading (or leave
+    half-read in the pool) after we lost interest in it.
+    """
+    context = contextvars.copy_context()
+    context.run(_response_sink.set, sink)
+    return context
+
+
+class PooledClient(httpx.AsyncClient):
+    """Builds requests here and sends them through a connection pool of the running event loop.
+
+    An httpx pool belongs to the loop that opened its connections: reused after that loop closed
+    (the next `asyncio.run`), every request first fails with "Event loop is closed" and only
+    succeeds after the client's retry backoff. Pools of closed loops are dropped.
+
+    `settings` default to the module's pool settings; other keyword arguments (e.g. `transport`)
+    are passed on to the httpx client of every pool.
+    """
+
+    def __init__(self, settings: PoolSettings | None = None, **pool_kwargs):
+        settings = settings or _settings
+        super().__init__(timeout=_timeout(settings))  # the SDK takes its default request timeout from here
+        self._settings = settings
+        self._pool_kwargs = pool_kwargs
+        self._pools: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = weakref.WeakKeyDictionary()
+        self._pools_lock = threading.Lock()  # LoopRunner's loop thread and the main thread can share a client
+
+    def build_request(self, method, url, *, json=None, **kwargs) -> httpx.Request:
+        content = encode_body(json)
+        if content is not None:  # a body with pre-encoded tools from the registry
+            return super().build_request(method, url, content=content, **kwargs)
+        return super().build_request(method, url, json=json, **kwargs)
+
+    def _pool(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is not None:
+            return pool
+        with self._pools_lock:
+            for closed in [other for other in self._pools if other.is_closed()]:
+                del self._pools[closed]  # its sockets cannot be closed any more; let them be collected
+            return self._pools.setdefault(loop, _http_client(self._settings, **self._pool_kwargs))
+
+    async def send(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        return await self._pool().send(request, **kwargs)
+
+    async def aclose(self) -> None:
+        # pools of other loops can only be closed on their own loop; they are dropped with it
+        with self._pools_lock:
+            pool = self._pools.pop(asyncio.get_running_loop(), None)
+            self._pools.clear()
+        if pool is not None:
+            await pool.aclose()
+        await super().aclose()
+
+
+def _http_client(settings: PoolSettings, **overrides) -> httpx.AsyncClient:
+    options = dict(
+        event_hooks={"response": [_collect_response]},
+        http2=settings.http2 and importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_keepalive_connections,
+            keepalive_expiry=settings.keepalive_expiry,
+        ),
+        timeout=_timeout(settings),
+    )
+    return httpx.AsyncClient(**{**options, **overrides})
+
+
+def _timeout(settings: PoolSettings) -> httpx.Timeout:
+    return httpx.Timeout(settings.timeout, connect=min(settings.timeout, 10.0))
+
+
+def get_client(provider: str = "gemini") -> AsyncOpenAI:
+    """Return the shared client for `provider`, creating it on first use."""
+    if provider not in PROVIDERS:
+        raise KeyError(f"Unknown provider {provider!r}, known: {sorted(PROVIDERS)}")
+    base_url = _base_url(provider)
+    client = _clients.get(base_url)
+    if client is not None:
+        return client
+    with _lock:
+        if base_url not in _clients:
+            config = PROVIDERS[provider]
+            api_key = os.getenv(config.api_key_env) if config.api_key_env else config.api_key
+            _clients[base_url] = AsyncOpenAI(
+                api_key=api_key or "missing-api-key",
+                base_url=base_url,
+                http_client=PooledClient(_settings),
+            )
+        return _clients[base_url]
+
+
+def get_model(model: str, provider: str = "gemini") -> OpenAIChatCompletionsModel:
+    """Return a chat-completions model bound to the shared client of `provider`."""
+    key = (_base_url(provider), model)
+    cached = _models.get(key)
+    if cached is not None:
+        return cached
+    client = get_client(provider)
+    with _lock:
+        return _models.setdefault(key, _new_model(model, client))
+
+
+def _new_model(model: str, client: AsyncOpenAI) -> OpenAIChatCompletionsModel:
+    cassette_path = os.getenv("AGENT_CASSETTE")
+    if not cassette_path:
+        return RegistryChatCompletionsModel(model=model, openai_client=client)
+    # cassette keys hash the tools the SDK passes, so cassette models keep the plain request path
+    if cassette_path not in _cassettes:
+        _cassettes[cassette_path] = Cassette(cassette_path, mode=os.getenv("AGENT_CASSETTE_MODE", "replay"))
+    return CassetteModel(
+        model,
+        _cassettes[cassette_path],
+        openai_client=client,
+        latency_scale=float(os.getenv("AGENT_CASSETTE_LATENCY", "0")),
+    )
+
+
+async def aclose() -> None:
+    """Close every pooled client (call on worker shutdown)."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+        _models.clear()
+    for client in clients:
+        await client.close()
@@ -0,0 +1,222 @@
+"""
+Exact-match response cache for deterministic agent calls.
+
+Guardrail agents and checkers are asked the very same question over and over (the same short
+user messages reach the input guardrail again and again, the outline checker re-judges the same
+outline). The key covers the whole input, so a guardrail that is handed the growing history never
+repeats - give it the latest message only (as `PreClassifier.guard` does).
+`CachedModel` wraps any `Model` and answers a request it has already seen from cache instead of
+making another LLM round trip.
+
+The key is a canonical hash of everything that determines the answer: model name, system
+instructions, input items, tool / handoff schemas, output schema and model settings. Entries live
+in two tiers:
+    memory  - `TTLCache` (LRU + TTL), hits cost microseconds
+    sqlite  - optional file (`path=...` or RESPONSE_CACHE_PATH), survives restarts and is shared
+              between worker processes; hits are promoted to memory
+
+Usage (opt-in, per agent):
+    from testprj.response_cache import cached
+
+    guardrail_agent = Agent(..., model=cached(model))
+
+Only `get_response` is cached; streamed calls always go to the wrapped model. A cached answer is
+returned with zero usage (no tokens were spent) and no response_id.
+"""
+
+import asyncio
+import dataclasses
+import hashlib
+import json
+import os
+from collections.abc import AsyncIterator
+from typing import Any
+
+from agents import (
+    AgentOutputSchemaBase,
+    Handoff,
+    Model,
+    ModelResponse,
+    ModelSettings,
+    ModelTracing,
+    Tool,
+    TResponseInputItem,
+    Usage,
+)
+from agents.items import TResponseOutputItem, TResponseStreamEvent
+from pydantic import TypeAdapter
+
+from testprj._sdk import tool_schema
+from testprj.caching import SingleFlight, SqliteCache, TTLCache
+
+_output_items = TypeAdapter(list[TResponseOutputItem])
+
+
+def response_key(
+    model: str,
+    system_instructions: str | None,
+    input: str | list[TResponseInputItem],
+    model_settings: ModelSettings,
+    tools: list[Tool],
+    output_schema: AgentOutputSchemaBase | None,
+    handoffs: list[Handoff],
+    previous_response_id: str | None = None,
+    prompt: Any = None,
+) -> str:
+    """Canonical hash of a model request (dict-order-insensitive)."""
+    canonical = {
+        "model": model,
+        "instructions": system_instructions,
+        "input": input,
+        "settings": model_settings.to_json_dict(),
+        "tools": [tool_schema(tool) for tool in tools],
+        "handoffs": [
+            {"name": h.tool_name, "description": h.tool_description, "parameters": h.input_json_schema}
+            for h in handoffs
+        ],
+        "output": None
+        if output_schema is None or output_schema.is_plain_text()
+        else {"name": output_schema.name(), "schema": output_schema.json_schema()},
+        "previous_response_id": previous_response_id,
+        "prompt": prompt,
+    }
+    blob = json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float | None = 3600.0,
+        path: str | os.PathLike | None = None,
+        max_rows: int = 10_000,
+    ):
+        self.ttl = ttl
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.disk = SqliteCache(os.fspath(path), max_rows, table="response_cache") if path else None
+        self.inflight = SingleFlight()  # identical concurrent requests share one model call
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> list[TResponseOutputItem] | None:
+        output = self.memory.get(key)
+        if output is not None:
+            self.memory_hits += 1
+            return output
+        if self.disk is not None:
+            blob = await asyncio.to_thread(self.disk.get, key)
+            if blob is not None:
+                output = _output_items.validate_json(blob)
+                self.memory.set(key, output)
+                self.disk_hits += 1
+                return output
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, output: list[TResponseOutputItem]) -> None:
+        self.memory.set(key, output)
+        if self.disk is not None:
+            blob = _output_items.dump_json(output, exclude_unset=True).decode()
+            await asyncio.to_thread(self.disk.set, key, blob, self.ttl)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> dict[str, float]:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_size": len(self.memory),
+            "disk_size": len(self.disk) if self.disk is not None else 0,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "coalesced": self.inflight.coalesced,
+            "evictions": self.memory.evictions,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+
+class CachedModel(Model):
+    """A `Model` that serves repeated identical requests from a `ResponseCache`."""
+
+    def __init__(self, model: Model, cache: ResponseCache | None = None):
+        self.model = model
+        self.cache = cache if cache is not None else default_cache()
+        self.model_name = str(getattr(model, "model", type(model).__name__))
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        prompt: Any | None,
+    ) -> ModelResponse:
+        key = response_key(
+            self.model_name, system_instructions, input, model_settings, tools, output_schema, handoffs,
+            previous_response_id, prompt,
+        )
+        output = await self.cache.get(key)
+        if output is not None:
+            return ModelResponse(output=list(output), usage=Usage(), response_id=None)
+
+        async def call() -> ModelResponse:
+            response = await self.model.get_response(
+                system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+                previous_response_id=previous_response_id, prompt=prompt,
+            )
+            await self.cache.set(key, list(response.output))
+            return response
+
+        response = await self.cache.inflight.do(key, call)
+        # coalesced callers get their own copy (usage is accounted once, by the caller that paid)
+        return dataclasses.replace(response, output=list(response.output))
+
+    def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        prompt: Any | None,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        return self.model.stream_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id, prompt=prompt,
+        )
+
+
+_default_cache: ResponseCache | None = None
+
+
+def default_cache() -> ResponseCache:
+    """Process-wide cache; RESPONSE_CACHE_PATH adds the SQLite tier, RESPONSE_CACHE_TTL sets the TTL."""
+    global _default_cache
+    if _default_cache is None:
+        ttl = os.getenv("RESPONSE_CACHE_TTL", "3600")
+        _default_cache = ResponseCache(
+            maxsize=int(os.getenv("RESPONSE_CACHE_SIZE", "1024")),
+            ttl=None if ttl.lower() == "none" else float(ttl),
+            path=os.getenv("RESPONSE_CACHE_PATH") or None,
+        )
+    return _default_cache
+
+
+def cached(model: Model, cache: ResponseCache | None = None) -> CachedModel:
+    """Wrap `model` so identical requests are answered from `cache` (the shared default cache if omitted)."""
+    return CachedModel(model, cache)
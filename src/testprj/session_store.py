@@ -0,0 +1,247 @@
+"""
+SQLite session store tuned for many concurrent, long-running conversations.
+
+`SQLiteSession` opens a connection per session object, commits one transaction per `add_items`
+call, and its tail read (`get_items(limit=N)`) sorts the session's rows by timestamp. With
+thousands of live sessions the commits (one fsync each) become the bottleneck. Here one
+`SessionStore` (one database file) serves every session:
+
+- WAL mode with `synchronous=NORMAL`: readers never block the writer or each other;
+- ONE writer task: `add_items` / `pop_item` / `clear_session` calls from all sessions are queued
+  and applied in batches, one transaction per batch (up to `batch_max` operations), so 500
+  concurrent appends cost one commit instead of 500. Each call returns once its batch committed;
+- items are keyed by (session_id, seq) in a WITHOUT ROWID table - the primary key is the
+  clustered, covering index - so `get_items(limit=N)` reads the last N entries of one index range
+  backwards instead of sorting the session's history;
+- reads run in worker threads, each with its own read connection.
+
+    store = SessionStore("sessions.db")
+    session = store.session("conversation_123")   # a drop-in for SQLiteSession(...)
+    result = await Runner.run(agent, "Hello", session=session)
+    ...
+    await store.aclose()
+
+`":memory:"` works too (one shared connection, reads and writes serialized).
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from agents import TResponseInputItem
+from agents.memory.session import SessionABC
+
+from testprj.caching import TTLCache
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS session_items (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID
+"""
+
+
+@dataclass
+class _Op:
+    kind: str  # "add" | "pop" | "clear" | "barrier"
+    session_id: str
+    items: list[str] = field(default_factory=list)  # serialized items for "add"
+    future: asyncio.Future | None = None
+
+
+class SessionStore:
+    def __init__(self, db_path: str | Path = "sessions.db", batch_max: int = 512):
+        self.db_path = str(db_path)
+        self.batch_max = batch_max
+        self._is_memory_db = self.db_path == ":memory:"
+        self._writer_conn = self._connect()
+        self._writer_conn.execute(_SCHEMA)
+        self._writer_conn.commit()
+        self._memory_lock = threading.Lock()  # only for ":memory:", where readers share the writer's connection
+        self._local = threading.local()
+        self._readers: list[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._next_seq = TTLCache(maxsize=100_000, ttl=None)  # session_id -> next seq; only the writer touches it
+        self._queue: asyncio.Queue[_Op] | None = None
+        self._writer: asyncio.Task | None = None
+        self.batches = 0
+        self.operations = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        if not self._is_memory_db:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # WAL stays consistent; only the last commits may be lost on power loss
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        if self._is_memory_db:
+            return self._writer_conn
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = self._local.connection = self._connect()
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    def session(self, session_id: str) -> "StoreSession":
+        return StoreSession(session_id, self)
+
+    # -- reads ---------------------------------------------------------------------------------
+
+    def _get_items_sync(self, session_id: str, limit: int | None) -> list[str]:
+        if limit is None:
+            sql, params = "SELECT data FROM session_items WHERE session_id = ? ORDER BY seq", (session_id,)
+        else:
+            # walks the primary-key range backwards and stops after `limit` entries
+            sql = "SELECT data FROM session_items WHERE session_id = ? ORDER BY seq DESC LIMIT ?"
+            params = (session_id, limit)
+        if self._is_memory_db:
+            with self._memory_lock:
+                rows = self._writer_conn.execute(sql, params).fetchall()
+        else:
+            rows = self._reader().execute(sql, params).fetchall()
+        data = [row[0] for row in rows]
+        return data if limit is None else data[::-1]
+
+    async def get_items(self, session_id: str, limit: int | None = None) -> list[TResponseInputItem]:
+        items = []
+        for data in await asyncio.to_thread(self._get_items_sync, session_id, limit):
+            try:
+                items.append(json.loads(data))
+            except json.JSONDecodeError:
+                continue  # skip corrupted entries, like SQLiteSession
+        return items
+
+    # -- writes --------------------------------------------------------------------------------
+
+    async def _submit(self, op: _Op) -> Any:
+        if self._writer is None or self._writer.done():
+            self._queue = asyncio.Queue()
+            self._writer = asyncio.create_task(self._write_loop())
+        op.future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(op)
+        return await op.future
+
+    async def _write_loop(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_max and not self._queue.empty():
+                batch.append(self._queue.get_nowait())  # everything queued meanwhile joins this transaction
+            try:
+                results = await asyncio.to_thread(self._apply_sync, batch)
+            except Exception as exc:
+                for op in batch:
+                    if not op.future.done():
+                        op.future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.operations += len(batch)
+            for op, result in zip(batch, results):
+                if not op.future.done():
+                    op.future.set_result(result)
+
+    def _seq(self, conn: sqlite3.Connection, session_id: str) -> int:
+        seq = self._next_seq.get(session_id)
+        if seq is None:
+            row = conn.execute("SELECT MAX(seq) FROM session_items WHERE session_id = ?", (session_id,)).fetchone()
+            seq = 0 if row[0] is None else row[0] + 1
+        return seq
+
+    def _apply_sync(self, batch: list[_Op]) -> list[Any]:
+        conn = self._writer_conn
+        results: list[Any] = []
+        with self._memory_lock if self._is_memory_db else nullcontext():
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for op in batch:
+                    results.append(getattr(self, f"_{op.kind}")(conn, op))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                self._next_seq.clear()  # cached counters may be ahead of what was rolled back
+                raise
+        return results
+
+    def _add(self, conn: sqlite3.Connection, op: _Op) -> None:
+        seq = self._seq(conn, op.session_id)
+        conn.executemany(
+            "INSERT INTO session_items (session_id, seq, data) VALUES (?, ?, ?)",
+            [(op.session_id, seq + i, data) for i, data in enumerate(op.items)],
+        )
+        self._next_seq.set(op.session_id, seq + len(op.items))
+
+    def _pop(self, conn: sqlite3.Connection, op: _Op) -> TResponseInputItem | None:
+        row = conn.execute(
+            "DELETE FROM session_items WHERE session_id = ? AND seq = "
+            "(SELECT MAX(seq) FROM session_items WHERE session_id = ?) RETURNING data",
+            (op.session_id, op.session_id),
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            return json.loads(row[0])
+        except json.JSONDecodeError:
+            return None
+
+    def _clear(self, conn: sqlite3.Connection, op: _Op) -> None:
+        conn.execute("DELETE FROM session_items WHERE session_id = ?", (op.session_id,))
+        self._next_seq.set(op.session_id, 0)
+
+    def _barrier(self, conn: sqlite3.Connection, op: _Op) -> None:
+        pass
+
+    async def add_items(self, session_id: str, items: list[TResponseInputItem]) -> None:
+        if items:
+            await self._submit(_Op("add", session_id, [json.dumps(item) for item in items]))
+
+    async def pop_item(self, session_id: str) -> TResponseInputItem | None:
+        return await self._submit(_Op("pop", session_id))
+
+    async def clear_session(self, session_id: str) -> None:
+        await self._submit(_Op("clear", session_id))
+
+    async def aclose(self) -> None:
+        """Wait for queued writes, stop the writer and close every connection."""
+        if self._writer is not None and not self._writer.done():
+            await self._submit(_Op("barrier", ""))  # returns once everything queued before it committed
+            self._writer.cancel()
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+        self._writer_conn.close()
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "batches": self.batches,
+            "operations": self.operations,
+            "ops_per_batch": self.operations / self.batches if self.batches else 0.0,
+        }
+
+
+class StoreSession(SessionABC):
+    """One conversation in a `SessionStore`; implements the SDK's `Session` protocol."""
+
+    def __init__(self, session_id: str, store: SessionStore):
+        self.session_id = session_id
+        self.store = store
+
+    async def get_items(self, limit: int | None = None) -> list[TResponseInputItem]:
+        return await self.store.get_items(self.session_id, limit)
+
+    async def add_items(self, items: list[TResponseInputItem]) -> None:
+        await self.store.add_items(self.session_id, items)
+
+    async def pop_item(self) -> TResponseInputItem | None:
+        return await self.store.pop_item(self.session_id)
+
+    async def clear_session(self) -> None:
+        await self.store.clear_session(self.session_id)
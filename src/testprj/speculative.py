@@ -0,0 +1,238 @@
+"""
+Speculative execution: start the agent's first model call together with its input guardrails.
+
+With `Runner.run` the guardrails and the first turn already overlap, but a tripwire does not
+stop the model request (it runs to completion and is thrown away), and with `Runner.run_streamed`
+the first tokens reach the caller before the guardrails have passed. Here:
+
+- the first model call starts at the same moment as every input guardrail;
+- its response is held back - no tool runs, no streamed event is released - until ALL guardrails
+  have passed (a gate around the agent's model);
+- as soon as any guardrail trips, the in-flight run (and the HTTP request under it) is cancelled
+  and `InputGuardrailTripwireTriggered` is raised.
+
+Time to first token becomes max(guardrails, model) instead of their sum.
+
+Usage:
+    from testprj.speculative import run_speculative, run_speculative_streamed
+
+    result = await run_speculative(agent, "Hello")             # drop-in for Runner.run
+    result = run_speculative_streamed(agent, "Hello")          # drop-in for Runner.run_streamed
+    async for event in result.stream_events(): ...
+
+Guardrails come from `agent.input_guardrails` and `run_config.input_guardrails`, as with Runner.
+They see the `input` passed here (not the session history).
+"""
+
+import asyncio
+import dataclasses
+from collections.abc import AsyncIterator
+from typing import Any
+
+from agents import (
+    Agent,
+    AgentOutputSchemaBase,
+    Handoff,
+    InputGuardrail,
+    InputGuardrailResult,
+    InputGuardrailTripwireTriggered,
+    Model,
+    ModelResponse,
+    ModelSettings,
+    ModelTracing,
+    RunConfig,
+    RunContextWrapper,
+    Runner,
+    RunResult,
+    RunResultStreaming,
+    Tool,
+    TResponseInputItem,
+)
+from agents._run_impl import QueueCompleteSentinel
+from agents.items import TResponseStreamEvent
+
+from testprj._sdk import resolve_model
+
+_END = object()
+
+
+class GatedModel(Model):
+    """Starts calls right away but releases their output only once `gate` resolves."""
+
+    def __init__(self, model: Model, gate: asyncio.Future):
+        self.model = model
+        self.gate = gate
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        prompt: Any | None,
+    ) -> ModelResponse:
+        self._raise_if_aborted()
+        response = await self.model.get_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id, prompt=prompt,
+        )
+        await asyncio.shield(self.gate)  # hold the response (and the tool calls in it) until every guardrail passed
+        return response
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        prompt: Any | None,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        stream = self.model.stream_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id, prompt=prompt,
+        )
+        self._raise_if_aborted()
+        if self.gate.done():
+            async for event in stream:
+                yield event
+            return
+
+        # keep reading the model while the guardrails run, buffer, and flush once they pass
+        buffer: asyncio.Queue = asyncio.Queue()
+
+        async def pump() -> None:
+            try:
+                async for event in stream:
+                    buffer.put_nowait(event)
+            except Exception as exc:
+                buffer.put_nowait(exc)
+            buffer.put_nowait(_END)
+
+        pumping = asyncio.create_task(pump())
+        try:
+            await asyncio.shield(self.gate)
+            while (event := await buffer.get()) is not _END:
+                if isinstance(event, Exception):
+                    raise event
+                yield event
+        finally:
+            pumping.cancel()  # on abort this closes the HTTP stream
+
+    def _raise_if_aborted(self) -> None:
+        if self.gate.done() and (self.gate.cancelled() or self.gate.exception() is not None):
+            self.gate.result()
+
+
+def _prepare(
+    agent: Agent[Any], run_config: RunConfig | None, gate: asyncio.Future
+) -> tuple[Agent[Any], RunConfig, list[InputGuardrail[Any]]]:
+    run_config = run_config or RunConfig()
+    guardrails = agent.input_guardrails + (run_config.input_guardrails or [])
+    gated = GatedModel(resolve_model(agent, run_config), gate)
+    if run_config.model is not None:
+        # run_config.model applies to every agent of the run; after the gate opens it is a pass-through
+        run_config = dataclasses.replace(run_config, model=gated, input_guardrails=None)
+        agent = agent.clone(input_guardrails=[])
+    else:
+        run_config = dataclasses.replace(run_config, input_guardrails=None)
+        agent = agent.clone(model=gated, input_guardrails=[])
+    return agent, run_config, guardrails
+
+
+async def run_input_guardrails(
+    agent: Agent[Any],
+    guardrails: list[InputGuardrail[Any]],
+    input: str | list[TResponseInputItem],
+    context: Any,
+) -> list[InputGuardrailResult]:
+    """All guardrails concurrently; raises on the first tripwire (cancelling the rest)."""
+    wrapper = RunContextWrapper(context=context)
+    tasks = [asyncio.create_task(guardrail.run(agent, input, wrapper)) for guardrail in guardrails]
+    results = []
+    try:
+        for done in asyncio.as_completed(tasks):
+            result = await done
+            if result.output.tripwire_triggered:
+                raise InputGuardrailTripwireTriggered(result)
+            results.append(result)
+    finally:
+        for task in tasks:
+            task.cancel()
+    return results
+
+
+async def run_speculative(
+    starting_agent: Agent[Any],
+    input: str | list[TResponseInputItem],
+    *,
+    run_config: RunConfig | None = None,
+    context: Any = None,
+    **kwargs: Any,
+) -> RunResult:
+    """`Runner.run` with the first model call started alongside the input guardrails."""
+    gate = asyncio.get_running_loop().create_future()
+    agent, run_config, guardrails = _prepare(starting_agent, run_config, gate)
+    run = asyncio.create_task(Runner.run(agent, input, context=context, run_config=run_config, **kwargs))
+    try:
+        results = await run_input_guardrails(starting_agent, guardrails, input, context)
+    except BaseException:
+        run.cancel()  # a tripped (or failed) guardrail aborts the in-flight model request
+        gate.cancel()
+        raise
+    gate.set_result(True)
+    result = await run
+    result.input_guardrail_results = results
+    return result
+
+
+def run_speculative_streamed(
+    starting_agent: Agent[Any],
+    input: str | list[TResponseInputItem],
+    *,
+    run_config: RunConfig | None = None,
+    context: Any = None,
+    **kwargs: Any,
+) -> RunResultStreaming:
+    """`Runner.run_streamed` whose events are only released after every input guardrail passed."""
+    gate = asyncio.get_running_loop().create_future()
+    agent, run_config, guardrails = _prepare(starting_agent, run_config, gate)
+    streamed = Runner.run_streamed(agent, input, context=context, run_config=run_config, **kwargs)
+
+    def abort(exc: BaseException) -> None:
+        # the gated model raises this inside the run, which closes the in-flight model stream
+        gate.set_exception(exc)
+        gate.exception()  # retrieved here: the run may be cancelled before the model ever awaits the gate
+        streamed._event_queue.put_nowait(QueueCompleteSentinel())  # wake a consumer blocked on the next event
+
+    async def guard() -> None:
+        try:
+            results = await run_input_guardrails(starting_agent, guardrails, input, context)
+        except InputGuardrailTripwireTriggered as exc:
+            # the SDK's own path: stream_events() turns a tripped result on this queue into the exception
+            streamed._input_guardrail_queue.put_nowait(exc.guardrail_result)
+            abort(exc)
+            return
+        except Exception as exc:
+            # stored BEFORE the sentinel: stream_events() may stop on the sentinel before the run task
+            # has failed, and it only raises what it finds in _stored_exception
+            streamed._stored_exception = exc
+            abort(exc)
+            return
+        streamed.input_guardrail_results = results
+        gate.set_result(True)
+
+    # our own reference: the SDK replaces streamed._input_guardrails_task with its (empty) guardrail
+    # task on turn 1, so its cleanup never sees this one - cancel it with the run instead
+    guarding = asyncio.create_task(guard())
+    streamed._run_impl_task.add_done_callback(lambda _: guarding.cancel())
+    return streamed
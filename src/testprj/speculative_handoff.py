@@ -0,0 +1,356 @@
+"""
+Speculative warm start of the handoff target.
+
+When a triage agent hands off, the target's first model call only starts after the triage
+response has completed and the handoff has been processed - two model round trips back to back.
+`HandoffSpeculator` starts the target's first call early, on a prediction from `predict` (e.g. a
+lenient `PreRouter`) made before the triage call is even sent, so the two calls overlap
+completely.
+
+The handoff name in the triage stream is no trigger: a triage response that only hands off
+announces its `transfer_to_<agent>` call at the very end of the stream, which leaves nothing to
+overlap, and one that writes text first does not match the speculative call anyway.
+
+The speculative call is made with exactly what the target will be asked, minus the handoff
+plumbing: the triage conversation as input, and the target's instructions, tools, handoffs,
+output schema and model settings. When the Runner then makes the target's real first call, the
+call is compared with the speculative one after dropping the `transfer_to_<target>` call and its
+output from the input. A match takes over the speculative response (or stream); anything else -
+a different target, triage text before the handoff, other tool calls, other settings - discards
+it and calls the model as usual. Speculations nobody claims are cancelled (HTTP request
+included) once triage answered without that handoff, or after `ttl` seconds.
+
+    speculator = HandoffSpeculator(predict=lambda text: getattr(likely.decide(text), "agent", None))
+    triage = speculator.prepare(triage_agent)       # use it in place of triage_agent
+    result = Runner.run_streamed(triage, inputs)
+    speculator.stats()                              # {"started": 20, "hits": 17, "wasted": 3, "hit_rate": 0.85}
+
+Only handoffs given as `Agent`s (not `handoff(...)` objects) are warmed up, and only when the
+run does not override the model with `run_config.model`.
+"""
+
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+from agents import (
+    Agent,
+    AgentOutputSchemaBase,
+    Handoff,
+    Model,
+    ModelResponse,
+    ModelSettings,
+    ModelTracing,
+    RunConfig,
+    RunContextWrapper,
+    Tool,
+    TResponseInputItem,
+)
+from agents.items import TResponseStreamEvent
+from agents.run import AgentRunner
+
+from testprj._sdk import last_user_text, resolve_model
+from testprj.caching import TTLCache
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+def _plain(item: Any) -> Any:
+    return item.model_dump(exclude_unset=True) if hasattr(item, "model_dump") else item
+
+
+def _call_key(
+    system_instructions: str | None,
+    input: list[TResponseInputItem],
+    model_settings: ModelSettings,
+    tools: list[Tool],
+    output_schema: AgentOutputSchemaBase | None,
+    handoffs: list[Handoff],
+    previous_response_id: str | None,
+    prompt: Any | None,
+    streamed: bool,
+) -> str:
+    return json.dumps(
+        [
+            system_instructions,
+            [_plain(item) for item in input],
+            model_settings.to_json_dict(),
+            [(tool.name, getattr(tool, "params_json_schema", None)) for tool in tools],
+            output_schema.name() if output_schema else None,
+            [(h.tool_name, h.input_json_schema) for h in handoffs],
+            previous_response_id,
+            prompt,
+            streamed,
+        ],
+        sort_keys=True,
+        default=str,
+    )
+
+
+def _without_transfer(input: list[TResponseInputItem], tool_name: str) -> list[TResponseInputItem]:
+    """`input` minus the `tool_name` handoff call and its output (what the target saw in advance)."""
+    items = [_plain(item) for item in input]
+    call_ids = {item.get("call_id") for item in items
+                if isinstance(item, dict) and item.get("type") == "function_call" and item.get("name") == tool_name}
+    return [item for item in items
+            if not (isinstance(item, dict) and item.get("type") in ("function_call", "function_call_output")
+                    and item.get("call_id") in call_ids)]
+
+
+class _Speculation:
+    def __init__(self, key: str, task: asyncio.Task, events: asyncio.Queue | None):
+        self.key = key
+        self.task = task
+        self.events = events  # streamed speculations: the buffered stream events
+
+    def cancel(self) -> None:
+        self.task.cancel()
+
+
+class _WarmModel(Model):
+    """The target's model: takes over a matching speculative call, otherwise calls `model`."""
+
+    def __init__(self, model: Model, transfer_tool: str, speculator: "HandoffSpeculator"):
+        self.model = model
+        self.transfer_tool = transfer_tool  # the handoff call the Runner adds in front of the target's first call
+        self.speculator = speculator
+
+    def _claim(self, input, streamed: bool, *args) -> _Speculation | None:
+        key = _call_key(args[0], _without_transfer(input, self.transfer_tool), *args[1:], streamed)
+        return self.speculator._claim(key)
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        prompt: Any | None,
+    ) -> ModelResponse:
+        if isinstance(input, list):
+            speculation = self._claim(input, False, system_instructions, model_settings, tools, output_schema,
+                                      handoffs, previous_response_id, prompt)
+            if speculation is not None:
+                try:
+                    return await speculation.task
+                except Exception:
+                    logger.debug("speculative call failed; calling the model again", exc_info=True)
+        return await self.model.get_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id, prompt=prompt,
+        )
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        prompt: Any | None,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        speculation = None
+        if isinstance(input, list):
+            speculation = self._claim(input, True, system_instructions, model_settings, tools, output_schema,
+                                      handoffs, previous_response_id, prompt)
+        first = await speculation.events.get() if speculation is not None else None
+        if speculation is None or isinstance(first, Exception):
+            if first is not None:
+                logger.debug("speculative stream failed; calling the model again", exc_info=first)
+            async for event in self.model.stream_response(
+                system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+                previous_response_id=previous_response_id, prompt=prompt,
+            ):
+                yield event
+            return
+        try:
+            event = first
+            while event is not _END:
+                if isinstance(event, Exception):
+                    raise event
+                yield event
+                event = await speculation.events.get()
+        finally:
+            speculation.cancel()  # a consumer that stops early also stops the speculative stream
+
+
+class _WatchingModel(Model):
+    """The triage agent's model: starts the predicted target's speculation, discards it if triage went elsewhere."""
+
+    def __init__(self, model: Model, targets: dict[str, Agent[Any]], speculator: "HandoffSpeculator"):
+        self.model = model
+        self.targets = targets  # transfer tool name -> prepared target
+        self.speculator = speculator
+
+    def _predicted(self, input: str | list[TResponseInputItem]) -> str | None:
+        agent = self.speculator.predict(last_user_text(input))
+        name = Handoff.default_tool_name(agent) if agent is not None else None
+        return name if name in self.targets else None
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        prompt: Any | None,
+    ) -> ModelResponse:
+        started: dict[str, _Speculation] = {}
+        predicted = self._predicted(input)
+        if predicted and isinstance(input, list):
+            started[predicted] = await self.speculator._start(self.targets[predicted], input, streamed=False)
+        try:
+            response = await self.model.get_response(
+                system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+                previous_response_id=previous_response_id, prompt=prompt,
+            )
+        except BaseException:
+            self.speculator._discard(started.values())
+            raise
+        called = {getattr(item, "name", None) for item in response.output if getattr(item, "type", None) == "function_call"}
+        self.speculator._discard(s for name, s in started.items() if name not in called)
+        return response
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        prompt: Any | None,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        started: dict[str, _Speculation] = {}
+        called: set[str] = set()
+        predicted = self._predicted(input) if isinstance(input, list) else None
+        if predicted:
+            started[predicted] = await self.speculator._start(self.targets[predicted], input, streamed=True)
+        try:
+            async for event in self.model.stream_response(
+                system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+                previous_response_id=previous_response_id, prompt=prompt,
+            ):
+                item = getattr(event, "item", None)
+                if event.type == "response.output_item.added" and getattr(item, "type", None) == "function_call":
+                    called.add(item.name)
+                yield event
+        finally:
+            self.speculator._discard(s for name, s in started.items() if name not in called)
+
+
+class HandoffSpeculator:
+    def __init__(
+        self,
+        predict: Callable[[str], Agent[Any] | None],
+        context: Any = None,
+        ttl: float = 30.0,
+    ):
+        self.predict = predict  # last user message -> likely handoff target (or None)
+        self.context = context  # the run context, for dynamic instructions / tool enablement of targets
+        self.ttl = ttl
+        self._prepared: TTLCache = TTLCache(maxsize=256, ttl=None)  # id(triage) -> (triage, prepared clone)
+        self._pending: dict[str, _Speculation] = {}
+        self.counts = {"started": 0, "hits": 0, "wasted": 0}
+
+    def prepare(self, triage: Agent[Any]) -> Agent[Any]:
+        """A clone of `triage` whose handoff targets are warmed up speculatively."""
+        cached = self._prepared.get(id(triage))
+        if cached is not None and cached[0] is triage:
+            return cached[1]
+        config = RunConfig()
+        targets: dict[str, Agent[Any]] = {}
+        handoffs: list[Agent[Any] | Handoff] = []
+        for item in triage.handoffs:
+            if isinstance(item, Agent):
+                tool_name = Handoff.default_tool_name(item)
+                target = item.clone(model=_WarmModel(resolve_model(item, config), tool_name, self))
+                targets[tool_name] = target
+                handoffs.append(target)
+            else:
+                handoffs.append(item)
+        prepared = triage.clone(model=_WatchingModel(resolve_model(triage, config), targets, self), handoffs=handoffs)
+        self._prepared.set(id(triage), (triage, prepared))
+        return prepared
+
+    async def _start(self, target: Agent[Any], input: list[TResponseInputItem], streamed: bool) -> _Speculation | None:
+        wrapper = RunContextWrapper(context=self.context)
+        try:
+            system, prompt, tools, handoffs = await asyncio.gather(
+                target.get_system_prompt(wrapper), target.get_prompt(wrapper),
+                AgentRunner._get_all_tools(target, wrapper), AgentRunner._get_handoffs(target, wrapper),
+            )
+        except Exception:
+            logger.debug("cannot prepare a speculative call for %s", target.name, exc_info=True)
+            return None
+        settings = target.model_settings.resolve(None)
+        output_schema = AgentRunner._get_output_schema(target)
+        model: Model = target.model.model
+        input = [_plain(item) for item in input]
+        key = _call_key(system, input, settings, tools, output_schema, handoffs, None, prompt, streamed)
+        if key in self._pending:
+            return self._pending[key]
+        if streamed:
+            events: asyncio.Queue | None = asyncio.Queue()
+
+            async def call() -> None:
+                try:
+                    async for event in model.stream_response(system, input, settings, tools, output_schema, handoffs,
+                                                             ModelTracing.DISABLED, previous_response_id=None,
+                                                             prompt=prompt):
+                        events.put_nowait(event)
+                except Exception as exc:
+                    events.put_nowait(exc)
+                events.put_nowait(_END)
+        else:
+            events = None
+
+            async def call() -> ModelResponse:
+                return await model.get_response(system, input, settings, tools, output_schema, handoffs,
+                                                ModelTracing.DISABLED, previous_response_id=None, prompt=prompt)
+
+        task = asyncio.create_task(call())
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())  # failures surface on claim, if at all
+        speculation = _Speculation(key, task, events)
+        self._pending[key] = speculation
+        self.counts["started"] += 1
+        asyncio.get_running_loop().call_later(self.ttl, self._discard, [speculation])
+        return speculation
+
+    def _claim(self, key: str) -> _Speculation | None:
+        speculation = self._pending.pop(key, None)
+        if speculation is not None:
+            self.counts["hits"] += 1
+        return speculation
+
+    def _discard(self, speculations) -> None:
+        for speculation in speculations:
+            if speculation is not None and self._pending.get(speculation.key) is speculation:
+                del self._pending[speculation.key]
+                speculation.cancel()
+                self.counts["wasted"] += 1
+
+    def stats(self) -> dict[str, float]:
+        started = self.counts["started"]
+        return {**self.counts, "hit_rate": self.counts["hits"] / started if started else 0.0}
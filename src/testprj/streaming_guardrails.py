@@ -0,0 +1,342 @@
+"""
+Incremental output guardrails for `Runner.run_streamed`.
+
+SDK output guardrails only see the final output, so a response we are going to reject is still
+generated (and paid for) to the last token. A `StreamingOutputGuardrail` is evaluated WHILE the
+model streams: on a rolling window of the text so far and on the fields of the structured output
+that have already been parsed (tolerant partial-JSON parsing of e.g. `MessageOutput`). When one
+trips, the model stream is closed right away and `OutputGuardrailTripwireTriggered` is raised
+from `stream_events()`.
+
+    @streaming_output_guardrail(every=80)
+    def no_math(ctx, agent, partial: PartialOutput) -> GuardrailFunctionOutput:
+        return GuardrailFunctionOutput(output_info=None, tripwire_triggered="=" in partial.window)
+
+    result = run_streamed_guarded(agent, "Hello", [no_math])
+    async for event in result.stream_events(): ...
+
+Sync guardrail functions are checked inline every `every` new characters. Async ones (e.g. a
+guardrail agent) run in the background on the latest text - at most one evaluation in flight per
+guardrail - so they never slow the stream down. Every guardrail is checked once more on the
+complete text at the end of each model turn that produced a message (turns that only call tools
+or hand off are not checked). The agent's regular `output_guardrails` still run on the final
+output as usual. Only the starting agent's model is watched (not handoff targets) - unless
+`run_config.model` is set: it replaces every agent's model, so the guarded model does too and
+every agent's turns are watched (the guardrails still receive the starting agent).
+"""
+
+import asyncio
+import dataclasses
+import inspect
+import json
+import logging
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from agents import (
+    Agent,
+    AgentOutputSchemaBase,
+    Handoff,
+    Model,
+    ModelResponse,
+    ModelSettings,
+    ModelTracing,
+    OutputGuardrail,
+    OutputGuardrailResult,
+    OutputGuardrailTripwireTriggered,
+    RunConfig,
+    RunContextWrapper,
+    Runner,
+    RunResultStreaming,
+    Tool,
+    TResponseInputItem,
+)
+from agents.items import ItemHelpers, TResponseStreamEvent
+
+from testprj._sdk import resolve_model
+from testprj.providers import response_collecting_context
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+def _scan(text: str) -> tuple[list[str], bool, bool]:
+    """Closers still needed, whether we are inside a string, and whether the last char escapes."""
+    closers: list[str] = []
+    in_string = escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            closers.append("}" if char == "{" else "]")
+        elif char in "}]" and closers:
+            closers.pop()
+    return closers, in_string, escaped
+
+
+def parse_partial_json(text: str) -> dict[str, Any]:
+    """Best-effort parse of a JSON object that is still being streamed.
+
+    Closes the open string / containers and drops a trailing incomplete key or value, so
+    `{"reasoning": "abc", "resp` gives `{"reasoning": "abc"}` and `{"response": "Hel` gives
+    `{"response": "Hel"}`. Returns {} when nothing usable has arrived yet.
+    """
+    start = text.find("{")
+    if start < 0:
+        return {}
+    candidate = text[start:]
+    for _ in range(8):
+        closers, in_string, escaped = _scan(candidate)
+        if escaped:
+            candidate = candidate[:-1]
+        try:
+            value = json.loads(candidate + ('"' if in_string else "") + "".join(reversed(closers)))
+            return value if isinstance(value, dict) else {}
+        except json.JSONDecodeError:
+            # cut back to the previous separator (drops a half-written key or literal) and retry
+            cut = max(candidate.rfind(","), candidate.rfind("{"), candidate.rfind("["))
+            if cut < 0:
+                return {}
+            candidate = candidate[: cut + 1] if candidate[cut] in "{[" else candidate[:cut]
+    return {}
+
+
+@dataclass
+class PartialOutput:
+    """What a streaming guardrail sees: the output generated so far."""
+
+    text: str
+    window: str  # the last `window` characters of `text`
+    done: bool = False  # True on the final check, with the complete output
+    _fields: dict[str, Any] | None = field(default=None, repr=False)
+
+    @property
+    def fields(self) -> dict[str, Any]:
+        """Fields of a structured output parsed so far (the last one may be cut short)."""
+        if self._fields is None:
+            self._fields = parse_partial_json(self.text)
+        return self._fields
+
+
+@dataclass
+class StreamingOutputGuardrail(OutputGuardrail[Any]):
+    """An output guardrail whose function receives a `PartialOutput` while the model streams."""
+
+    every: int = 64  # characters of new text between two checks
+    window: int = 400  # characters of trailing text exposed as `partial.window`
+
+
+def streaming_output_guardrail(
+    func: Callable | None = None, *, name: str | None = None, every: int = 64, window: int = 400
+):
+    """Decorator turning `(ctx, agent, partial) -> GuardrailFunctionOutput` into a `StreamingOutputGuardrail`."""
+
+    def decorator(f: Callable) -> StreamingOutputGuardrail:
+        return StreamingOutputGuardrail(guardrail_function=f, name=name or f.__name__, every=every, window=window)
+
+    return decorator(func) if func is not None else decorator
+
+
+class _Monitor:
+    """Feeds streamed text to the guardrails and reports the first trip through `on_trip`."""
+
+    def __init__(
+        self,
+        guardrails: list[StreamingOutputGuardrail],
+        agent: Agent[Any],
+        context: RunContextWrapper[Any],
+        on_trip: Callable[[OutputGuardrailTripwireTriggered], None],
+    ):
+        self.guardrails = guardrails
+        self.agent = agent
+        self.context = context
+        self.on_trip = on_trip
+        self.parts: list[str] = []
+        self.length = 0
+        self.checked_at = {id(g): 0 for g in guardrails}
+        self.inflight: dict[int, asyncio.Task] = {}
+        self.tripped: OutputGuardrailTripwireTriggered | None = None
+
+    def _partial(self, guardrail: StreamingOutputGuardrail, done: bool = False) -> PartialOutput:
+        text = "".join(self.parts)
+        self.parts = [text]
+        return PartialOutput(text=text, window=text[-guardrail.window:], done=done)
+
+    def _verdict(self, result: OutputGuardrailResult) -> None:
+        if result.output.tripwire_triggered and self.tripped is None:
+            self.tripped = OutputGuardrailTripwireTriggered(result)
+            self.on_trip(self.tripped)
+
+    def feed(self, delta: str) -> None:
+        self.parts.append(delta)
+        self.length += len(delta)
+        for guardrail in self.guardrails:
+            key = id(guardrail)
+            if self.tripped or self.length - self.checked_at[key] < guardrail.every:
+                continue
+            if inspect.iscoroutinefunction(guardrail.guardrail_function):
+                if key in self.inflight:
+                    continue  # latest-wins: the next check starts when this one is done
+                self.checked_at[key] = self.length
+                task = asyncio.create_task(guardrail.run(self.context, self.agent, self._partial(guardrail)))
+                self.inflight[key] = task
+                task.add_done_callback(lambda t, key=key: self._background_done(key, t))
+            else:
+                self.checked_at[key] = self.length
+                partial = self._partial(guardrail)
+                output = guardrail.guardrail_function(self.context, self.agent, partial)
+                self._verdict(OutputGuardrailResult(guardrail=guardrail, agent=self.agent, agent_output=partial, output=output))
+
+    def _background_done(self, key: int, task: asyncio.Task) -> None:
+        self.inflight.pop(key, None)
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            # not a pass: the next check (or the final one in finish(), which raises) decides
+            logger.warning("streaming output guardrail check failed", exc_info=task.exception())
+            self.checked_at[key] = 0
+            return
+        self._verdict(task.result())
+
+    async def finish(self) -> None:
+        """Final check of every guardrail on the complete output; raises on a trip."""
+        if self.tripped is None:
+            await asyncio.gather(*self.inflight.values(), return_exceptions=True)
+        if self.tripped is None:
+            for result in await asyncio.gather(
+                *(g.run(self.context, self.agent, self._partial(g, done=True)) for g in self.guardrails)
+            ):
+                self._verdict(result)
+        if self.tripped is not None:
+            raise self.tripped
+
+    def close(self) -> None:
+        for task in self.inflight.values():
+            task.cancel()
+
+
+class StreamGuardedModel(Model):
+    """Wraps a model so its streamed text is checked by `guardrails` as it is generated."""
+
+    def __init__(
+        self,
+        model: Model,
+        guardrails: list[StreamingOutputGuardrail],
+        agent: Agent[Any],
+        context: RunContextWrapper[Any],
+    ):
+        self.model = model
+        self.guardrails = guardrails
+        self.agent = agent
+        self.context = context
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        prompt: Any | None,
+    ) -> ModelResponse:
+        # nothing to interrupt without streaming; check the complete text once
+        response = await self.model.get_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id, prompt=prompt,
+        )
+        text = "".join(ItemHelpers.extract_last_text(item) or "" for item in response.output)
+        if text:
+            monitor = _Monitor(self.guardrails, self.agent, self.context, lambda exc: None)
+            monitor.parts = [text]
+            await monitor.finish()
+        return response
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        prompt: Any | None,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        stream = self.model.stream_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id, prompt=prompt,
+        )
+        events: asyncio.Queue = asyncio.Queue()
+
+        async def pump() -> None:
+            try:
+                async for event in stream:
+                    events.put_nowait(event)
+            except Exception as exc:
+                events.put_nowait(exc)
+            events.put_nowait(_END)
+
+        responses: list = []
+        pumping = asyncio.create_task(pump(), context=response_collecting_context(responses))
+
+        def on_trip(exc: OutputGuardrailTripwireTriggered) -> None:
+            events.put_nowait(exc)  # the reader below raises it; its finally closes the stream
+
+        monitor = _Monitor(self.guardrails, self.agent, self.context, on_trip)
+        try:
+            while (event := await events.get()) is not _END:
+                if isinstance(event, Exception):
+                    raise event
+                if getattr(event, "type", None) == "response.output_text.delta":
+                    monitor.feed(event.delta)
+                    if monitor.tripped is not None:
+                        raise monitor.tripped
+                yield event
+            if monitor.length:  # a tool-call or handoff turn has no text to check
+                await monitor.finish()
+        finally:
+            monitor.close()
+            # Close the connection BEFORE cancelling the reader: that is what makes the provider stop
+            # generating. (The SDK's stream generators never close it when abandoned, and a
+            # cancelled read can leave the pooled connection open and still streaming.)
+            await asyncio.gather(*(response.aclose() for response in responses), return_exceptions=True)
+            pumping.cancel()
+
+
+def run_streamed_guarded(
+    starting_agent: Agent[Any],
+    input: str | list[TResponseInputItem],
+    guardrails: list[StreamingOutputGuardrail],
+    *,
+    run_config: RunConfig | None = None,
+    context: Any = None,
+    **kwargs: Any,
+) -> RunResultStreaming:
+    """`Runner.run_streamed` with `guardrails` checked incrementally on the starting agent's output.
+
+    With `run_config.model` set, every agent of the run is watched (see the module docstring).
+    """
+    run_config = run_config or RunConfig()
+    wrapper = RunContextWrapper(context=context)
+    guarded = StreamGuardedModel(resolve_model(starting_agent, run_config), guardrails, starting_agent, wrapper)
+    if run_config.model is not None:
+        run_config = dataclasses.replace(run_config, model=guarded)
+        agent = starting_agent
+    else:
+        agent = starting_agent.clone(model=guarded)
+    return Runner.run_streamed(agent, input, context=context, run_config=run_config, **kwargs)
@@ -0,0 +1,299 @@
+"""
+Prompt-size accounting: how many tokens each run sends, and where they come from.
+
+Every model call carries the agent's instructions (static, or dynamic from a function such as
+`get_dynamic_instruction`), the JSON schema of every `@function_tool`, handoff schemas, the
+output schema and the whole input history (`to_input_list()`). `run_accounted` - a drop-in for
+`Runner.run` - estimates each of those components before every call, records the usage the
+provider actually reports, and attaches the result to the run:
+
+    result = await run_accounted(agent, "Hello", context=ctx)
+    result.token_accounting.by_agent()   # per agent: calls, instructions, tools, history, ... actual usage
+    result.token_accounting.by_tool()    # per tool: schema tokens sent, tokens of its results in the history
+
+`run_streamed_accounted` does the same for `Runner.run_streamed` (usage is read from the final
+response event).
+
+Counting uses `tiktoken` when it is installed (TOKENIZER_ENCODING, default o200k_base) and a fast
+regex approximation otherwise; both are memoized per string, so instructions, schemas and history
+items that are resent on every call are only counted once.
+"""
+
+import dataclasses
+import functools
+import json
+import os
+import re
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from agents import (
+    Agent,
+    AgentOutputSchemaBase,
+    Handoff,
+    Model,
+    ModelResponse,
+    ModelSettings,
+    ModelTracing,
+    RunConfig,
+    Runner,
+    RunResult,
+    RunResultStreaming,
+    Tool,
+    TResponseInputItem,
+)
+from agents.items import TResponseStreamEvent
+
+from testprj._sdk import resolve_model, tool_schema
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - tiktoken is an optional extra
+    tiktoken = None
+
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+COMPONENTS = ["instructions", "dynamic_instructions", "tools", "handoffs", "output_schema", "history", "tool_results"]
+
+
+def approx_tokens(text: str) -> int:
+    """Fast estimate: one token per word or symbol, plus one per extra 6 characters of long words."""
+    return sum(1 + (len(piece) - 1) // 6 for piece in _PIECES.findall(text))
+
+
+@functools.cache
+def _encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(os.getenv("TOKENIZER_ENCODING", "o200k_base"))
+    except Exception:  # unknown encoding, or its BPE file cannot be downloaded
+        return None
+
+
+@functools.lru_cache(maxsize=16384)
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return approx_tokens(text)
+
+
+def _json_tokens(value: Any) -> int:
+    return count_tokens(json.dumps(value, sort_keys=True, default=str))
+
+
+def item_tokens(item: Any) -> int:
+    """Tokens of one input item: its text content, plus a few for the message framing."""
+    item = item if isinstance(item, dict) else item.model_dump(exclude_unset=True)
+    kind = item.get("type", "message")
+    if kind == "function_call":
+        text = f"{item.get('name')}({item.get('arguments', '')})"
+    elif kind == "function_call_output":
+        text = str(item.get("output", ""))
+    else:
+        content = item.get("content", "")
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+        text = str(content)
+    return count_tokens(text) + 4
+
+
+@dataclass
+class CallRecord:
+    """One model call: estimated prompt tokens per component and the usage the provider reported."""
+
+    agent: str
+    estimated: dict[str, int]
+    tools: dict[str, dict[str, int]]  # tool name -> {"schema": n, "results": m}
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def estimated_total(self) -> int:
+        return sum(self.estimated.values())
+
+
+@dataclass
+class TokenAccountant:
+    records: list[CallRecord] = field(default_factory=list)
+
+    def estimate(
+        self,
+        agent: Agent[Any],
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        tools: list[Tool],
+        handoffs: list[Handoff],
+        output_schema: AgentOutputSchemaBase | None,
+    ) -> CallRecord:
+        estimated = dict.fromkeys(COMPONENTS, 0)
+        kind = "dynamic_instructions" if callable(agent.instructions) else "instructions"
+        estimated[kind] = count_tokens(system_instructions) if system_instructions else 0
+        per_tool: dict[str, dict[str, int]] = {}
+        for tool in tools:
+            schema = _json_tokens(tool_schema(tool))
+            per_tool[tool.name] = {"schema": schema, "results": 0}
+            estimated["tools"] += schema
+        estimated["handoffs"] = sum(
+            _json_tokens([h.tool_name, h.tool_description, h.input_json_schema]) for h in handoffs
+        )
+        if output_schema is not None and not output_schema.is_plain_text():
+            estimated["output_schema"] = _json_tokens(output_schema.json_schema())
+        if isinstance(input, str):
+            estimated["history"] = count_tokens(input)
+        else:
+            names = {}  # call_id -> tool name, to attribute results to the tool that produced them
+            for item in input:
+                item = item if isinstance(item, dict) else item.model_dump(exclude_unset=True)
+                tokens = item_tokens(item)
+                if item.get("type") == "function_call":
+                    names[item.get("call_id")] = item.get("name")
+                if item.get("type") == "function_call_output":
+                    estimated["tool_results"] += tokens
+                    name = names.get(item.get("call_id"), "?")
+                    per_tool.setdefault(name, {"schema": 0, "results": 0})["results"] += tokens
+                else:
+                    estimated["history"] += tokens
+        record = CallRecord(agent.name, estimated, per_tool)
+        self.records.append(record)
+        return record
+
+    def by_agent(self) -> dict[str, dict[str, int]]:
+        totals: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for record in self.records:
+            row = totals[record.agent]
+            row["calls"] += 1
+            for component, tokens in record.estimated.items():
+                row[component] += tokens
+            row["estimated"] += record.estimated_total
+            row["input_tokens"] += record.input_tokens
+            row["output_tokens"] += record.output_tokens
+        return {agent: dict(row) for agent, row in totals.items()}
+
+    def by_tool(self) -> dict[str, dict[str, int]]:
+        totals: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for record in self.records:
+            for name, tokens in record.tools.items():
+                totals[name]["schema_tokens"] += tokens["schema"]
+                totals[name]["result_tokens"] += tokens["results"]
+                totals[name]["calls_listed"] += 1
+        return {name: dict(row) for name, row in sorted(totals.items(), key=lambda kv: -sum(kv[1].values()))}
+
+    def summary(self) -> dict[str, float]:
+        estimated = sum(record.estimated_total for record in self.records)
+        actual = sum(record.input_tokens for record in self.records)
+        return {
+            "calls": len(self.records),
+            "estimated_input_tokens": estimated,
+            "input_tokens": actual,
+            "output_tokens": sum(record.output_tokens for record in self.records),
+            "estimate_ratio": estimated / actual if actual else 0.0,  # > 1: the estimate is high
+        }
+
+
+class AccountingModel(Model):
+    """Estimates the prompt of every call for `accountant` and records the reported usage."""
+
+    def __init__(self, model: Model, accountant: TokenAccountant, agent: Agent[Any]):
+        self.model = model
+        self.accountant = accountant
+        self.agent = agent
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        prompt: Any | None,
+    ) -> ModelResponse:
+        record = self.accountant.estimate(self.agent, system_instructions, input, tools, handoffs, output_schema)
+        response = await self.model.get_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id, prompt=prompt,
+        )
+        record.input_tokens = response.usage.input_tokens
+        record.output_tokens = response.usage.output_tokens
+        return response
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchemaBase | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        *,
+        previous_response_id: str | None,
+        prompt: Any | None,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        record = self.accountant.estimate(self.agent, system_instructions, input, tools, handoffs, output_schema)
+        async for event in self.model.stream_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id, prompt=prompt,
+        ):
+            if event.type == "response.completed" and event.response.usage is not None:
+                record.input_tokens = event.response.usage.input_tokens
+                record.output_tokens = event.response.usage.output_tokens
+            yield event
+
+
+def _instrument(
+    agent: Agent[Any], run_config: RunConfig, accountant: TokenAccountant, seen: dict[int, Agent[Any]]
+) -> Agent[Any]:
+    """Clone `agent` and every agent reachable through its handoffs with an `AccountingModel`."""
+    if id(agent) in seen:
+        return seen[id(agent)]
+    clone = agent.clone(model=AccountingModel(resolve_model(agent, run_config), accountant, agent))
+    seen[id(agent)] = clone
+    # `Handoff` objects (from `handoff(...)`) keep their own agent reference and are not instrumented
+    clone.handoffs = [
+        _instrument(h, run_config, accountant, seen) if isinstance(h, Agent) else h for h in agent.handoffs
+    ]
+    return clone
+
+
+def _prepare(starting_agent: Agent[Any], run_config: RunConfig | None) -> tuple[Agent[Any], RunConfig, TokenAccountant]:
+    run_config = run_config or RunConfig()
+    accountant = TokenAccountant()
+    agent = _instrument(starting_agent, run_config, accountant, {})
+    # run_config.model was resolved into every clone above; it would otherwise bypass them
+    return agent, dataclasses.replace(run_config, model=None), accountant
+
+
+async def run_accounted(
+    starting_agent: Agent[Any],
+    input: str | list[TResponseInputItem],
+    *,
+    run_config: RunConfig | None = None,
+    **kwargs: Any,
+) -> RunResult:
+    """`Runner.run` with `result.token_accounting` (a `TokenAccountant`) for the run's model calls."""
+    agent, run_config, accountant = _prepare(starting_agent, run_config)
+    result = await Runner.run(agent, input, run_config=run_config, **kwargs)
+    result.token_accounting = accountant
+    return result
+
+
+def run_streamed_accounted(
+    starting_agent: Agent[Any],
+    input: str | list[TResponseInputItem],
+    *,
+    run_config: RunConfig | None = None,
+    **kwargs: Any,
+) -> RunResultStreaming:
+    """`Runner.run_streamed` with `result.token_accounting`, filled in as the run streams."""
+    agent, run_config, accountant = _prepare(starting_agent, run_config)
+    result = Runner.run_streamed(agent, input, run_config=run_config, **kwargs)
+    result.token_accounting = accountant
+    return result
@@ -0,0 +1,197 @@
+"""
+Memoized and deduplicated function tool calls.
+
+Arithmetic tools such as `add` / `multiply` are pure: the same arguments always give the same
+result, yet every call parses the model's JSON, validates it and runs the function again.
+`function_tool` here is a drop-in for `agents.function_tool` with three extra options:
+
+    @function_tool(pure=True)        # memoize forever (bounded LRU, `maxsize` entries)
+    def add(a: float, b: float) -> str: ...
+
+    @function_tool(ttl=1.0)          # semi-pure: reuse a result for `ttl` seconds
+    def get_current_time() -> str: ...
+
+    @function_tool(cache=shared)     # memoize in a `TTLCache` you own (may be shared between tools)
+
+Results are keyed by the tool name and its canonicalized JSON arguments (sorted keys, no
+whitespace). Only successful results are cached: errors go through `failure_error_function`
+(the SDK default unless overridden) on every call and are never memoized. Without any of the
+options the tool is exactly `agents.function_tool`'s.
+
+`deduplicated(tools)` makes identical calls share one execution within a run: when a model turn
+asks for the same (tool, arguments) several times (parallel calls), the tool runs once and every
+call id gets the result. With `across_turns=True` a result is also reused by identical calls in
+later turns of the same run (error messages from `failure_error_function` included). Runs never
+share results; use `pure=True` for that.
+
+`ToolCacheHooks` (run hooks) counts calls, cache hits and deduplicated calls per tool;
+`hooks.stats()` reports them for a run (or for every run the hooks were passed to).
+"""
+
+import dataclasses
+import inspect
+import json
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import agents
+from agents import Agent, FunctionTool, RunContextWrapper, RunHooks, Tool
+from agents.tool import ToolErrorFunction, default_tool_error_function
+
+from testprj.caching import SingleFlight, TTLCache
+
+_MISSING = object()
+
+
+@dataclass
+class CachedFunctionTool(FunctionTool):
+    """A `FunctionTool` whose successful results are memoized in `cache`."""
+
+    cache: TTLCache | None = None
+
+
+def _key(name: str, arguments: str) -> tuple[str, str] | None:
+    try:
+        parsed = json.loads(arguments) if arguments else {}
+    except ValueError:
+        return None  # let the tool report the invalid input
+    return name, json.dumps(parsed, sort_keys=True, separators=(",", ":"))
+
+
+def _memoize(tool: FunctionTool, cache: TTLCache, failure_error_function: ToolErrorFunction | None) -> CachedFunctionTool:
+    invoke = tool.on_invoke_tool  # raises: built without a failure_error_function
+
+    async def on_invoke_tool(ctx: Any, arguments: str) -> Any:
+        key = _key(tool.name, arguments)
+        result = _MISSING if key is None else cache.get(key, _MISSING)
+        ctx.tool_cache_hit = result is not _MISSING  # read by ToolCacheHooks
+        if result is not _MISSING:
+            return result
+        try:
+            result = await invoke(ctx, arguments)
+        except Exception as e:
+            if failure_error_function is None:
+                raise
+            error = failure_error_function(ctx, e)
+            return await error if inspect.isawaitable(error) else error
+        if key is not None:
+            cache.set(key, result)
+        return result
+
+    fields = {f.name: getattr(tool, f.name) for f in dataclasses.fields(FunctionTool)}
+    return CachedFunctionTool(**{**fields, "on_invoke_tool": on_invoke_tool}, cache=cache)
+
+
+def function_tool(
+    func: Callable[..., Any] | None = None,
+    *,
+    pure: bool = False,
+    ttl: float | None = None,
+    cache: TTLCache | None = None,
+    maxsize: int = 256,
+    failure_error_function: ToolErrorFunction | None = default_tool_error_function,
+    **kwargs: Any,
+) -> Any:
+    """`agents.function_tool` with memoization for pure (`pure=True`) and semi-pure (`ttl=...`) tools."""
+    if not (pure or ttl is not None or cache is not None):
+        return agents.function_tool(func, failure_error_function=failure_error_function, **kwargs)
+
+    def create(real_func: Callable[..., Any]) -> CachedFunctionTool:
+        tool = agents.function_tool(real_func, failure_error_function=None, **kwargs)
+        # a cache passed in keeps its own TTL; `ttl` only configures the cache created here
+        return _memoize(tool, cache if cache is not None else TTLCache(maxsize=maxsize, ttl=ttl), failure_error_function)
+
+    return create(func) if callable(func) else create
+
+
+class _RunCalls:
+    def __init__(self, usage: Any):
+        self.usage = usage  # identifies the run (every ToolContext of a run shares its Usage)
+        self.inflight = SingleFlight()
+        self.results: dict[tuple[str, str], Any] = {}
+
+
+class CallDeduper:
+    """Per-run registry of tool calls, shared by the tools wrapped with `deduplicated`."""
+
+    def __init__(self, across_turns: bool = False, max_runs: int = 1024):
+        self.across_turns = across_turns
+        self._runs = TTLCache(maxsize=max_runs, ttl=None)  # id(run usage) -> _RunCalls
+        self.executed = 0
+        self.deduplicated = 0
+
+    def _run(self, ctx: RunContextWrapper) -> _RunCalls:
+        calls = self._runs.get(id(ctx.usage))
+        if calls is None or calls.usage is not ctx.usage:
+            calls = _RunCalls(ctx.usage)
+            self._runs.set(id(ctx.usage), calls)
+        return calls
+
+    def wrap(self, tool: FunctionTool) -> FunctionTool:
+        invoke = tool.on_invoke_tool
+
+        async def on_invoke_tool(ctx: Any, arguments: str) -> Any:
+            key = _key(tool.name, arguments)
+            if key is None:
+                return await invoke(ctx, arguments)
+            calls = self._run(ctx)
+            if key in calls.results:
+                ctx.tool_call_deduplicated = True
+                self.deduplicated += 1
+                return calls.results[key]
+            executed = False
+
+            async def execute() -> Any:
+                nonlocal executed
+                executed = True
+                self.executed += 1
+                result = await invoke(ctx, arguments)
+                if self.across_turns:
+                    calls.results[key] = result
+                return result
+
+            result = await calls.inflight.do(key, execute)
+            ctx.tool_call_deduplicated = not executed
+            self.deduplicated += not executed
+            return result
+
+        return dataclasses.replace(tool, on_invoke_tool=on_invoke_tool)
+
+    def stats(self) -> dict[str, float]:
+        calls = self.executed + self.deduplicated
+        return {
+            "executed": self.executed,
+            "deduplicated": self.deduplicated,
+            "saved_ratio": self.deduplicated / calls if calls else 0.0,
+        }
+
+
+def deduplicated(tools: list[Tool], across_turns: bool = False, deduper: CallDeduper | None = None) -> list[Tool]:
+    """`tools` with identical calls in one run executed once; other tool kinds are returned as they are."""
+    deduper = deduper if deduper is not None else CallDeduper(across_turns)
+    return [deduper.wrap(tool) if isinstance(tool, FunctionTool) else tool for tool in tools]
+
+
+class ToolCacheHooks(RunHooks):
+    """Run hooks that count tool calls, memoization hits and deduplicated calls per tool."""
+
+    def __init__(self):
+        self.counts: dict[str, dict[str, int]] = defaultdict(lambda: {"calls": 0, "hits": 0, "deduplicated": 0})
+
+    async def on_tool_end(self, context: RunContextWrapper, agent: Agent, tool: Tool, result: str) -> None:
+        hit = getattr(context, "tool_cache_hit", None)
+        duplicate = getattr(context, "tool_call_deduplicated", None)
+        if hit is None and duplicate is None:
+            return  # neither memoized nor deduplicated
+        counts = self.counts[tool.name]
+        counts["calls"] += 1
+        counts["hits"] += bool(hit)
+        counts["deduplicated"] += bool(duplicate)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {
+            name: {**counts, "hit_rate": counts["hits"] / counts["calls"]}
+            for name, counts in self.counts.items()
+        }
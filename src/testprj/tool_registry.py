@@ -0,0 +1,143 @@
+"""
+Compile-once tool schemas for chat-completions requests.
+
+On every model call `OpenAIChatCompletionsModel` converts each tool and handoff to its
+chat-completions form and hands the list to the openai client. The client then runs its
+request-param transform over it and httpx JSON-encodes it. That walk over every nested schema
+is most of the per-request cost with 20-100 tools, and it is repeated for the same tools every
+turn of every run.
+
+`ToolRegistry` does the work once:
+
+- each `FunctionTool` (per object) and each handoff (per name/description/schema) is converted
+  and JSON-encoded once;
+- each distinct tool set gets a `SerializedTools`: the converted list plus its pre-encoded JSON
+  bytes, reused by every request that sends exactly those tools.
+
+`RegistryChatCompletionsModel` (what `providers.get_model` returns) sends the compiled list
+through `extra_body`. The openai client passes `extra_body` through without transforming it,
+and the pooled httpx client of `testprj.providers` splices the pre-encoded bytes into the body
+(`encode_body`) instead of encoding the tools again. With any other HTTP client the list is
+simply encoded as usual.
+
+Tools are keyed by identity: a tool whose schema is modified after its first use keeps its old
+compiled form (create a new tool instead).
+"""
+
+import dataclasses
+import json
+from typing import Any
+
+from agents import FunctionTool, Handoff, ModelSettings, OpenAIChatCompletionsModel, Tool
+from agents.models.chatcmpl_converter import Converter
+
+from testprj.caching import TTLCache
+
+
+def _dumps(value: Any) -> bytes:
+    # the same encoding httpx uses for `json=` bodies
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+
+class SerializedTools(list):
+    """A compiled tool list (encodes like a normal list) that also carries its JSON bytes."""
+
+    def __init__(self, converted: list[dict], data: bytes):
+        super().__init__(converted)
+        self.data = data
+
+
+class ToolRegistry:
+    def __init__(self, maxsize: int = 1024):
+        self._tools = TTLCache(maxsize=maxsize, ttl=None)  # id(tool) -> (tool, converted, bytes)
+        self._handoffs = TTLCache(maxsize=maxsize, ttl=None)  # (name, description, schema) -> (converted, bytes)
+        self._sets = TTLCache(maxsize=maxsize, ttl=None)  # tuple of part keys -> (tools, SerializedTools)
+        self.compiled = 0
+
+    def _tool(self, tool: Tool) -> tuple[int, dict, bytes]:
+        entry = self._tools.get(id(tool))
+        if entry is None or entry[0] is not tool:  # an id can be reused once the old tool is gone
+            converted = Converter.tool_to_openai(tool)
+            entry = (tool, converted, _dumps(converted))
+            self._tools.set(id(tool), entry)
+            self.compiled += 1
+        return id(tool), entry[1], entry[2]
+
+    def _handoff(self, handoff: Handoff) -> tuple[tuple, dict, bytes]:
+        # the Runner builds new Handoff objects every turn, so key them by content
+        key = (handoff.tool_name, handoff.tool_description, json.dumps(handoff.input_json_schema, sort_keys=True))
+        entry = self._handoffs.get(key)
+        if entry is None:
+            converted = Converter.convert_handoff_tool(handoff)
+            entry = (converted, _dumps(converted))
+            self._handoffs.set(key, entry)
+            self.compiled += 1
+        return key, entry[0], entry[1]
+
+    def get(self, tools: list[Tool], handoffs: list[Handoff]) -> SerializedTools | None:
+        """The compiled tool list for this request, or None when it sends no tools."""
+        if not tools and not handoffs:
+            return None
+        parts = [self._tool(tool) for tool in tools] + [self._handoff(handoff) for handoff in handoffs]
+        key = tuple(part[0] for part in parts)
+        entry = self._sets.get(key)
+        if entry is None or any(a is not b for a, b in zip(entry[0], tools)):
+            compiled = SerializedTools([part[1] for part in parts], b"[" + b",".join(part[2] for part in parts) + b"]")
+            entry = (tuple(tools), compiled)
+            self._sets.set(key, entry)
+        return entry[1]
+
+    def stats(self) -> dict[str, float]:
+        lookups = self._sets.hits + self._sets.misses
+        return {
+            "compiled": self.compiled,
+            "tool_sets": len(self._sets),
+            "hit_rate": self._sets.hits / lookups if lookups else 0.0,
+        }
+
+
+def encode_body(body: Any) -> bytes | None:
+    """JSON bytes of a request body whose "tools" is `SerializedTools`, or None for any other body."""
+    if not isinstance(body, dict) or not isinstance(body.get("tools"), SerializedTools):
+        return None
+    rest = _dumps({key: value for key, value in body.items() if key != "tools"})
+    return rest[:-1] + (b"," if len(rest) > 2 else b"") + b'"tools":' + body["tools"].data + b"}"
+
+
+default_registry = ToolRegistry()
+
+
+class RegistryChatCompletionsModel(OpenAIChatCompletionsModel):
+    """`OpenAIChatCompletionsModel` that sends compiled, pre-encoded tool lists from a `ToolRegistry`."""
+
+    def __init__(self, model: str, openai_client: Any, registry: ToolRegistry | None = None):
+        super().__init__(model=model, openai_client=openai_client)
+        self.registry = registry if registry is not None else default_registry
+
+    async def _fetch_response(
+        self,
+        system_instructions: str | None,
+        input: Any,
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: Any,
+        handoffs: list[Handoff],
+        span: Any,
+        tracing: Any,
+        stream: bool = False,
+        prompt: Any = None,
+    ) -> Any:
+        if any(not isinstance(tool, FunctionTool) for tool in tools):
+            compiled = None  # hosted tools are rejected by the chat-completions converter; let it raise as usual
+        else:
+            compiled = self.registry.get(tools, handoffs)
+        if compiled is not None:
+            extra_body = {**(model_settings.extra_body or {}), "tools": compiled}
+            if model_settings.parallel_tool_calls:
+                extra_body["parallel_tool_calls"] = True  # the SDK only sends it along with `tools`
+            model_settings = dataclasses.replace(model_settings, extra_body=extra_body)
+            tools, handoffs = [], []
+        return await super()._fetch_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, span, tracing,
+            stream=stream, prompt=prompt,
+        )
@@ -0,0 +1,121 @@
+"""
+Coalesced UI streaming for `Runner.run_streamed`.
+
+Pushing every text delta to the UI (`msg.update()` per token in the Chainlit app) means one
+websocket frame per token - thousands per response under load, each re-sending the whole message.
+`stream_run` dispatches on the event type, buffers text deltas and flushes them on a time or size
+budget (default: 30 ms or 256 characters, whichever comes first), with a final flush when the run
+ends. It returns `StreamStats` (frames, characters, CPU spent in the UI path...) so the budget can
+be tuned.
+
+    stats = await stream_run(Runner.run_streamed(agent, text), msg.stream_token)
+    await msg.update()
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+
+from agents import RunResultStreaming
+
+Flush = Callable[[str], Awaitable[None]]
+
+
+@dataclass
+class StreamStats:
+    events: int = 0
+    deltas: int = 0
+    chars: int = 0
+    frames: int = 0
+    duration_s: float = 0.0
+    ui_cpu_s: float = 0.0  # CPU time handling events and flushing (includes other tasks if a flush blocks)
+
+    def add(self, other: "StreamStats") -> None:
+        for name, value in asdict(other).items():
+            setattr(self, name, getattr(self, name) + value)
+
+    def summary(self) -> dict[str, float]:
+        return {
+            **asdict(self),
+            "chars_per_frame": self.chars / self.frames if self.frames else 0.0,
+            "frames_per_s": self.frames / self.duration_s if self.duration_s else 0.0,
+        }
+
+
+class CoalescingBuffer:
+    """Collects text and calls `flush` at most every `interval` seconds or every `max_chars` characters."""
+
+    def __init__(self, flush: Flush, interval: float = 0.03, max_chars: int = 256, stats: StreamStats | None = None):
+        self._flush = flush
+        self.interval = interval
+        self.max_chars = max_chars
+        self.stats = stats if stats is not None else StreamStats()
+        self._parts: list[str] = []
+        self._size = 0
+        self._timer: asyncio.Task | None = None
+        self._lock = asyncio.Lock()  # flushes from the timer and from feed() must not interleave
+
+    async def feed(self, text: str) -> None:
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.max_chars:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.interval)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+        async with self._lock:
+            if not self._parts:
+                return
+            text = "".join(self._parts)
+            self._parts.clear()
+            self._size = 0
+            self.stats.frames += 1
+            await self._flush(text)
+
+    async def close(self) -> None:
+        await self.flush()
+
+
+async def stream_run(
+    result: RunResultStreaming,
+    flush: Flush,
+    interval: float = 0.03,
+    max_chars: int = 256,
+    on_event: Callable[[object], Awaitable[None]] | None = None,
+) -> StreamStats:
+    """Drive `result.stream_events()`, sending coalesced text to `flush`. `on_event` sees every other event."""
+    stats = StreamStats()
+    buffer = CoalescingBuffer(flush, interval, max_chars, stats)
+    start = time.perf_counter()
+    cpu = 0.0
+    try:
+        async for event in result.stream_events():
+            t0 = time.process_time()
+            stats.events += 1
+            match event.type:
+                case "raw_response_event":
+                    if event.data.type == "response.output_text.delta" and event.data.delta:
+                        stats.deltas += 1
+                        stats.chars += len(event.data.delta)
+                        await buffer.feed(event.data.delta)
+                case _:
+                    if on_event is not None:
+                        await on_event(event)
+            cpu += time.process_time() - t0
+    finally:
+        t0 = time.process_time()
+        await buffer.close()
+        cpu += time.process_time() - t0
+        stats.duration_s = time.perf_counter() - start
+        stats.ui_cpu_s = cpu
+    return stats